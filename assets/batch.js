@@ -0,0 +1,90 @@
+// Batch evaluation tab: streams the chosen file to /batch/<model>, polls the job and offers the result.
+// The tab is rendered lazily, so events are delegated from the document.
+(function () {
+    var POLL_MS = 500;
+    var config = document.getElementById('_dash-config');
+    var prefix = (config && JSON.parse(config.textContent).requests_pathname_prefix) || '/';
+
+    function byId(id) {
+        return document.getElementById(id);
+    }
+
+    function show(progress, text) {
+        var bar = byId('batch-progress-bar');
+        var status = byId('batch-status');
+        if (bar) {
+            bar.style.width = (100 * progress).toFixed(1) + '%';
+        }
+        if (status) {
+            status.textContent = text;
+        }
+    }
+
+    function poll(job) {
+        var download = byId('batch-download');
+        if (job.status === 'done') {
+            show(1, 'Completado: ' + job.rows.toLocaleString('en-US') + ' filas.');
+            if (download) {
+                download.href = prefix + 'batch/jobs/' + job.id + '/result';
+                download.style.display = '';
+            }
+            return;
+        }
+        if (job.status === 'error') {
+            show(0, 'Error: ' + job.error);
+            return;
+        }
+        if (job.status === 'cancelled') {
+            show(0, 'Cancelado.');
+            return;
+        }
+        show(job.progress, 'Procesando… ' + job.rows.toLocaleString('en-US') + ' filas.');
+        setTimeout(function () {
+            fetch(prefix + 'batch/jobs/' + job.id)
+                .then(function (response) { return response.json(); })
+                .then(poll)
+                .catch(function () { show(0, 'Error: no se pudo consultar el trabajo.'); });
+        }, POLL_MS);
+    }
+
+    function upload(file) {
+        var model = byId('batch-model').value;
+        var download = byId('batch-download');
+        if (download) {
+            download.style.display = 'none';
+        }
+        var xhr = new XMLHttpRequest();
+        xhr.open('POST', prefix + 'batch/' + model + '?filename=' + encodeURIComponent(file.name));
+        xhr.upload.onprogress = function (event) {
+            if (event.lengthComputable) {
+                show(event.loaded / event.total, 'Subiendo… ' + (100 * event.loaded / event.total).toFixed(0) + ' %');
+            }
+        };
+        xhr.onload = function () {
+            if (xhr.status === 202) {
+                poll(JSON.parse(xhr.responseText));
+            } else {
+                show(0, 'Error: ' + xhr.status + ' ' + xhr.statusText);
+            }
+        };
+        xhr.onerror = function () {
+            show(0, 'Error: no se pudo subir el archivo.');
+        };
+        xhr.send(file);
+    }
+
+    document.addEventListener('click', function (event) {
+        if (!event.target.closest || !event.target.closest('#batch-upload-button')) {
+            return;
+        }
+        var input = document.createElement('input');
+        input.type = 'file';
+        input.accept = '.csv,.parquet,.pq';
+        input.onchange = function () {
+            if (input.files.length) {
+                upload(input.files[0]);
+            }
+        };
+        input.click();
+    });
+})();
@@ -0,0 +1,79 @@
+// Client side of live slider drags (see coalesce.py). Enabled by the fluidos-min-interval
+// meta tag: callback requests triggered by an input change are sent at most every
+// min-interval ms per output, with at most MAX_IN_FLIGHT of them pending at once. A request
+// replaced by a newer one before being sent resolves as 204 No Content ("no update").
+
+(function () {
+    var MAX_IN_FLIGHT = 2;
+
+    var meta = document.querySelector('meta[name="fluidos-min-interval"]');
+    if (!meta || !window.fetch) {
+        return;
+    }
+    var minInterval = parseFloat(meta.getAttribute('content')) || 0;
+    var session = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    var seq = 0;
+    var lanes = {};
+    var originalFetch = window.fetch.bind(window);
+
+    function noUpdate() {
+        return new Response(null, {status: 204});
+    }
+
+    function pump(lane) {
+        if (!lane.pending || lane.inFlight >= MAX_IN_FLIGHT) {
+            return;
+        }
+        var wait = lane.last + minInterval - Date.now();
+        if (wait > 0) {
+            if (!lane.timer) {
+                lane.timer = setTimeout(function () {
+                    lane.timer = null;
+                    pump(lane);
+                }, wait);
+            }
+            return;
+        }
+        var request = lane.pending;
+        lane.pending = null;
+        lane.inFlight += 1;
+        lane.last = Date.now();
+        seq += 1;
+        var options = Object.assign({}, request.options, {
+            headers: Object.assign({}, request.options.headers, {
+                'X-Fluidos-Session': session,
+                'X-Fluidos-Seq': String(seq)
+            })
+        });
+        originalFetch(request.url, options)
+            .then(request.resolve, request.reject)
+            .then(function () {
+                lane.inFlight -= 1;
+                pump(lane);
+            });
+    }
+
+    window.fetch = function (url, options) {
+        if (typeof url !== 'string' || url.indexOf('_dash-update-component') < 0 || !options || typeof options.body !== 'string') {
+            return originalFetch(url, options);
+        }
+        var body;
+        try {
+            body = JSON.parse(options.body);
+        } catch (e) {
+            return originalFetch(url, options);
+        }
+        // Initial calls are never delayed or dropped
+        if (!body.changedPropIds || !body.changedPropIds.length) {
+            return originalFetch(url, options);
+        }
+        var lane = lanes[body.output] || (lanes[body.output] = {pending: null, inFlight: 0, last: 0, timer: null});
+        return new Promise(function (resolve, reject) {
+            if (lane.pending) {
+                lane.pending.resolve(noUpdate()); // Superseded before being sent
+            }
+            lane.pending = {url: url, options: options, resolve: resolve, reject: reject};
+            pump(lane);
+        });
+    };
+})();
@@ -0,0 +1,21 @@
+// Helpers shared by the other assets. Dash loads assets in alphabetical order, so this file
+// runs before fluidos.js and static_export.js, which read them from window.fluidos.
+
+(function () {
+    var formatters = {};
+
+    // Equivalent of Python's f"{x:,.Nf}" (grouping=true) and f"{x:.Nf}".
+    function fmt(x, digits, grouping) {
+        var key = digits + (grouping ? 'g' : '');
+        if (!formatters[key]) {
+            formatters[key] = new Intl.NumberFormat('en-US', {
+                minimumFractionDigits: digits,
+                maximumFractionDigits: digits,
+                useGrouping: !!grouping
+            });
+        }
+        return formatters[key].format(x);
+    }
+
+    window.fluidos = Object.assign({}, window.fluidos, {fmt: fmt});
+})();
@@ -0,0 +1,160 @@
+// Client-side versions of the display/result outputs of the callbacks in fluidoscona.py.
+// The Python update_* functions are the reference implementation: keep formulas and
+// formatting in sync with them. Each function returns the tab's outputs in the order
+// they are declared in fluid_callback(), leaving out the figure.
+
+(function () {
+    var G_ACCEL = 9.81; // m/s^2 (standard gravity)
+
+    var fmt = window.fluidos.fmt; // assets/common.js
+
+    function circleArea(diameter_cm) {
+        var d_m = diameter_cm / 100.0;
+        return Math.PI * Math.pow(d_m / 2, 2);
+    }
+
+    function P(children, className) {
+        var props = {children: children};
+        if (className) {
+            props.className = className;
+        }
+        return {type: 'P', namespace: 'dash_html_components', props: props};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        fluidos: {
+            // == Tab 1: Pressure (P = F/A) ==
+            pressure: function (force, area) {
+                var pressure_text, area_val;
+                if (area === null || area === undefined || area <= 0) {
+                    pressure_text = 'Área inválida (debe ser > 0).';
+                    area_val = 0;
+                } else {
+                    var pressure = force / area;
+                    pressure_text = 'P = ' + fmt(force, 0) + ' N / ' + fmt(area, 3) + ' m² = ' +
+                        fmt(pressure, 2, true) + ' Pa (' + fmt(pressure / 1000, 2, true) + ' kPa)';
+                    area_val = area;
+                }
+                return [pressure_text, fmt(force, 0) + ' N', fmt(area_val, 3) + ' m²'];
+            },
+
+            // == Tab 2: Hydraulic Press (Pascal) ==
+            hydraulic_press: function (f_in, d_cm, D_cm) {
+                var area_a = circleArea(d_cm);
+                var area_A = circleArea(D_cm);
+                var F_text, pressure_text, advantage_text;
+                if (!(area_a > 0)) {
+                    F_text = "Área 'a' inválida.";
+                    pressure_text = 'N/A';
+                    advantage_text = 'N/A';
+                } else {
+                    var pressure = f_in / area_a;
+                    var F_out = pressure * area_A;
+                    var advantage = f_in > 0 ? F_out / f_in : 0;
+                    F_text = fmt(F_out, 2, true) + ' N';
+                    pressure_text = fmt(pressure, 2, true) + ' Pa (' + fmt(pressure / 1000, 2, true) + ' kPa)';
+                    advantage_text = fmt(advantage, 2);
+                }
+                return [
+                    F_text,
+                    pressure_text,
+                    advantage_text,
+                    fmt(f_in, 1) + ' N',
+                    fmt(d_cm, 1) + ' cm',
+                    fmt(D_cm, 1) + ' cm',
+                    'Área (a): ' + fmt(area_a, 4) + ' m²',
+                    'Área (A): ' + fmt(area_A, 4) + ' m²'
+                ];
+            },
+
+            // == Tab 3: Archimedes' Principle ==
+            archimedes: function (rho_obj, vol_obj, rho_fluid) {
+                var weight = rho_obj * G_ACCEL * vol_obj;
+                var max_buoyancy = rho_fluid * G_ACCEL * vol_obj;
+                var situation, buoyancy, vol_submerged, percentage_submerged;
+
+                if (weight > max_buoyancy) {
+                    situation = 'El objeto se hunde.';
+                    buoyancy = max_buoyancy;
+                    vol_submerged = vol_obj;
+                    percentage_submerged = 100;
+                } else if (weight === max_buoyancy) {
+                    situation = 'El objeto está suspendido (flotabilidad neutra).';
+                    buoyancy = weight;
+                    vol_submerged = vol_obj;
+                    percentage_submerged = 100;
+                } else {
+                    situation = 'El objeto flota.';
+                    buoyancy = weight;
+                    vol_submerged = (rho_obj / rho_fluid) * vol_obj;
+                    percentage_submerged = (vol_submerged / vol_obj) * 100;
+                }
+
+                var output_html = [
+                    P('Peso (W): ' + fmt(weight, 2, true) + ' N'),
+                    P('Empuje (E): ' + fmt(buoyancy, 2, true) + ' N'),
+                    P('Vol. Sumergido: ' + fmt(vol_submerged, 4) + ' m³ (' + fmt(percentage_submerged, 1) + '%)'),
+                    P(situation, 'fw-bold')
+                ];
+                return [output_html, rho_obj + ' kg/m³', fmt(vol_obj, 4) + ' m³', rho_fluid + ' kg/m³'];
+            },
+
+            // == Tab 4: Hydrostatic Pressure (Ph = ρgh) ==
+            hydrostatic_pressure: function (h, rho) {
+                var pressure_h = rho * G_ACCEL * h;
+                var lines = [
+                    'Ph = ' + rho + ' kg/m³ * ' + fmt(G_ACCEL, 2) + ' m/s² * ' + h + ' m',
+                    '<b>Ph = ' + fmt(pressure_h, 2, true) + ' Pa (' + fmt(pressure_h / 1000, 2, true) + ' kPa)</b>'
+                ];
+                var output = {
+                    type: 'Div',
+                    namespace: 'dash_html_components',
+                    props: {children: lines.map(function (line) { return P(line); })}
+                };
+                return [output, h + ' m', rho + ' kg/m³'];
+            },
+
+            // == Tab 5: Continuity (A₁v₁ = A₂v₂) ==
+            continuity: function (D1_cm, v1, D2_cm) {
+                var A1 = circleArea(D1_cm);
+                var A2 = circleArea(D2_cm);
+                var v2_text, gasto;
+                if (!(A2 > 0)) {
+                    v2_text = 'Diámetro D₂ inválido.';
+                    gasto = 0;
+                } else {
+                    var v2 = (A1 * v1) / A2;
+                    v2_text = fmt(v2, 2) + ' m/s';
+                    gasto = A1 * v1;
+                }
+                return [
+                    v2_text,
+                    'Caudal (Gasto, G): ' + fmt(gasto, 4) + ' m³/s',
+                    fmt(D1_cm, 1) + ' cm',
+                    'Área (A₁): ' + fmt(A1, 5) + ' m²',
+                    fmt(v1, 2) + ' m/s',
+                    fmt(D2_cm, 1) + ' cm',
+                    'Área (A₂): ' + fmt(A2, 5) + ' m²'
+                ];
+            },
+
+            // == Tab 6: Torricelli (v = √(2gh)) ==
+            torricelli: function (h, g) {
+                var g_val = (g !== null && g !== undefined && g > 0) ? g : G_ACCEL;
+                var v_text;
+                if (h === null || h === undefined || h <= 0) {
+                    v_text = 'Altura h inválida.';
+                } else {
+                    v_text = fmt(Math.sqrt(2 * g_val * h), 2) + ' m/s';
+                }
+                return [v_text, fmt(h, 2) + ' m'];
+            },
+
+            // == Stratified column: new row in the layers table ==
+            add_layer: function (n_clicks, rows) {
+                rows = rows || [];
+                return rows.concat([{name: 'Capa ' + (rows.length + 1), density: 1000, thickness: 1}]);
+            }
+        }
+    });
+})();
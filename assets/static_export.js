@@ -0,0 +1,364 @@
+// Runtime of the static export (see export_static.py). Enabled by the fluidos-static meta tag,
+// whose content is the URL of the lookup tables: the layout and dependencies are read from
+// .json files and callback requests are answered from the tables, without a server. A request
+// whose free inputs (number fields, the layers table) differ from the exported defaults is
+// computed by the callback's fallback below, or answered with 204 No Content ("no update").
+// Callbacks and options left out of the export to fit its size budget show a message instead.
+
+(function () {
+    var G_ACCEL = 9.81; // m/s^2 (standard gravity)
+    var PROFILE_POINTS = 1000; // Points of the stratified column profile, as sent by the server
+    var UNAVAILABLE = 'No disponible sin conexión';
+
+    var meta = document.querySelector('meta[name="fluidos-static"]');
+    if (!meta || !window.fetch) {
+        return;
+    }
+    var tablesUrl = meta.getAttribute('content');
+    var originalFetch = window.fetch.bind(window);
+    var files = {};
+
+    function load(url) {
+        if (!files[url]) {
+            files[url] = originalFetch(url).then(function (response) {
+                if (!response.ok) {
+                    throw new Error(url + ': ' + response.status);
+                }
+                return response.json();
+            });
+        }
+        return files[url];
+    }
+
+    function jsonResponse(body) {
+        if (body === null || body === undefined) {
+            return new Response(null, {status: 204});
+        }
+        return new Response(JSON.stringify(body), {status: 200, headers: {'Content-Type': 'application/json'}});
+    }
+
+    function copy(value) {
+        return JSON.parse(JSON.stringify(value));
+    }
+
+    // == dash.Patch (only the Assign operations the app sends) ==
+    function isPatch(value) {
+        return value !== null && typeof value === 'object' && '__dash_patch_update' in value;
+    }
+
+    function setPath(target, location, value) {
+        for (var i = 0; i < location.length - 1; i++) {
+            if (target[location[i]] === undefined) {
+                target[location[i]] = typeof location[i + 1] === 'number' ? [] : {};
+            }
+            target = target[location[i]];
+        }
+        target[location[location.length - 1]] = value;
+    }
+
+    function applyPatch(target, patch) {
+        patch.operations.forEach(function (op) {
+            setPath(target, op.location, op.params.value);
+        });
+        return target;
+    }
+
+    // Initial calls need full values: patches are applied to the response of the default inputs
+    function complete(response, base) {
+        Object.keys(response.response).forEach(function (id) {
+            var props = response.response[id];
+            Object.keys(props).forEach(function (prop) {
+                if (isPatch(props[prop]) && base && base.response[id] && base.response[id][prop] !== undefined) {
+                    props[prop] = applyPatch(copy(base.response[id][prop]), props[prop]);
+                }
+            });
+        });
+        return response;
+    }
+
+    // Sets ``location`` inside output id.prop of a response, whether it holds a patch or a full value
+    function assign(response, id, prop, location, value) {
+        var props = response.response[id];
+        if (!props || props[prop] === undefined) {
+            return;
+        }
+        if (!location.length) {
+            props[prop] = value;
+        } else if (isPatch(props[prop])) {
+            props[prop].operations.push({operation: 'Assign', location: location, params: {value: value}});
+        } else {
+            setPath(props[prop], location, value);
+        }
+    }
+
+    // Message in every figure and text output of a callback that was not exported
+    function unavailable(body) {
+        var response = {};
+        (Array.isArray(body.outputs) ? body.outputs : [body.outputs]).forEach(function (output) {
+            var value;
+            if (output.property === 'figure') {
+                value = {data: [], layout: {
+                    xaxis: {visible: false}, yaxis: {visible: false},
+                    annotations: [{text: UNAVAILABLE, showarrow: false, font: {size: 16}}]
+                }};
+            } else if (output.property === 'children') {
+                value = UNAVAILABLE + '.';
+            } else {
+                return;
+            }
+            response[output.id] = response[output.id] || {};
+            response[output.id][output.property] = value;
+        });
+        return {multi: true, response: response};
+    }
+
+    // == Lookup ==
+    function position(input, value) {
+        var values = input.values;
+        if (input.kind === 'grid') {
+            // Nearest exported tick (the grid may have been thinned to fit the size budget)
+            if (typeof value !== 'number') {
+                return -1;
+            }
+            var best = 0;
+            for (var i = 1; i < values.length; i++) {
+                if (Math.abs(values[i] - value) < Math.abs(values[best] - value)) {
+                    best = i;
+                }
+            }
+            return best;
+        }
+        var key = JSON.stringify(value);
+        for (var j = 0; j < values.length; j++) {
+            if (JSON.stringify(values[j]) === key) {
+                return j;
+            }
+        }
+        return -1;
+    }
+
+    function update(body) {
+        return load(tablesUrl + 'index.json').then(function (index) {
+            var spec = index.callbacks[body.output];
+            if (!spec) {
+                return null;
+            }
+            if (spec.unavailable) {
+                return unavailable(body);
+            }
+            var values = {};
+            var flat = 0;
+            var free = false;
+            for (var i = 0; i < spec.inputs.length; i++) {
+                var input = spec.inputs[i];
+                var value = body.inputs[i].value;
+                var k = position(input, value);
+                values[input.id + '.' + input.property] = value;
+                if (k < 0) {
+                    if (input.kind === 'choice') {
+                        return unavailable(body); // Option left out of the export
+                    }
+                    if (input.kind !== 'fixed') {
+                        return null;
+                    }
+                    free = true;
+                    k = 0;
+                }
+                flat = flat * input.values.length + k;
+            }
+            var fallback = free ? fallbacks[spec.name] : null;
+            if (free && !fallback) {
+                return null;
+            }
+            var initial = !body.changedPropIds || !body.changedPropIds.length;
+            var dir = tablesUrl + spec.dir + '/';
+            var entry = initial && flat === spec['default'] ?
+                load(dir + 'base.json') :
+                load(dir + Math.floor(flat / spec.per_shard) + '.json').then(function (shard) {
+                    return shard[flat % spec.per_shard];
+                });
+            return entry.then(function (response) {
+                if (!response) {
+                    return null;
+                }
+                response = copy(response); // Shards are shared by every request
+                if (fallback) {
+                    response = fallback(response, values, spec);
+                }
+                return initial ? load(dir + 'base.json').then(function (base) { return complete(response, base); }) : response;
+            });
+        });
+    }
+
+    window.fetch = function (url, options) {
+        if (typeof url === 'string' && /_dash-(layout|dependencies)$/.test(url.split('?')[0])) {
+            return originalFetch(url.split('?')[0] + '.json', options);
+        }
+        if (typeof url !== 'string' || url.indexOf('_dash-update-component') < 0 || !options || typeof options.body !== 'string') {
+            return originalFetch(url, options);
+        }
+        return update(JSON.parse(options.body)).then(jsonResponse);
+    };
+
+    // == Client-side fallbacks, by callback name ==
+    var fmt = window.fluidos.fmt; // assets/common.js
+
+    function P(children) {
+        return {type: 'P', namespace: 'dash_html_components', props: {children: children}};
+    }
+
+    function gravity(g) {
+        return (g !== null && g !== undefined && g > 0) ? g : G_ACCEL;
+    }
+
+    function exportedDefault(spec, id) {
+        for (var i = 0; i < spec.inputs.length; i++) {
+            if (spec.inputs[i].id === id) {
+                return spec.inputs[i].values[0];
+            }
+        }
+        return undefined;
+    }
+
+    var TYPED_ARRAYS = {f8: Float64Array, f4: Float32Array, i4: Int32Array, u4: Uint32Array, i2: Int16Array, u2: Uint16Array, i1: Int8Array, u1: Uint8Array};
+
+    // Plain array from a list or a base64 typed array ({dtype, bdata})
+    function array(value) {
+        if (!value || Array.isArray(value) || !value.bdata) {
+            return value;
+        }
+        var bytes = Uint8Array.from(atob(value.bdata), function (c) { return c.charCodeAt(0); });
+        return Array.from(new TYPED_ARRAYS[value.dtype](bytes.buffer));
+    }
+
+    function scaled(values, factor) {
+        return array(values).map(function (x) { return x * factor; });
+    }
+
+    var fallbacks = {
+        // v = √(2gh) for any g, on the same heights as update_torricelli
+        update_torricelli: function (response, values) {
+            var h = values['torricelli-h-slider.value'];
+            var g = gravity(values['torricelli-g-input.value']);
+            var top = Math.max(h * 1.1, 1);
+            var hs = [];
+            for (var i = 0; i < 50; i++) {
+                hs.push(0.1 + (top - 0.1) * i / 49);
+            }
+            var v = Math.sqrt(2 * g * h);
+            assign(response, 'torricelli-graph', 'figure', ['data', 0, 'x'], hs);
+            assign(response, 'torricelli-graph', 'figure', ['data', 0, 'y'], hs.map(function (x) { return Math.sqrt(2 * g * x); }));
+            assign(response, 'torricelli-graph', 'figure', ['data', 1, 'x'], [h]);
+            assign(response, 'torricelli-graph', 'figure', ['data', 1, 'y'], [v]);
+            assign(response, 'torricelli-output-v', 'children', [], fmt(v, 2) + ' m/s');
+            return response;
+        },
+
+        // The draining time scales as 1/√g and the speeds and flows as √g: the simulation at the
+        // exported g is rescaled (traces h, v, Q and their markers; frames move the markers)
+        update_torricelli_drain: function (response, values, spec) {
+            var s = Math.sqrt(gravity(exportedDefault(spec, 'torricelli-g-input')) / gravity(values['torricelli-g-input.value']));
+            var figure = response.response['torricelli-drain-graph'].figure;
+            figure.data.forEach(function (trace, i) {
+                trace.x = scaled(trace.x, s);
+                trace.y = scaled(trace.y, i % 3 ? 1 / s : 1);
+            });
+            (figure.frames || []).forEach(function (frame) {
+                frame.data.forEach(function (trace, i) {
+                    trace.x = scaled(trace.x, s);
+                    trace.y = scaled(trace.y, i ? 1 / s : 1);
+                });
+            });
+            var t = figure.data[0].x;
+            (figure.layout.sliders || []).forEach(function (slider) {
+                slider.steps.forEach(function (step, i) {
+                    step.label = fmt(t[i], 0);
+                });
+            });
+            var drainTime = t[t.length - 1];
+            assign(response, 'torricelli-drain-time', 'children', [],
+                fmt(drainTime, 1, true) + ' s (' + fmt(Math.floor(drainTime / 60), 0) + ' min ' + fmt(drainTime % 60, 0) + ' s)');
+            return response;
+        },
+
+        // Stratified column for any table: the gauge pressure is exact between the sampled depths
+        // (piecewise linear, or -K ln(1 - q/K) when compressible, as in physics.layered_pressure)
+        update_hydrostatic_layers: function (response, values) {
+            var layers = [];
+            (values['hydrostatic-layers-table.data'] || []).forEach(function (row) {
+                var density = Number(row.density);
+                var thickness = Number(row.thickness);
+                if (density > 0 && thickness > 0) {
+                    layers.push({name: row.name || 'Capa ' + (layers.length + 1), density: density, thickness: thickness});
+                }
+            });
+            if (!layers.length) {
+                assign(response, 'hydrostatic-layers-graph', 'figure', [], {data: [], layout: {}});
+                assign(response, 'hydrostatic-layers-output', 'children', [], [P('Agregue al menos una capa con densidad y espesor positivos.')]);
+                return response;
+            }
+            var surface = values['hydrostatic-surface-pressure-input.value'] || 0;
+            var K = values['hydrostatic-bulk-modulus-input.value'] > 0 ? values['hydrostatic-bulk-modulus-input.value'] : 0;
+            var interfaces = [];
+            var total = 0;
+            var column = 0; // Incompressible gauge pressure at the bottom
+            layers.forEach(function (layer) {
+                total += layer.thickness;
+                column += layer.density * G_ACCEL * layer.thickness;
+                interfaces.push(total);
+            });
+            if (K && column >= K) {
+                assign(response, 'hydrostatic-layers-graph', 'figure', [], {data: [], layout: {}});
+                assign(response, 'hydrostatic-layers-output', 'children', [], P('La presión incompresible ρgh (' + fmt(column, 0, true) +
+                    ' Pa) alcanza el módulo de compresibilidad K (' + fmt(K, 0, true) +
+                    ' Pa): con ρ = ρ₀·exp(p/K) la presión diverge. Aumente K o reduzca la columna.'));
+                return response;
+            }
+
+            // Pressure and density at depth z; an interface belongs to the layer above it
+            function sample(z) {
+                var q = 0;
+                var top = 0;
+                var layer = layers.length - 1;
+                for (var i = 0; i < layers.length; i++) {
+                    q += layers[i].density * G_ACCEL * Math.max(Math.min(z, interfaces[i]) - top, 0);
+                    top = interfaces[i];
+                    if (z <= interfaces[i] && layer === layers.length - 1) {
+                        layer = i;
+                    }
+                }
+                var gauge = K ? -K * Math.log1p(-q / K) : q;
+                var rho0 = layers[layer].density;
+                return {pressure: surface + gauge, density: K ? rho0 * Math.exp(gauge / K) : rho0};
+            }
+
+            var depths = interfaces.slice();
+            for (var i = 0; i < PROFILE_POINTS; i++) {
+                depths.push(total * i / (PROFILE_POINTS - 1));
+            }
+            depths.sort(function (a, b) { return a - b; });
+            depths = depths.filter(function (z, i) { return i === 0 || z !== depths[i - 1]; });
+            var samples = depths.map(sample);
+            var pressures = samples.map(function (p) { return p.pressure; });
+            var interfacePressures = interfaces.map(function (z) { return sample(z).pressure; });
+
+            function trace(index, prop, value) {
+                assign(response, 'hydrostatic-layers-graph', 'figure', ['data', index, prop], value);
+            }
+            trace(0, 'x', depths);
+            trace(0, 'y', pressures);
+            trace(1, 'x', interfaces);
+            trace(1, 'y', interfacePressures);
+            trace(1, 'text', layers.map(function (layer) { return layer.name; }));
+            trace(2, 'x', depths);
+            trace(2, 'y', samples.map(function (p) { return p.density; }));
+            assign(response, 'hydrostatic-layers-output', 'children', [], layers.map(function (layer, i) {
+                var p = interfacePressures[i];
+                // Python's {:g}: 6 significant digits without trailing zeros
+                return P(layer.name + ' (z = ' + Number(interfaces[i].toPrecision(6)) + ' m): ' +
+                    fmt(p, 2, true) + ' Pa (' + fmt(p / 1000, 2, true) + ' kPa)');
+            }));
+            return response;
+        }
+    };
+})();
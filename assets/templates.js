@@ -0,0 +1,35 @@
+// Shared figure template (see serialization.py). Enabled by the fluidos-template meta tag,
+// whose content is the template's JSON: the server sends it once with the page and the
+// figures only name it ("template": "fluidos"), so the name is swapped for the template in
+// the layout and callback responses before dcc.Graph reads them. Loaded after coalesce.js
+// and static_export.js, so it wraps their fetch and also sees the static export's answers.
+
+(function () {
+    var NAME = /"template"\s*:\s*"fluidos"/g;
+
+    var meta = document.querySelector('meta[name="fluidos-template"]');
+    if (!meta || !window.fetch) {
+        return;
+    }
+    var template = '"template":' + meta.getAttribute('content');
+    var originalFetch = window.fetch.bind(window);
+
+    window.fetch = function (url, options) {
+        var response = originalFetch(url, options);
+        if (typeof url !== 'string' || (url.indexOf('_dash-update-component') < 0 && url.indexOf('_dash-layout') < 0)) {
+            return response;
+        }
+        return response.then(function (original) {
+            if (!original.ok || original.status === 204) {
+                return original;
+            }
+            return original.text().then(function (text) {
+                return new Response(text.replace(NAME, template), {
+                    status: original.status,
+                    statusText: original.statusText,
+                    headers: {'Content-Type': original.headers.get('Content-Type') || 'application/json'}
+                });
+            });
+        });
+    };
+})();
@@ -0,0 +1,252 @@
+"""Batch evaluation of uploaded case files through the dashboard formulas.
+
+A client streams a CSV or Parquet file to ``POST /batch/<model>``; the body is
+copied to a temporary file in fixed-size blocks and then processed chunk by
+chunk in the background, so neither the upload nor the results ever have to
+fit in memory. Progress is reported by ``GET /batch/jobs/<id>`` and the
+result, in the same format as the input, is streamed from disk by
+``GET /batch/jobs/<id>/result``.
+
+The state of each job lives in ``status.json`` in its directory under
+``BATCH_DIR``, so any worker process can answer for a job started by another.
+Parquet support needs pyarrow.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+from flask import abort, jsonify, request, send_file
+
+import physics
+from jobs import Cancelled
+
+CHUNK_ROWS = 500_000
+COPY_BLOCK = 1 << 20
+JOB_TTL = 3600 # s before a finished job and its files are removed
+BATCH_DIR = os.environ.get('FLUIDOS_BATCH_DIR', os.path.join(tempfile.gettempdir(), 'fluidos-batch'))
+
+# model: (input columns, function of those columns returning a physics result, defaults of optional columns)
+MODELS = {
+    'pressure': (['force', 'area'], physics.pressure, {}),
+    'hydraulic': (['f', 'd', 'D'], physics.hydraulic_press, {}),
+    'archimedes': (['rho_obj', 'vol_obj', 'rho_fluid'], physics.buoyancy, {}),
+    'hydrostatic': (['rho', 'h'], lambda rho, h: {'pressure': physics.hydrostatic_pressure(rho, h)}, {}),
+    'continuity': (['D1', 'v1', 'D2'], physics.continuity, {}),
+    'torricelli': (['h', 'g'], physics.torricelli, {'g': physics.G_ACCEL}),
+}
+
+
+def evaluate(model, frame):
+    """Adds the results of ``model`` to a DataFrame holding its input columns.
+
+    A column named like a result is replaced by it, e.g. ``g`` for torricelli
+    becomes the gravity actually used.
+    """
+    import pandas as pd # Slow to import: only batch jobs need it
+
+    columns, formula, defaults = MODELS[model]
+    missing = [c for c in columns if c not in frame.columns and c not in defaults]
+    if missing:
+        raise ValueError(f"Faltan columnas: {', '.join(missing)}")
+    result = formula(*(
+        pd.to_numeric(frame[c], errors='coerce').to_numpy(dtype=float) if c in frame.columns else defaults[c]
+        for c in columns
+    ))
+    fields = result if isinstance(result, dict) else result._asdict()
+    for name, values in fields.items():
+        frame[name] = np.broadcast_to(values, len(frame))
+    return frame
+
+
+class Job:
+    """A batch job and its files; ``save()`` publishes its state to other processes."""
+
+    FIELDS = ('id', 'model', 'format', 'filename', 'total_bytes', 'processed_bytes', 'rows', 'status', 'error', 'finished_at')
+
+    def __init__(self, model, fmt, filename, job_id=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.model = model
+        self.format = fmt
+        self.filename = filename
+        self.total_bytes = 0
+        self.processed_bytes = 0
+        self.rows = 0
+        self.status = 'uploading'
+        self.error = None
+        self.finished_at = None
+
+    @property
+    def directory(self):
+        return os.path.join(BATCH_DIR, self.id)
+
+    @property
+    def input_path(self):
+        return os.path.join(self.directory, 'input.' + self.format)
+
+    @property
+    def output_path(self):
+        return os.path.join(self.directory, 'result.' + self.format)
+
+    def save(self):
+        path = os.path.join(self.directory, 'status.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump({name: getattr(self, name) for name in self.FIELDS}, f)
+        os.replace(path + '.tmp', path) # Readers never see a half-written file
+
+    @classmethod
+    def load(cls, job_id):
+        """The job saved as ``job_id``, or None."""
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(BATCH_DIR, job_id, 'status.json')) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        job = cls(state['model'], state['format'], state['filename'], job_id)
+        for name in cls.FIELDS:
+            setattr(job, name, state[name])
+        return job
+
+    def progress(self):
+        if self.status == 'done':
+            return 1.0
+        return self.processed_bytes / self.total_bytes if self.total_bytes else 0.0
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'model': self.model,
+            'status': self.status,
+            'progress': self.progress(),
+            'rows': self.rows,
+            'error': self.error,
+        }
+
+
+def _process_csv(job, progress):
+    import pandas as pd
+
+    with open(job.input_path, 'rb') as f, open(job.output_path, 'w', newline='') as out:
+        header = True
+        for chunk in pd.read_csv(f, chunksize=CHUNK_ROWS):
+            evaluate(job.model, chunk).to_csv(out, header=header, index=False)
+            header = False
+            job.rows += len(chunk)
+            job.processed_bytes = f.tell()
+            job.save()
+            progress(job.progress())
+
+
+def _process_parquet(job, progress):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(job.input_path)
+    total_rows = source.metadata.num_rows or 1
+    writer = None
+    try:
+        for batch in source.iter_batches(batch_size=CHUNK_ROWS):
+            table = pa.Table.from_pandas(evaluate(job.model, batch.to_pandas()), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(job.output_path, table.schema)
+            writer.write_table(table)
+            job.rows += batch.num_rows
+            job.processed_bytes = job.total_bytes * job.rows / total_rows
+            job.save()
+            progress(job.progress())
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def run_job(job, progress=None):
+    """Processes ``job`` synchronously, recording its status.
+
+    ``progress(fraction)`` is called after every chunk; it may raise
+    :class:`jobs.Cancelled` to stop the job.
+    """
+    job.status = 'running'
+    job.save()
+    try:
+        if job.format == 'parquet':
+            _process_parquet(job, progress or (lambda fraction: None))
+        else:
+            _process_csv(job, progress or (lambda fraction: None))
+        job.status = 'done'
+    except Cancelled:
+        job.status = 'cancelled'
+    except Exception as exc: # Reported to the user through the job status
+        job.status = 'error'
+        job.error = str(exc)
+    finally:
+        job.finished_at = time.time()
+        job.save()
+        if os.path.exists(job.input_path):
+            os.remove(job.input_path)
+
+
+def expire_jobs(ttl=JOB_TTL):
+    """Removes the jobs that finished more than ``ttl`` seconds ago."""
+    if not os.path.isdir(BATCH_DIR):
+        return
+    now = time.time()
+    for job_id in os.listdir(BATCH_DIR):
+        job = Job.load(job_id)
+        if job is not None and job.finished_at and now - job.finished_at > ttl:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+
+def install_batch_routes(app, run=None):
+    """Adds the batch upload, status and download routes to the server of ``app``.
+
+    ``run(job)`` starts the processing of a job, e.g. ``functools.partial(pool.submit, run_job)``
+    with a :class:`jobs.JobPool`; by default in a daemon thread.
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix + 'batch/'
+
+    if run is None:
+        def run(job):
+            threading.Thread(target=run_job, args=(job,), daemon=True).start()
+
+    def _job(job_id):
+        job = Job.load(job_id)
+        if job is None:
+            abort(404)
+        return job
+
+    @server.route(prefix + '<model>', methods=['POST'])
+    def _upload(model):
+        if model not in MODELS:
+            abort(404)
+        expire_jobs()
+        filename = request.args.get('filename', 'casos.csv')
+        fmt = 'parquet' if filename.lower().endswith(('.parquet', '.pq')) else 'csv'
+        job = Job(model, fmt, filename)
+        os.makedirs(job.directory)
+        # Copy the body in blocks: the upload is never held in memory
+        with open(job.input_path, 'wb') as f:
+            shutil.copyfileobj(request.stream, f, COPY_BLOCK)
+        job.total_bytes = os.path.getsize(job.input_path)
+        job.status = 'queued'
+        job.save()
+        run(job)
+        return jsonify(job.to_dict()), 202
+
+    @server.route(prefix + 'jobs/<job_id>')
+    def _status(job_id):
+        return jsonify(_job(job_id).to_dict())
+
+    @server.route(prefix + 'jobs/<job_id>/result')
+    def _result(job_id):
+        job = _job(job_id)
+        if job.status != 'done':
+            abort(409)
+        stem = os.path.splitext(job.filename)[0]
+        return send_file(job.output_path, as_attachment=True, download_name=f"{stem}-resultados.{job.format}")
@@ -0,0 +1,199 @@
+"""Latency, allocation and payload benchmarks for the update_* callbacks.
+
+Each callback is measured three ways over a deterministic sweep of slider
+values:
+
+* ``call``: the Python function called directly (always builds the full figure),
+* ``http_initial``: a POST to /_dash-update-component as sent when a graph is first rendered,
+* ``http_update``: the same POST as sent when a slider moves (patch responses).
+
+Usage::
+
+    python benchmarks/bench_callbacks.py                         # print the results
+    python benchmarks/bench_callbacks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_callbacks.py --compare benchmarks/baseline.json
+
+With ``--compare`` the exit status is 1 when a p50 latency or a response size
+regresses by more than ``--tolerance`` against the baseline (latencies also by
+more than ``--min-delta-ms``). benchmarks/baseline.json holds the reference run.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from response_cache import callback_body # noqa: E402 (needs ROOT on sys.path)
+
+CALLBACKS = (
+    'update_pressure',
+    'update_hydraulic_press',
+    'update_archimedes',
+    'update_hydrostatic_pressure',
+    'update_continuity',
+    'update_torricelli',
+)
+
+
+def load_app(use_cache):
+    if not use_cache:
+        # Measure the callbacks, not the response cache
+        os.environ.setdefault('FLUIDOS_CACHE_MB', '0')
+    import fluidoscona
+    return fluidoscona
+
+
+def slider_values(app):
+    """All the values each slider (or other valued input) can take."""
+    values = {}
+    for component in (app.validation_layout or app.layout)._traverse():
+        component_id = getattr(component, 'id', None)
+        if component_id is None:
+            continue
+        if type(component).__name__ == 'Slider':
+            count = int(round((component.max - component.min) / component.step)) + 1
+            values[component_id] = [round(component.min + i * component.step, 10) for i in range(count)]
+        elif hasattr(component, 'value'):
+            values[component_id] = [component.value]
+    return values
+
+
+def find_callbacks(app):
+    """Maps every benchmarked function name to its (output, inputs) in the callback map."""
+    found = {}
+    for output, spec in app.callback_map.items():
+        name = getattr(spec.get('callback'), '__name__', None)
+        if name in CALLBACKS:
+            found[name] = (output, spec['inputs'])
+    return found
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {'p50_ms': pick(0.50) * 1000, 'p95_ms': pick(0.95) * 1000, 'p99_ms': pick(0.99) * 1000}
+
+
+def measure(run, cases):
+    """Times ``run(case)`` for each case, then measures its allocations in a second pass."""
+    timings = []
+    sizes = []
+    for case in cases:
+        start = time.perf_counter()
+        size = run(case)
+        timings.append(time.perf_counter() - start)
+        sizes.append(size or 0)
+
+    tracemalloc.start()
+    peaks = []
+    for case in cases[:min(len(cases), 50)]:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        run(case)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    result = percentiles(timings)
+    result['alloc_peak_kib'] = sum(peaks) / len(peaks) / 1024
+    result['response_bytes'] = sum(sizes) / len(sizes)
+    return result
+
+
+def run_benchmarks(samples, seed, use_cache):
+    module = load_app(use_cache)
+    app = module.create_app()
+    values = slider_values(app)
+    callbacks = find_callbacks(app)
+    client = app.server.test_client()
+    url = app.config.requests_pathname_prefix + '_dash-update-component'
+    rng = random.Random(seed)
+
+    results = {}
+    for name in CALLBACKS:
+        func = getattr(module, name)
+        output, inputs = callbacks[name]
+        cases = [[rng.choice(values[i['id']]) for i in inputs] for _ in range(samples)]
+
+        def call(case):
+            func(*case)
+
+        def post(case, changed):
+            response = client.post(url, json=callback_body(output, inputs, case, changed))
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {response.status_code}")
+            return len(response.get_data())
+
+        changed = [f"{inputs[0]['id']}.{inputs[0]['property']}"]
+        results[name] = {
+            'call': measure(call, cases),
+            'http_initial': measure(lambda case: post(case, []), cases),
+            'http_update': measure(lambda case: post(case, changed), cases),
+        }
+    return results
+
+
+def print_results(results):
+    header = f"{'callback':<28} {'mode':<13} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'alloc KiB':>10} {'bytes':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, modes in results.items():
+        for mode, r in modes.items():
+            print(f"{name:<28} {mode:<13} {r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+                  f"{r['alloc_peak_kib']:>10.1f} {r['response_bytes']:>8.0f}")
+
+
+def compare(results, baseline, tolerance, min_delta_ms=0.1):
+    """Returns the list of regressions of ``results`` against ``baseline``.
+
+    Latencies only regress when they also grow by more than ``min_delta_ms``:
+    below that, differences between runs are timer and scheduling noise.
+    """
+    regressions = []
+    for name, modes in results.items():
+        for mode, r in modes.items():
+            base = baseline.get(name, {}).get(mode)
+            if base is None:
+                continue
+            for metric, min_delta in (('p50_ms', min_delta_ms), ('response_bytes', 0)):
+                if base[metric] and r[metric] > base[metric] * (1 + tolerance) and r[metric] - base[metric] > min_delta:
+                    regressions.append(f"{name} {mode} {metric}: {base[metric]:.3f} -> {r[metric]:.3f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--samples', type=int, default=200, help="slider combinations per callback")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache', action='store_true', help="keep the response cache enabled")
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument('--min-delta-ms', type=float, default=0.1, help="latency increases below this are noise")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.samples, args.seed, args.cache)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
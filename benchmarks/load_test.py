@@ -0,0 +1,497 @@
+"""Concurrent load test of the dashboard: N simulated users on all the tabs.
+
+Each session behaves like a browser tab. It loads the page, the layout and the
+dependencies, opens tabs through the ``render_tab`` callback, sends the
+initial callback requests of every tab it renders and then replays slider
+drags against ``/_dash-update-component``: every intermediate value in
+``--drag drag`` mode (live-drag sliders), only the final one in ``--drag
+release`` mode (the default mouseup sliders). Client-side callbacks are
+left out, as a browser runs them itself.
+
+The server is started on a free local port (gunicorn through serve.py, or the
+threaded Flask server with ``--server dev``) unless ``--url`` points to one
+already running. Throughput, latency percentiles and errors are reported by
+request kind, with the CPU and peak RSS of every server process (Linux, or
+psutil elsewhere). Usage::
+
+    python benchmarks/load_test.py --sessions 50 --duration 60
+    python benchmarks/load_test.py --workers 8 --threads 2 --env FLUIDOS_CACHE_MB=0 --json no-cache.json
+    python benchmarks/load_test.py --server dev --sessions 10 --drag drag --env FLUIDOS_LIVE_DRAG=1
+    python benchmarks/load_test.py --url http://127.0.0.1:8050 --server-pid 1234 --sessions 100
+    python benchmarks/load_test.py --accept-encoding identity --json plain.json
+
+Sizes are counted as received: like a browser, sessions accept gzip (and
+brotli if the ``brotli`` package is installed) unless ``--accept-encoding``
+says otherwise.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UPDATE_PATH = '_dash-update-component'
+KINDS = ('page', 'layout', 'dependencies', 'render_tab', 'callback_initial', 'callback_update')
+
+
+# --- Statistics ---
+class Stats:
+    """Latencies, sizes and outcomes by request kind; mergeable across processes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.bytes = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(int)
+
+    def record(self, kind, seconds, status, size):
+        with self._lock:
+            self.latencies[kind].append(seconds)
+            self.bytes[kind] += size
+            self.statuses[str(status)] += 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[kind] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {'latencies': dict(self.latencies), 'bytes': dict(self.bytes),
+                    'errors': dict(self.errors), 'statuses': dict(self.statuses)}
+
+    def merge(self, other):
+        for kind, values in other['latencies'].items():
+            self.latencies[kind].extend(values)
+        for field in ('bytes', 'errors', 'statuses'):
+            for key, value in other[field].items():
+                getattr(self, field)[key] += value
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    return {'p50_ms': pick(0.50) * 1000, 'p95_ms': pick(0.95) * 1000, 'p99_ms': pick(0.99) * 1000}
+
+
+# --- Dash layout helpers ---
+def walk_components(node):
+    """Yields every component (``{'type', 'namespace', 'props'}``) in a serialized layout."""
+    if isinstance(node, list):
+        for item in node:
+            yield from walk_components(item)
+    elif isinstance(node, dict):
+        if 'props' in node and 'type' in node:
+            yield node
+            for value in node['props'].values():
+                yield from walk_components(value)
+
+
+def slider_grid(props):
+    step = props.get('step') or 1
+    count = int(round((props['max'] - props['min']) / step)) + 1
+    return [round(props['min'] + i * step, 10) for i in range(count)]
+
+
+# --- Simulated user ---
+class Session:
+    def __init__(self, base_url, stats, rng, think_time, drag, drag_interval, tab_switch, accept_encoding):
+        url = urllib.parse.urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.prefix = url.path.rstrip('/') + '/'
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.drag = drag
+        self.drag_interval = drag_interval
+        self.tab_switch = tab_switch
+        self.accept_encoding = accept_encoding
+        self.connection = None
+        self.props = {} # component id -> props
+        self.callbacks = []
+        self.initialized = set()
+
+    def request(self, kind, method, path, body=None):
+        """Sends one request and records it; returns the decoded JSON body, or None."""
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data else {}
+        headers['Accept-Encoding'] = self.accept_encoding
+        start = time.perf_counter()
+        for attempt in (0, 1):
+            try:
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                self.connection.request(method, self.prefix + path, body=data, headers=headers)
+                response = self.connection.getresponse()
+                payload = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError) as exc:
+                self.connection = None
+                if attempt:
+                    self.stats.record(kind, time.perf_counter() - start, type(exc).__name__, 0)
+                    return None
+        self.stats.record(kind, time.perf_counter() - start, response.status, len(payload))
+        if response.status != 200 or not payload or 'json' not in (response.getheader('Content-Type') or ''):
+            return None
+        encoding = response.getheader('Content-Encoding')
+        if encoding == 'gzip':
+            payload = gzip.decompress(payload)
+        elif encoding == 'br':
+            payload = brotli.decompress(payload)
+        return json.loads(payload)
+
+    def value(self, item):
+        return self.props.get(item['id'], {}).get(item['property'])
+
+    def callback_body(self, callback, changed):
+        return {
+            'output': callback['output'],
+            'outputs': callback['outputs'],
+            'inputs': [dict(item, value=self.value(item)) for item in callback['inputs']],
+            'state': [dict(item, value=self.value(item)) for item in callback['state']],
+            'changedPropIds': changed,
+        }
+
+    def apply(self, result):
+        """Stores the non-figure outputs of a callback response (figures are never inputs)."""
+        for component_id, props in (result or {}).get('response', {}).items():
+            for prop, value in props.items():
+                if prop != 'figure':
+                    self.props.setdefault(component_id, {})[prop] = value
+                if prop == 'children':
+                    self.add_components(value)
+
+    def add_components(self, tree):
+        for component in walk_components(tree):
+            component_id = component['props'].get('id')
+            if isinstance(component_id, str):
+                self.props[component_id] = dict(component['props'])
+
+    def fire(self, callback, changed, kind):
+        self.apply(self.request(kind, 'POST', UPDATE_PATH, self.callback_body(callback, changed)))
+
+    def initial_calls(self):
+        """Initial requests of the callbacks whose components have all been rendered."""
+        for index, callback in enumerate(self.callbacks):
+            if index in self.initialized or not all(item['id'] in self.props for item in callback['inputs']):
+                continue
+            self.initialized.add(index)
+            if not callback['prevent_initial_call']:
+                self.fire(callback, [], 'callback_initial')
+
+    def load(self):
+        self.request('page', 'GET', '')
+        layout = self.request('layout', 'GET', '_dash-layout')
+        dependencies = self.request('dependencies', 'GET', '_dash-dependencies') or []
+        self.add_components(layout)
+        for spec in dependencies:
+            if spec.get('clientside_function') or any(isinstance(item['id'], dict) or item['id'].startswith('{') for item in spec['inputs']):
+                continue
+            outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in spec['output'].strip('.').split('...')]
+            self.callbacks.append({
+                'output': spec['output'],
+                'outputs': outputs if len(outputs) > 1 else outputs[0],
+                'inputs': spec['inputs'],
+                'state': spec['state'],
+                'prevent_initial_call': spec.get('prevent_initial_call', False),
+            })
+        self.initial_calls() # render_tab for the active tab, which renders it
+
+    def switch_tab(self):
+        tabs = [c['props']['tab_id'] for c in walk_components({'type': 'Tabs', 'namespace': '', 'props': self.props.get('tabs', {})})
+                if c['type'] == 'Tab' and 'tab_id' in c['props']]
+        if not tabs:
+            return
+        self.props['tabs']['active_tab'] = self.rng.choice(tabs)
+        render = next((c for c in self.callbacks if c['inputs'][0]['id'] == 'tabs'), None)
+        if render is not None:
+            self.fire(render, ['tabs.active_tab'], 'render_tab')
+        self.initial_calls()
+
+    def drag_slider(self, deadline):
+        tab = self.props.get('tabs', {}).get('active_tab', '')
+        content = self.props.get(f'{tab}-content', {}).get('children')
+        sliders = [c['props'] for c in walk_components(content) if c['type'] == 'Slider' and 'id' in c['props']]
+        if not sliders:
+            return
+        slider = self.rng.choice(sliders)
+        grid = slider_grid(slider)
+        current = self.props[slider['id']].get('value', grid[0])
+        start = min(range(len(grid)), key=lambda i: abs(grid[i] - (current or 0)))
+        end = self.rng.randrange(len(grid))
+        step = 1 if end >= start else -1
+        path = [grid[i] for i in range(start + step, end + step, step)] if end != start else []
+        if self.drag == 'release':
+            path = path[-1:]
+        triggered = [c for c in self.callbacks if any(item['id'] == slider['id'] and item['property'] == 'value' for item in c['inputs'])]
+        for value in path:
+            self.props[slider['id']]['value'] = value
+            for callback in triggered:
+                self.fire(callback, [f"{slider['id']}.value"], 'callback_update')
+            if time.monotonic() > deadline:
+                return
+            time.sleep(self.drag_interval)
+
+    def run(self, deadline):
+        self.load()
+        while time.monotonic() < deadline:
+            if self.rng.random() < self.tab_switch:
+                self.switch_tab()
+            else:
+                self.drag_slider(deadline)
+            time.sleep(min(self.rng.expovariate(1 / self.think_time), max(deadline - time.monotonic(), 0)))
+
+
+def run_sessions(args):
+    """Runs a share of the sessions in this process; returns its statistics."""
+    base_url, first, count, settings = args
+    stats = Stats()
+    deadline = time.monotonic() + settings['ramp'] + settings['duration']
+    threads = []
+    for i in range(first, first + count):
+        session = Session(base_url, stats, random.Random(settings['seed'] + i), settings['think_time'],
+                          settings['drag'], settings['drag_interval'], settings['tab_switch'], settings['accept_encoding'])
+        delay = settings['ramp'] * i / max(settings['sessions'], 1)
+        thread = threading.Thread(target=lambda s=session, d=delay: (time.sleep(d), s.run(deadline)), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return stats.to_dict()
+
+
+# --- Server processes ---
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, port):
+    env = dict(os.environ)
+    for assignment in args.env:
+        key, _, value = assignment.partition('=')
+        env[key] = value
+    if args.server == 'gunicorn':
+        command = [sys.executable, 'serve.py', '--bind', f'127.0.0.1:{port}',
+                   '--workers', str(args.workers), '--threads', str(args.threads)]
+    else:
+        command = [sys.executable, '-c',
+                   f"import fluidoscona; fluidoscona.create_app().run(host='127.0.0.1', port={port}, debug=False, threaded=True)"]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited during startup:\n{process.stderr.read().decode(errors='replace')}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/_dash-layout')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise SystemExit(f"Server not ready after {args.startup_timeout} s")
+
+
+class ProcessSampler:
+    """Samples CPU time and RSS of a process tree once per second."""
+
+    def __init__(self, root_pid, interval=1.0):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.first = {} # pid -> (cpu seconds, time)
+        self.last = {}
+        self.peak_rss = defaultdict(int)
+        self.commands = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        self._psutil = psutil
+
+    def _tree(self):
+        if self._psutil is not None:
+            try:
+                root = self._psutil.Process(self.root_pid)
+                return [root] + root.children(recursive=True)
+            except self._psutil.Error:
+                return []
+        parents = {}
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                try:
+                    with open(f'/proc/{entry}/stat') as f:
+                        parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+                except OSError:
+                    continue
+        tree, frontier = [self.root_pid], [self.root_pid]
+        while frontier:
+            frontier = [pid for pid, parent in parents.items() if parent in frontier]
+            tree.extend(frontier)
+        return tree
+
+    def _sample(self, process):
+        """(pid, cpu seconds, rss bytes, command) of a psutil process or a pid."""
+        if self._psutil is not None:
+            times = process.cpu_times()
+            return process.pid, times.user + times.system, process.memory_info().rss, ' '.join(process.cmdline())
+        with open(f'/proc/{process}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{process}/cmdline', 'rb') as f:
+            command = f.read().replace(b'\0', b' ').decode(errors='replace').strip()
+        ticks = os.sysconf('SC_CLK_TCK')
+        return process, (int(fields[11]) + int(fields[12])) / ticks, int(fields[21]) * os.sysconf('SC_PAGE_SIZE'), command
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for process in self._tree():
+                try:
+                    pid, cpu, rss, command = self._sample(process)
+                except Exception: # The process exited between listing and sampling
+                    continue
+                self.first.setdefault(pid, (cpu, now))
+                self.last[pid] = (cpu, now)
+                self.peak_rss[pid] = max(self.peak_rss[pid], rss)
+                self.commands[pid] = command
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self):
+        rows = []
+        for pid, (cpu, t) in sorted(self.last.items()):
+            cpu0, t0 = self.first[pid]
+            rows.append({'pid': pid, 'cpu_percent': 100 * (cpu - cpu0) / (t - t0) if t > t0 else 0.0,
+                         'peak_rss_mib': self.peak_rss[pid] / 2**20, 'command': self.commands[pid][:60]})
+        return rows
+
+
+# --- Report ---
+def summarize(stats, elapsed, processes):
+    kinds = {}
+    for kind in KINDS + tuple(k for k in stats.latencies if k not in KINDS):
+        samples = stats.latencies.get(kind, [])
+        if not samples:
+            continue
+        kinds[kind] = dict(percentiles(samples), requests=len(samples), errors=stats.errors.get(kind, 0),
+                           rps=len(samples) / elapsed, avg_bytes=stats.bytes[kind] / len(samples))
+    total = sum(len(v) for v in stats.latencies.values())
+    return {
+        'elapsed_s': elapsed,
+        'requests': total,
+        'rps': total / elapsed if elapsed else 0.0,
+        'error_rate': sum(stats.errors.values()) / total if total else 0.0,
+        'statuses': dict(stats.statuses),
+        'kinds': kinds,
+        'processes': processes,
+    }
+
+
+def print_summary(summary):
+    header = f"{'kind':<18} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'avg bytes':>10}"
+    print(header)
+    print('-' * len(header))
+    for kind, r in summary['kinds'].items():
+        print(f"{kind:<18} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['avg_bytes']:>10.0f}")
+    print(f"\n{summary['requests']} requests in {summary['elapsed_s']:.1f} s: {summary['rps']:.1f} req/s, "
+          f"error rate {summary['error_rate']:.2%}, statuses {summary['statuses']}")
+    if summary['processes']:
+        print(f"\n{'pid':>7} {'cpu %':>7} {'peak RSS MiB':>13}  command")
+        for p in summary['processes']:
+            print(f"{p['pid']:>7} {p['cpu_percent']:>7.1f} {p['peak_rss_mib']:>13.1f}  {p['command']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--url', help="test a running server instead of starting one")
+    parser.add_argument('--server-pid', type=int, help="with --url: root process to sample CPU/RSS from")
+    parser.add_argument('--server', choices=('gunicorn', 'dev'), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help="environment of the started server")
+    parser.add_argument('--startup-timeout', type=float, default=120)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30, help="seconds of full load, after the ramp-up")
+    parser.add_argument('--ramp', type=float, default=5, help="seconds over which the sessions start")
+    parser.add_argument('--think-time', type=float, default=1.0, help="mean pause between user actions, s")
+    parser.add_argument('--drag', choices=('release', 'drag'), default='release')
+    parser.add_argument('--drag-interval', type=float, default=0.05, help="s between the steps of a drag")
+    parser.add_argument('--accept-encoding', default='gzip, br' if brotli is not None else 'gzip',
+                        help="Accept-Encoding header of the sessions ('identity' for uncompressed responses)")
+    parser.add_argument('--tab-switch', type=float, default=0.15, help="probability that an action is a tab switch")
+    parser.add_argument('--processes', type=int, default=1, help="load generator processes (beat the GIL with many sessions)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help="save the summary")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        base_url, root_pid = args.url, args.server_pid
+    else:
+        port = free_port()
+        server = start_server(args, port)
+        base_url, root_pid = f'http://127.0.0.1:{port}/', server.pid
+
+    sampler = ProcessSampler(root_pid) if root_pid else None
+    settings = {key: getattr(args, key) for key in ('ramp', 'duration', 'seed', 'think_time', 'drag', 'drag_interval', 'tab_switch', 'sessions',
+                                           'accept_encoding')}
+    shares = [(base_url, i * args.sessions // args.processes, (i + 1) * args.sessions // args.processes - i * args.sessions // args.processes, settings)
+              for i in range(args.processes)]
+    stats = Stats()
+    try:
+        if sampler:
+            sampler.start()
+        start = time.monotonic()
+        if args.processes == 1:
+            stats.merge(run_sessions(shares[0]))
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                for result in pool.map(run_sessions, shares):
+                    stats.merge(result)
+        elapsed = time.monotonic() - start
+    finally:
+        if sampler:
+            sampler.stop()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = summarize(stats, elapsed, sampler.report() if sampler else [])
+    summary['settings'] = dict(vars(args))
+    print_summary(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+    return 1 if summary['error_rate'] > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
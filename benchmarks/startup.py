@@ -0,0 +1,139 @@
+"""Cold-start budget: time from launching the interpreter until the app can serve.
+
+Every sample launches a fresh interpreter and times five stages in a row:
+
+* ``interpreter``: from the launch until this script starts running,
+* ``framework``: importing dash and flask as fluidoscona does (without IPython),
+* ``import``: the rest of ``import fluidoscona``, e.g. numpy and the app's modules,
+* ``create_app``: building the Dash app, its routes, layout and caches,
+* ``first_request``: the first ``/_dash-layout`` request, through the test client.
+
+The dashboard's own share of the cold start, from the end of the framework
+import to the first response, must stay within ``APP_SHARE_BUDGET`` times the
+framework import measured in the same process: a ratio holds on slower
+machines, where absolute times do not. Absolute budgets from the launch can
+be given on the command line. Modules listed in ``DEFERRED_MODULES`` must not
+be loaded by any of the stages, and those in ``DEFERRED_AT_IMPORT`` not by the
+import: they are imported by the functions that need them. test_startup.py
+runs the same check under pytest. Usage::
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --samples 10 --ready-budget-ms 1200 --json startup.json
+
+The exit status is 1 when a budget is exceeded or a deferred module is loaded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = ('interpreter', 'framework', 'import', 'create_app', 'first_request')
+DEFERRED_MODULES = ('pandas', 'scipy', 'plotly.subplots', 'pyarrow', 'IPython')
+DEFERRED_AT_IMPORT = ('dash_bootstrap_components',)
+APP_SHARE_BUDGET = 1.0 # Dashboard time until the first response, per unit of framework import time
+
+
+def probe():
+    """Runs in the child interpreter: prints the wall-clock end of every stage and the deferred modules loaded."""
+    ends = {'interpreter': time.time()}
+    sys.modules['IPython'] = None # As fluidoscona imports dash (see there)
+    import dash # noqa: F401
+    import flask # noqa: F401
+    del sys.modules['IPython']
+    ends['framework'] = time.time()
+    import fluidoscona
+    ends['import'] = time.time()
+    loaded = [name for name in DEFERRED_AT_IMPORT if name in sys.modules]
+
+    app = fluidoscona.create_app()
+    ends['create_app'] = time.time()
+    response = app.server.test_client().get(app.config.requests_pathname_prefix + '_dash-layout')
+    if response.status_code != 200:
+        raise SystemExit(f"/_dash-layout answered {response.status_code}")
+    ends['first_request'] = time.time()
+    loaded += [name for name in DEFERRED_MODULES if name in sys.modules]
+    print(json.dumps({'ends': ends, 'loaded': loaded}))
+
+
+def sample(env):
+    """Times of one fresh interpreter: ``{'timings': {stage: s}, 'since_launch': {stage: s}, 'loaded': [...]}``."""
+    launched = time.time()
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--probe'], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    since_launch = {stage: result['ends'][stage] - launched for stage in STAGES}
+    previous = [0.0] + [since_launch[stage] for stage in STAGES[:-1]]
+    timings = {stage: since_launch[stage] - start for stage, start in zip(STAGES, previous)}
+    return {'timings': timings, 'since_launch': since_launch, 'loaded': result['loaded']}
+
+
+def run_samples(samples, env):
+    """Median time of every stage over ``samples`` fresh interpreters, in ms."""
+    results = [sample(env) for _ in range(samples)]
+    medians = {stage: statistics.median(r['timings'][stage] for r in results) * 1000 for stage in STAGES}
+    return {
+        'samples': samples,
+        'medians_ms': medians,
+        'import_ms': statistics.median(r['since_launch']['import'] for r in results) * 1000,
+        'ready_ms': statistics.median(r['since_launch']['first_request'] for r in results) * 1000,
+        'app_share': statistics.median(
+            (r['since_launch']['first_request'] - r['since_launch']['framework']) / r['timings']['framework'] for r in results),
+        'deferred_loaded': sorted({name for r in results for name in r['loaded']}),
+    }
+
+
+def check(result, app_share_budget=APP_SHARE_BUDGET, import_budget_ms=None, ready_budget_ms=None):
+    failures = []
+    if result['app_share'] > app_share_budget:
+        failures.append(f"the dashboard takes {result['app_share']:.2f} times the framework import to serve (budget {app_share_budget:g})")
+    if import_budget_ms is not None and result['import_ms'] > import_budget_ms:
+        failures.append(f"fluidoscona is imported {result['import_ms']:.0f} ms after the launch (budget {import_budget_ms:.0f} ms)")
+    if ready_budget_ms is not None and result['ready_ms'] > ready_budget_ms:
+        failures.append(f"the first response comes {result['ready_ms']:.0f} ms after the launch (budget {ready_budget_ms:.0f} ms)")
+    if result['deferred_loaded']:
+        failures.append(f"modules loaded at startup instead of on demand: {', '.join(result['deferred_loaded'])}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--samples', type=int, default=5, help="fresh interpreters")
+    parser.add_argument('--app-share-budget', type=float, default=APP_SHARE_BUDGET,
+                        help="allowed dashboard time until the first response, in framework import times")
+    parser.add_argument('--import-budget-ms', type=float, help="allowed time from the launch to the end of the import")
+    parser.add_argument('--ready-budget-ms', type=float, help="allowed time from the launch to the first response")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help="environment of the measured processes")
+    parser.add_argument('--json', metavar='PATH', help="save the results")
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        probe()
+        return 0
+
+    env = dict(os.environ, FLUIDOS_CACHE_WARMUP='0')
+    env.update(item.split('=', 1) for item in args.env)
+    result = run_samples(args.samples, env)
+    print(f"{'stage':<16} {'median ms':>10}")
+    for stage, value in result['medians_ms'].items():
+        print(f"{stage:<16} {value:>10.1f}")
+    print(f"{'ready':<16} {result['ready_ms']:>10.1f}")
+    print(f"dashboard share: {result['app_share']:.2f} × framework import")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+    failures = check(result, args.app_share_budget, args.import_budget_ms, args.ready_budget_ms)
+    for line in failures:
+        print(f"OVER BUDGET {line}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Server side of live slider drags: drops callback requests superseded by newer ones.
+
+While a slider is dragged, assets/coalesce.js sends at most one request per
+output every few milliseconds and tags each one with the page session and an
+increasing sequence number (``X-Fluidos-Session`` / ``X-Fluidos-Seq``). The
+server remembers the latest number seen for every session and output: a
+request that is already older when a worker picks it up, or whose response is
+ready only after a newer request arrived, is answered with 204 No Content,
+which Dash treats as "no update". The bookkeeping is per process.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import Response, g, request
+
+SESSION_HEADER = 'X-Fluidos-Session'
+SEQ_HEADER = 'X-Fluidos-Seq'
+
+
+class LatestRequests:
+    """Latest sequence number per (session, output), bounded in size."""
+
+    def __init__(self, max_entries=50_000):
+        self.max_entries = max_entries
+        self._latest = OrderedDict()
+        self._lock = threading.Lock()
+
+    def arrive(self, key, seq):
+        """Records request ``seq`` of ``key``; False if a newer one has already arrived."""
+        with self._lock:
+            if self._latest.get(key, -1) > seq:
+                return False
+            self._latest[key] = seq
+            self._latest.move_to_end(key)
+            while len(self._latest) > self.max_entries:
+                self._latest.popitem(last=False)
+            return True
+
+    def is_latest(self, key, seq):
+        with self._lock:
+            return self._latest.get(key, seq) <= seq
+
+
+def install_coalescing(app, metrics=None, latest=None):
+    """Answers superseded tagged ``/_dash-update-component`` requests of ``app`` with 204.
+
+    Install it after the metrics and before the response cache, so that dropped
+    requests are still timed and finished responses are still cached.
+    """
+    server = app.server
+    update_path = app.config.routes_pathname_prefix + '_dash-update-component'
+    latest = latest or LatestRequests()
+
+    def superseded(stage):
+        if metrics is not None:
+            metrics.inc('fluidos_superseded_total', stage=stage)
+        return Response(status=204)
+
+    @server.before_request
+    def _drop_queued():
+        if request.path != update_path or SEQ_HEADER not in request.headers:
+            return None
+        try:
+            seq = int(request.headers[SEQ_HEADER])
+            key = (request.headers.get(SESSION_HEADER, ''), request.get_json()['output'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not latest.arrive(key, seq):
+            return superseded('queued')
+        g.coalesce_request = (key, seq)
+        return None
+
+    @server.after_request
+    def _drop_computed(response):
+        tagged = g.pop('coalesce_request', None)
+        if tagged is not None and response.status_code == 200 and not latest.is_latest(*tagged):
+            return superseded('computed')
+        return response
@@ -0,0 +1,145 @@
+"""Compressed transport: gzip or brotli responses, and immutable caching of versioned assets.
+
+``install_compression`` negotiates the encoding from ``Accept-Encoding``
+(brotli when the ``brotli`` package is installed and the browser accepts it,
+gzip otherwise) and compresses text responses above a size threshold that
+can be set per route: small patches of a slider update gain little and would
+only pay the CPU cost. Component bundles and assets requested with Dash's
+version query (``?v=`` / ``?m=``) never change at that URL, so they are sent
+with ``Cache-Control: immutable`` and their compressed bytes are kept in
+memory. The CPU time spent compressing is exposed as a metric to tune the
+levels against throughput.
+"""
+import gzip
+import threading
+import time
+from collections import OrderedDict
+
+from dash.fingerprint import check_fingerprint
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'application/x-javascript',
+                'application/xml', 'image/svg+xml')
+# Minimum size in bytes per route (path prefix after the Dash prefix); None never compresses
+DEFAULT_ROUTES = {
+    '_dash-update-component': 1024,
+    '_dash-component-suites/': 256,
+    'assets/': 256,
+    'batch/': None, # Result files are streamed from disk
+}
+VERSIONED_ROUTES = ('_dash-component-suites/', 'assets/', '_favicon.ico') # By fingerprint or ?v=/?m= query
+IMMUTABLE_MAX_AGE = 31536000 # One year
+MAX_BUFFERED_BYTES = 16 * 2**20 # File responses larger than this are sent as they are
+
+
+def parse_routes(spec):
+    """Parses ``"prefix=bytes,prefix=off,..."`` (as in ``FLUIDOS_COMPRESS_ROUTES``) into a routes dict."""
+    routes = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        prefix, _, value = item.partition('=')
+        routes[prefix.strip()] = None if value.strip() in ('off', 'none', '') else int(value)
+    return routes
+
+
+class CompressedCache:
+    """Compressed bodies of immutable responses, by URL and encoding, bounded in bytes."""
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def install_compression(app, metrics=None, routes=None, min_bytes=1024, gzip_level=6, brotli_quality=4):
+    """Compresses the responses of ``app`` and marks its versioned assets immutable.
+
+    ``routes`` overrides ``DEFAULT_ROUTES``; paths matching no prefix use
+    ``min_bytes``. Install it after the metrics and before the response cache,
+    so that the cache stores plain bodies and the metrics see the sent sizes.
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+    rules = dict(DEFAULT_ROUTES, **(routes or {}))
+    # Longest prefix first
+    rules = sorted(((prefix + route, threshold) for route, threshold in rules.items()), key=lambda r: -len(r[0]))
+    versioned = tuple(prefix + route for route in VERSIONED_ROUTES)
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    cache = CompressedCache()
+
+    def route_of(path):
+        for route, threshold in rules:
+            if path.startswith(route):
+                return route[len(prefix):], threshold
+        return 'other', min_bytes
+
+    @server.after_request
+    def _compress(response):
+        path = request.path
+        immutable = (request.method == 'GET' and response.status_code == 200 and path.startswith(versioned)
+                     and ('v' in request.args or 'm' in request.args or check_fingerprint(path)[1]))
+        if immutable:
+            response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+
+        route, threshold = route_of(path)
+        if (threshold is None or response.status_code != 200 or 'Content-Encoding' in response.headers
+                or not response.mimetype or not response.mimetype.startswith(COMPRESSIBLE)):
+            return response
+        if response.direct_passthrough or response.is_streamed:
+            # Files (e.g. assets) are read into memory only when small enough
+            if response.content_length is None or response.content_length > MAX_BUFFERED_BYTES:
+                return response
+            response.direct_passthrough = False
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(encodings)
+        data = response.get_data()
+        if encoding is None or len(data) < threshold:
+            return response
+
+        key = (request.full_path, encoding)
+        body = cache.get(key) if immutable else None
+        if body is None:
+            start = time.thread_time()
+            body = compress(data, encoding, gzip_level, brotli_quality)
+            if metrics is not None:
+                metrics.observe('fluidos_compression_seconds', time.thread_time() - start, encoding=encoding, route=route)
+                metrics.inc('fluidos_compression_bytes_total', len(data), encoding=encoding, route=route, stage='in')
+                metrics.inc('fluidos_compression_bytes_total', len(body), encoding=encoding, route=route, stage='out')
+            if immutable:
+                cache.put(key, body)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
@@ -0,0 +1,21 @@
+"""Shared test setup: the dashboard reads its FLUIDOS_* settings when fluidoscona is imported."""
+import os
+
+import pytest
+
+# Heavy callbacks run inside the request and nothing is precomputed at startup
+os.environ.setdefault('FLUIDOS_JOB_WORKERS', '0')
+os.environ.setdefault('FLUIDOS_CACHE_WARMUP', '0')
+# Every request reaches its callback (test_response_cache.py covers the cache on its own app)
+os.environ.setdefault('FLUIDOS_CACHE_MB', '0')
+
+
+@pytest.fixture(scope='session')
+def app():
+    import fluidoscona
+    return fluidoscona.create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.server.test_client()
@@ -0,0 +1,45 @@
+"""Shape-preserving downsampling of long series before they are sent to the browser."""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest of the series is split
+    into ``n_out - 2`` buckets and from each one the point forming the largest
+    triangle with the previously kept point and the average of the next bucket
+    is chosen. Peaks and kinks survive while the output size stays ``n_out``.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Next-bucket averages for every bucket, computed at once from cumulative sums
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    avg_x = (cx[next_end] - cx[next_start]) / counts
+    avg_y = (cy[next_end] - cy[next_start]) / counts
+
+    indices = np.empty(n_out, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def lttb(x, y, n_out):
+    """Downsamples ``(x, y)`` to ``n_out`` points with :func:`lttb_indices`."""
+    indices = lttb_indices(x, y, n_out)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
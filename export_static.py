@@ -0,0 +1,430 @@
+"""Static export of the fluids dashboard, for hosting on a CDN or any static file server.
+
+    python export_static.py --out site --budget-mb 100
+    python -m http.server --directory site 8000
+
+Every input of the exported tabs is a slider with a finite grid, a choice
+among options, or a free value (number fields, the layers table). Each server
+callback is evaluated through the app's own Flask test client for every
+combination of slider ticks and options, at the default of the free values,
+and the responses are written as sharded lookup tables under ``static/``:
+an update is stored as the ``dash.Patch`` the app sends anyway, and the full
+figure of the default combination once per callback. Callbacks whose table
+would not fit their share of ``--budget-mb`` are exported on evenly spaced
+subsets of their slider grids, and then of their options; the browser shows
+the nearest exported tick, and a "not available offline" message for an
+option left out. A callback that does not fit even with its default inputs
+alone is left out entirely and shows that message for every input.
+
+In the exported page assets/static_export.js answers the Dash requests from
+those files. When a free value differs from its default, it computes the
+response client-side if the callback has a fallback there (Torricelli with
+any g, the stratified column with any table), and leaves the outputs
+unchanged otherwise. Parts that need a server (batch files, sweeps, mesh
+uploads) are left out of the export.
+"""
+import argparse
+import copy
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import time
+
+from plotly.io.json import to_json_plotly
+
+from response_cache import callback_body, quantize
+
+# The exported app runs without a server: no background jobs, response cache or drag coalescing
+STATIC_ENV = {
+    'FLUIDOS_LIVE_DRAG': '0',
+    'FLUIDOS_JOB_WORKERS': '0',
+    'FLUIDOS_CACHE_MB': '0',
+    'FLUIDOS_CACHE_WARMUP': '0',
+    'FLUIDOS_PROFILE_RATE': '0',
+    'FLUIDOS_COMPRESS': '0', # Static hosts compress the files themselves
+}
+SERVER_ONLY_TABS = {'tab-batch'}
+SERVER_ONLY_COMPONENTS = {'archimedes-mesh-upload', 'archimedes-mesh-status'} # Plus the sweep accordions
+SERVER_ONLY_OPTIONS = {'archimedes-shape': {'mesh'}}
+PROBE_SAMPLES = 8 # Random combinations evaluated to estimate the size of a table
+UPDATE_PATH = '_dash-update-component'
+
+
+# --- Static layout ---
+def _prune(component, ids):
+    """Removes the components with an id in ``ids`` from the tree below ``component``."""
+    children = getattr(component, 'children', None)
+    if isinstance(children, (list, tuple)):
+        component.children = [child for child in children if getattr(child, 'id', None) not in ids]
+        children = component.children
+    else:
+        children = [children] if children is not None else []
+    for child in children:
+        if hasattr(child, '_traverse'):
+            _prune(child, ids)
+
+
+def static_layout(app_module):
+    """The app layout with every exported tab already rendered and the server-only parts removed."""
+    layout = copy.deepcopy(app_module.app.layout)
+    components = {getattr(c, 'id', None): c for c in layout._traverse()}
+    tabs = components['tabs']
+    tabs.children = [tab for tab in tabs.children if tab.tab_id not in SERVER_ONLY_TABS]
+    removed = SERVER_ONLY_COMPONENTS | {f'{tab}-sweep-accordion' for tab in app_module.sweeps.SWEEPS}
+    for tab_id, _, build_tab in app_module.TABS:
+        if tab_id in SERVER_ONLY_TABS:
+            continue
+        content = build_tab()
+        _prune(content, removed)
+        for component in content._traverse():
+            excluded = SERVER_ONLY_OPTIONS.get(getattr(component, 'id', None))
+            if excluded:
+                component.options = [o for o in component.options if _option_value(o) not in excluded]
+        components[f'{tab_id}-content'].children = content
+    return layout
+
+
+def _option_value(option):
+    return option['value'] if isinstance(option, dict) else option
+
+
+# --- Lookup tables ---
+class CallbackPlan:
+    """Inputs of one server callback and the values of each that are exported."""
+
+    def __init__(self, spec, name, components):
+        self.output = spec['output']
+        self.name = name
+        self.inputs = spec['inputs']
+        self.state = [dict(item, value=_default(components, item)) for item in spec['state']]
+        self.kinds, self.choices, self.defaults = [], [], []
+        for item in self.inputs:
+            kind, choices = _input_choices(components[item['id']], item['property'])
+            default = _default(components, item)
+            self.kinds.append(kind)
+            self.choices.append(choices)
+            self.defaults.append(_nearest(choices, default) if kind == 'grid' else choices.index(default) if default in choices else 0)
+        self.full_count = math.prod(len(c) for c in self.choices)
+        self.directory = ''
+        self.per_shard = 1
+        self.entry_bytes = 0.0
+        self.base_bytes = 0
+        self.exported = True
+
+    @property
+    def count(self):
+        return math.prod(len(c) for c in self.choices)
+
+    @property
+    def default_flat(self):
+        flat = 0
+        for choices, k in zip(self.choices, self.defaults):
+            flat = flat * len(choices) + k
+        return flat
+
+    def values_at(self, flat):
+        """Input values of combination ``flat``, in ``itertools.product`` order (the last input varies fastest)."""
+        values = []
+        for choices in reversed(self.choices):
+            flat, k = divmod(flat, len(choices))
+            values.append(choices[k])
+        return values[::-1]
+
+    def body(self, values, initial):
+        """``/_dash-update-component`` request; updates mark every input as changed, so their patches cover every input."""
+        changed = [] if initial else [f"{item['id']}.{item['property']}" for item in self.inputs]
+        return callback_body(self.output, self.inputs, values, changed, self.state)
+
+    def thin(self, target):
+        """Keeps evenly spaced subsets of the inputs so that at most ``target`` combinations remain.
+
+        The slider grids go down to two ticks first, then the options down to
+        the default one, then the grids down to their default tick. Returns
+        False if even the default combination alone is over ``target``.
+        """
+        sizes = [len(c) for c in self.choices]
+        for kind, smallest in (('grid', 2), ('choice', 1), ('grid', 1)):
+            while math.prod(sizes) > target:
+                reducible = [i for i, k in enumerate(self.kinds) if k == kind and sizes[i] > smallest]
+                if not reducible:
+                    break
+                largest = max(reducible, key=lambda i: sizes[i])
+                sizes[largest] = max(smallest, sizes[largest] * 3 // 4)
+        for i, size in enumerate(sizes):
+            n = len(self.choices[i])
+            if size < n:
+                keep = {round(j * (n - 1) / (size - 1)) for j in range(size)} if size > 1 else {0}
+                if self.defaults[i] not in keep:
+                    # The default takes the place of its nearest kept value: the size stays as planned
+                    keep.remove(min(keep, key=lambda j: abs(j - self.defaults[i])))
+                    keep.add(self.defaults[i])
+                keep = sorted(keep)
+                self.defaults[i] = keep.index(self.defaults[i])
+                self.choices[i] = [self.choices[i][j] for j in keep]
+        return self.count <= target
+
+    def index_entry(self):
+        if not self.exported:
+            return {'name': self.name, 'unavailable': True}
+        return {
+            'name': self.name,
+            'dir': self.directory,
+            'inputs': [dict(item, kind=kind, values=choices) for item, kind, choices in zip(self.inputs, self.kinds, self.choices)],
+            'default': self.default_flat,
+            'per_shard': self.per_shard,
+            'count': self.count,
+        }
+
+
+def _default(components, item):
+    return getattr(components[item['id']], item['property'], None)
+
+
+def _input_choices(component, prop):
+    """(kind, values) of an input: every tick of a slider, every option of a choice, or just its default."""
+    kind = type(component).__name__
+    if kind == 'Slider' and prop == 'value':
+        step = component.step or 1
+        count = int(round((component.max - component.min) / step)) + 1
+        return 'grid', [quantize(component.min + i * step, (component.min, step)) for i in range(count)]
+    if prop == 'value' and getattr(component, 'options', None):
+        options = component.options
+        values = list(options) if isinstance(options, dict) else [_option_value(o) for o in options]
+        return 'choice', values
+    return 'fixed', [getattr(component, prop, None)]
+
+
+def _nearest(values, value):
+    if value is None:
+        return 0
+    return min(range(len(values)), key=lambda i: abs(values[i] - value))
+
+
+def _assign_only(data):
+    """True if every ``dash.Patch`` in a response only assigns values (the runtime applies no other operation)."""
+    for props in data.get('response', {}).values():
+        for value in props.values():
+            if isinstance(value, dict) and '__dash_patch_update' in value:
+                if any(op['operation'] != 'Assign' for op in value['operations']):
+                    return False
+    return True
+
+
+def evaluate(client, url, plan, values, initial=False):
+    """Serialized response of one combination (``null`` for "no update"), and whether it failed."""
+    response = client.post(url, json=plan.body(values, initial))
+    if response.status_code == 204:
+        return b'null', False
+    if response.status_code != 200:
+        return b'null', True
+    data = response.get_data()
+    if not initial and not _assign_only(json.loads(data)):
+        return evaluate(client, url, plan, values, initial=True)
+    return data, False
+
+
+# Shared with forked worker processes: (test client, update url, plans)
+_WORK = {}
+
+
+def _evaluate_shard(task):
+    plan_index, shard = task
+    client, url, plans = _WORK['client'], _WORK['url'], _WORK['plans']
+    plan = plans[plan_index]
+    entries, errors = [], 0
+    for flat in range(shard * plan.per_shard, min((shard + 1) * plan.per_shard, plan.count)):
+        data, failed = evaluate(client, url, plan, plan.values_at(flat))
+        entries.append(data)
+        errors += failed
+    return plan_index, shard, b'[' + b','.join(entries) + b']', errors
+
+
+def plan_budget(plans, budget):
+    """Thins every plan to its share of ``budget`` bytes; plans that cannot fit one combination are left out.
+
+    A plan needs its base response plus one entry per combination. The plans
+    left out free their share for the others, the largest first.
+    """
+    exported = list(plans)
+    while True:
+        shares = allocate([plan.base_bytes + plan.full_count * plan.entry_bytes for plan in exported], budget)
+        over = [plan for plan, share in zip(exported, shares) if share < plan.base_bytes + plan.entry_bytes]
+        if not over:
+            break
+        dropped = max(over, key=lambda plan: plan.base_bytes + plan.entry_bytes)
+        dropped.exported = False
+        exported.remove(dropped)
+    for plan, share in zip(exported, shares):
+        plan.thin(int((share - plan.base_bytes) / plan.entry_bytes))
+    return exported
+
+
+def allocate(needs, budget):
+    """Splits ``budget`` among tables needing ``needs`` bytes: small tables get all they need, big ones equal shares."""
+    shares = [0.0] * len(needs)
+    remaining, left = float(budget), len(needs)
+    for i in sorted(range(len(needs)), key=lambda i: needs[i]):
+        shares[i] = min(needs[i], remaining / left)
+        remaining -= shares[i]
+        left -= 1
+    return shares
+
+
+# --- Page and static files ---
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def export_files(app, out, static_url):
+    """Writes the page, its scripts and stylesheets, and the component bundles loaded on demand."""
+    client = app.server.test_client()
+    requests_prefix = app.config.requests_pathname_prefix
+    routes_prefix = app.config.routes_pathname_prefix
+    page = client.get(routes_prefix).get_data(as_text=True)
+    page = page.replace('<head>', f'<head>\n<meta name="fluidos-static" content="{static_url}">', 1)
+    _write(os.path.join(out, 'index.html'), page.encode())
+
+    written = set()
+    for url in re.findall(r'(?:src|href)="([^"]+)"', page):
+        path = url.split('?', 1)[0]
+        if path.startswith(requests_prefix) and path not in written:
+            relative = path[len(requests_prefix):]
+            response = client.get(routes_prefix + relative)
+            if response.status_code == 200:
+                _write(os.path.join(out, relative), response.get_data())
+                written.add(path)
+
+    # Bundles loaded on demand (e.g. plotly.js) take the fingerprint of their package's main bundle
+    for namespace, paths in app.registered_paths.items():
+        suite = f'_dash-component-suites/{namespace}/'
+        fingerprint = re.search(re.escape(suite) + r'[^"?]*?(\.v[^.]+m\d+)\.', page)
+        for relative in paths:
+            response = client.get(routes_prefix + suite + relative)
+            if response.status_code != 200:
+                continue
+            names = {relative}
+            if fingerprint:
+                stem, dot, extension = relative.rpartition('.')
+                names.add(f'{stem}{fingerprint.group(1)}{dot}{extension}')
+            for name in names:
+                if requests_prefix + suite + name not in written:
+                    _write(os.path.join(out, suite, name), response.get_data())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export the fluids dashboard as static files.")
+    parser.add_argument('--out', default='site', help="output directory (replaced)")
+    parser.add_argument('--budget-mb', type=float, default=100, help="total size of the lookup tables")
+    parser.add_argument('--shard-kb', type=float, default=256, help="target size of each table file")
+    parser.add_argument('--base-path', default='/', help="URL path the site is served under, e.g. /fluidos/")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.update(STATIC_ENV)
+    os.environ.pop('FLUIDOS_SHARED_CACHE', None)
+    base_path = args.base_path.strip('/')
+    os.environ['DASH_REQUESTS_PATHNAME_PREFIX'] = f'/{base_path}/' if base_path else '/'
+    import fluidoscona # Only now: the app reads its configuration at import time
+    app = fluidoscona.create_app()
+
+    if os.path.exists(args.out):
+        shutil.rmtree(args.out)
+    static_dir = os.path.join(args.out, 'static')
+    os.makedirs(static_dir)
+
+    layout = static_layout(fluidoscona)
+    _write(os.path.join(args.out, '_dash-layout.json'), to_json_plotly(layout).encode())
+    components = {getattr(c, 'id', None): c for c in itertools.chain([layout], layout._traverse())}
+
+    client = app.server.test_client()
+    url = app.config.routes_pathname_prefix + UPDATE_PATH
+    # Only the callbacks whose components are all part of the static layout (render_tab and the sweeps are not)
+    dependencies = []
+    plans = []
+    for spec in client.get(app.config.routes_pathname_prefix + '_dash-dependencies').get_json():
+        ids = [item['id'] for item in spec['inputs'] + spec['state']]
+        ids += [part.rsplit('.', 1)[0] for part in spec['output'].strip('.').split('...')]
+        if not all(i in components for i in ids):
+            continue
+        dependencies.append(spec)
+        if not spec.get('clientside_function'):
+            name = getattr(app.callback_map[spec['output']]['callback'], '__name__', '')
+            plans.append(CallbackPlan(spec, name, components))
+    _write(os.path.join(args.out, '_dash-dependencies.json'), json.dumps(dependencies).encode())
+
+    # Size of each table, from its default combination and a few random ones
+    rng = random.Random(args.seed)
+    bases = []
+    for index, plan in enumerate(plans):
+        plan.directory = f'{index:02d}-{plan.name}'
+        base, _ = evaluate(client, url, plan, plan.values_at(plan.default_flat), initial=True)
+        bases.append(base)
+        plan.base_bytes = len(base)
+        samples = [evaluate(client, url, plan, plan.values_at(rng.randrange(plan.full_count)))[0] for _ in range(PROBE_SAMPLES)]
+        plan.entry_bytes = max(sum(len(s) + 1 for s in samples) / len(samples), 5)
+
+    budget = args.budget_mb * 2**20
+    plan_budget(plans, budget)
+    tasks = []
+    sizes = [0] * len(plans)
+    for index, (plan, base) in enumerate(zip(plans, bases)):
+        if not plan.exported:
+            continue
+        _write(os.path.join(static_dir, plan.directory, 'base.json'), base)
+        sizes[index] = len(base)
+        plan.per_shard = max(1, int(args.shard_kb * 1024 / plan.entry_bytes))
+        tasks += [(index, shard) for shard in range(-(-plan.count // plan.per_shard))]
+
+    _WORK.update(client=client, url=url, plans=plans)
+    start = time.monotonic()
+    errors = [0] * len(plans)
+    if args.processes > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        pool = multiprocessing.get_context('fork').Pool(args.processes)
+        results = pool.imap_unordered(_evaluate_shard, tasks)
+    else:
+        pool = None
+        results = map(_evaluate_shard, tasks)
+    try:
+        for done, (index, shard, data, failed) in enumerate(results, start=1):
+            _write(os.path.join(static_dir, plans[index].directory, f'{shard}.json'), data)
+            sizes[index] += len(data)
+            errors[index] += failed
+            print(f"\r{done}/{len(tasks)} tables", end='', file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.close()
+    print(file=sys.stderr)
+
+    index = {'version': 1, 'callbacks': {plan.output: plan.index_entry() for plan in plans}}
+    _write(os.path.join(static_dir, 'index.json'), json.dumps(index).encode())
+    static_url = app.config.requests_pathname_prefix + 'static/'
+    export_files(app, args.out, static_url)
+
+    print(f"{'callback':<28} {'combinations':>14} {'exported':>10} {'MiB':>8} {'errors':>7}  free inputs")
+    for plan, size, failed in zip(plans, sizes, errors):
+        free = ', '.join(item['id'] for item, kind in zip(plan.inputs, plan.kinds) if kind == 'fixed')
+        exported = f'{plan.count:>10,}' if plan.exported else f"{'left out':>10}"
+        print(f"{plan.name:<28} {plan.full_count:>14,} {exported} {size / 2**20:>8.1f} {failed:>7}  {free}")
+    total = sum(sizes)
+    print(f"\n{total / 2**20:.1f} MiB of tables ({args.budget_mb:g} MiB budget) in {time.monotonic() - start:.0f} s, written to {args.out}/")
+    if total > budget:
+        # The sizes are estimated from a few samples: a table can come out larger than planned
+        print(f"Over budget by {(total - budget) / 2**20:.1f} MiB; export again with a smaller --budget-mb", file=sys.stderr)
+        return 1
+    return 1 if any(errors) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
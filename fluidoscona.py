@@ -1,581 +1,1596 @@
-import dash
-from dash import dcc, html, Input, Output, State
-import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-import numpy as np
-import pandas as pd # Added for potential future data handling, though not strictly needed for these plots
-
-# --- Constants ---
-G_ACCEL = 9.81 # m/s^2 (standard gravity)
-WATER_DENSITY = 1000 # kg/m^3
-
-# --- Initialize the Dash app ---
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.LUMEN], suppress_callback_exceptions=True)
-server = app.server # For deployment
-
-# --- App Layout ---
-app.layout = dbc.Container([
-    dbc.Row(dbc.Col(html.H1("Dashboard de Conceptos de Fluidos (Unidad 7)", className="text-center my-4"))),
-
-    dbc.Tabs([
-        # == Tab 1: Pressure ==
-        dbc.Tab(label="Presión (P=F/A)", children=[
-            dbc.Card(dbc.CardBody([
-                html.H4("Calculadora de Presión", className="card-title"),
-                dbc.Row([
-                    dbc.Col([
-                        html.Label("Fuerza (F) [N]:"),
-                        dcc.Slider(id='pressure-force-slider', min=0, max=1000, step=10, value=120, marks={i: str(i) for i in range(0, 1001, 200)}),
-                        html.Div(id='pressure-force-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                    ], width=6),
-                    dbc.Col([
-                        html.Label("Área (A) [m²]:"),
-                        dcc.Slider(id='pressure-area-slider', min=0.01, max=1, step=0.01, value=0.04, marks={i/10: str(i/10) for i in range(0, 11)}),
-                         html.Div(id='pressure-area-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                    ], width=6),
-                ]),
-                html.Hr(),
-                dbc.Row([
-                    dbc.Col(dcc.Graph(id='pressure-gauge-graph'), width=6),
-                    dbc.Col([
-                        html.H5("Resultado:"),
-                        html.Div(id='pressure-output-text', className="lead")
-                    ], width=6, align="center")
-                ]),
-                 html.P([
-                     "La presión (P) es la fuerza (F) aplicada perpendicularmente sobre una superficie, dividida por el área (A) de esa superficie.",
-                     html.Br(),"Fórmula: P = F / A. Unidad: Pascal (Pa) = N/m²."
-                 ], className="mt-3 text-muted")
-            ]), className="my-3")
-        ]), # End Tab 1
-
-        # == Tab 2: Hydraulic Press ==
-        dbc.Tab(label="Prensa Hidráulica", children=[
-            dbc.Card(dbc.CardBody([
-                html.H4("Simulador de Prensa Hidráulica (Principio de Pascal)", className="card-title"),
-                 html.P("La presión aplicada en el émbolo menor (f/a) se transmite íntegramente al émbolo mayor (F/A). P₁ = P₂ => f/a = F/A.", className="text-muted"),
-                dbc.Row([
-                    # Inputs
-                    dbc.Col([
-                        html.H6("Émbolo Menor (Entrada)"),
-                        html.Label("Fuerza Aplicada (f) [N]:"),
-                        dcc.Slider(id='hydraulic-f-slider', min=10, max=500, step=10, value=125, marks={i: str(i) for i in range(0, 501, 100)}),
-                        html.Div(id='hydraulic-f-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Br(),
-                        html.Label("Diámetro Émbolo Menor (d) [cm]:"),
-                        dcc.Slider(id='hydraulic-d-slider', min=1, max=10, step=0.5, value=2.1, marks={i: str(i) for i in range(1, 11)}),
-                        html.Div(id='hydraulic-d-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Div(id='hydraulic-area-a-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
-
-                    ], md=4),
-                     # Inputs
-                    dbc.Col([
-                        html.H6("Émbolo Mayor (Salida)"),
-                        html.Label("Diámetro Émbolo Mayor (D) [cm]:"),
-                        dcc.Slider(id='hydraulic-D-slider', min=5, max=50, step=1, value=42, marks={i*5: str(i*5) for i in range(1, 11)}),
-                        html.Div(id='hydraulic-D-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Div(id='hydraulic-area-A-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
-                        html.Br(),
-                         html.H5("Fuerza Resultante (F):"),
-                        html.Div(id='hydraulic-output-F', className="lead fw-bold")
-
-                    ], md=4),
-                    # Visualization
-                    dbc.Col([
-                        html.H6("Visualización"),
-                        dcc.Graph(id='hydraulic-press-graph')
-                    ], md=4),
-                ]),
-                html.Hr(),
-                dbc.Row([
-                     dbc.Col([
-                         html.H5("Presión en el sistema (P):"),
-                         html.Div(id='hydraulic-pressure-display', className="lead")
-                     ], width=6, align="center"),
-                     dbc.Col([
-                         html.H5("Ventaja Mecánica (F/f):"),
-                         html.Div(id='hydraulic-advantage-display', className="lead")
-                     ], width=6, align="center")
-                ])
-            ]), className="my-3")
-        ]), # End Tab 2
-
-        # == Tab 3: Archimedes' Principle ==
-        dbc.Tab(label="Principio de Arquímedes", children=[
-            dbc.Card(dbc.CardBody([
-                html.H4("Simulador de Empuje (Arquímedes)", className="card-title"),
-                html.P("Todo cuerpo sumergido total o parcialmente en un fluido experimenta un empuje vertical hacia arriba igual al peso del fluido desalojado.", className="text-muted"),
-                html.P("Empuje (E) = ρ_fluido * g * V_sumergido. Peso (W) = ρ_objeto * g * V_objeto.", className="text-muted"),
-                dbc.Row([
-                    dbc.Col([
-                        html.Label("Densidad del Objeto (ρ_objeto) [kg/m³]:"),
-                        dcc.Slider(id='archimedes-rho-obj-slider', min=100, max=12000, step=100, value=700, marks={1000:'Agua', 2700:'Al', 7850:'Fe', 11300:'Pb'}),
-                        html.Div(id='archimedes-rho-obj-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Br(),
-                        html.Label("Volumen del Objeto (V_objeto) [m³]:"),
-                        dcc.Slider(id='archimedes-vol-obj-slider', min=0.001, max=0.1, step=0.001, value=0.027, marks={i/100: str(i/100) for i in range(1, 11)}),
-                        html.Div(id='archimedes-vol-obj-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Br(),
-                        html.Label("Densidad del Fluido (ρ_fluido) [kg/m³]:"),
-                        dcc.Slider(id='archimedes-rho-fluid-slider', min=500, max=1500, step=50, value=1000, marks={800:'Aceite', 1000:'Agua', 1025:'Agua Salada'}),
-                        html.Div(id='archimedes-rho-fluid-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                    ], md=5),
-                    dbc.Col([
-                         dcc.Graph(id='archimedes-graph')
-                    ], md=4),
-                    dbc.Col([
-                        html.H5("Resultados:"),
-                        html.Div(id='archimedes-output-text', className="lead")
-                    ], md=3, align="center"),
-                ])
-            ]), className="my-3")
-        ]), # End Tab 3
-
-        # == Tab 4: Hydrostatic Pressure ==
-        dbc.Tab(label="Presión Hidrostática", children=[
-            dbc.Card(dbc.CardBody([
-                html.H4("Calculadora de Presión Hidrostática", className="card-title"),
-                 html.P("Es la presión ejercida por un fluido en reposo debido a su peso. Depende de la densidad del fluido (ρ), la gravedad (g) y la profundidad (h).", className="text-muted"),
-                 html.P("Fórmula: Ph = ρ * g * h.", className="text-muted"),
-                dbc.Row([
-                    dbc.Col([
-                        html.Label("Profundidad (h) [m]:"),
-                        dcc.Slider(id='hydrostatic-h-slider', min=0, max=100, step=1, value=10, marks={i*10: str(i*10) for i in range(0, 11)}),
-                        html.Div(id='hydrostatic-h-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Br(),
-                        html.Label("Densidad del Fluido (ρ) [kg/m³]:"),
-                        dcc.Slider(id='hydrostatic-rho-slider', min=500, max=1500, step=50, value=1000, marks={800:'Aceite', 1000:'Agua', 1025:'Agua Salada'}),
-                        html.Div(id='hydrostatic-rho-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                    ], md=4),
-                    dbc.Col([
-                        dcc.Graph(id='hydrostatic-pressure-graph')
-                    ], md=5),
-                     dbc.Col([
-                        html.H5("Presión Hidrostática (Ph):"),
-                        html.Div(id='hydrostatic-output-text', className="lead")
-                    ], md=3, align="center"),
-                ])
-            ]), className="my-3")
-        ]), # End Tab 4
-
-         # == Tab 5: Continuity Equation ==
-        dbc.Tab(label="Ecuación de Continuidad", children=[
-            dbc.Card(dbc.CardBody([
-                html.H4("Simulador de Continuidad (A₁v₁ = A₂v₂)", className="card-title"),
-                 html.P("Para un fluido incompresible en flujo estacionario, el caudal (G = A*v) es constante a lo largo de una tubería.", className="text-muted"),
-                dbc.Row([
-                     dbc.Col([
-                        html.H6("Sección 1"),
-                        html.Label("Diámetro Tubería 1 (D₁) [cm]:"),
-                        dcc.Slider(id='continuity-D1-slider', min=1, max=10, step=0.5, value=8.0, marks={i: str(i) for i in range(1, 11)}),
-                        html.Div(id='continuity-D1-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Div(id='continuity-A1-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
-                        html.Br(),
-                        html.Label("Velocidad Fluido 1 (v₁) [m/s]:"),
-                        dcc.Slider(id='continuity-v1-slider', min=0.1, max=10, step=0.1, value=2.0, marks={i: str(i) for i in range(1, 11)}),
-                        html.Div(id='continuity-v1-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                    ], md=4),
-                     dbc.Col([
-                        html.H6("Sección 2"),
-                        html.Label("Diámetro Tubería 2 (D₂) [cm]:"),
-                        dcc.Slider(id='continuity-D2-slider', min=1, max=10, step=0.5, value=2.0, marks={i: str(i) for i in range(1, 11)}),
-                        html.Div(id='continuity-D2-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                        html.Div(id='continuity-A2-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
-                        html.Br(),
-                        html.H5("Velocidad Fluido 2 (v₂):"),
-                        html.Div(id='continuity-output-v2', className="lead fw-bold")
-                    ], md=4),
-                    dbc.Col([
-                        html.H6("Visualización Caudal"),
-                        dcc.Graph(id='continuity-graph')
-                    ], md=4),
-                ]),
-                 html.Hr(),
-                 dbc.Row(dbc.Col(html.Div(id='continuity-gasto-display', className="lead text-center")))
-            ]), className="my-3")
-        ]), # End Tab 5
-
-        # == Tab 6: Torricelli's Theorem ==
-        dbc.Tab(label="Teorema de Torricelli", children=[
-             dbc.Card(dbc.CardBody([
-                html.H4("Simulador de Salida de Fluido (Torricelli)", className="card-title"),
-                html.P("La velocidad de salida (v) de un fluido por un orificio es la misma que adquiriría un cuerpo cayendo libremente desde una altura (h) igual a la diferencia de nivel entre la superficie libre del fluido y el orificio.", className="text-muted"),
-                html.P("Fórmula: v = √(2 * g * h).", className="text-muted"),
-                dbc.Row([
-                    dbc.Col([
-                        html.Label("Altura (h) [m]:"),
-                        dcc.Slider(id='torricelli-h-slider', min=0.1, max=10, step=0.1, value=1.25, marks={i: str(i) for i in range(0, 11)}),
-                        html.Div(id='torricelli-h-display', style={'textAlign': 'center', 'marginTop': '5px'}),
-                         html.Br(),
-                         html.Label("Gravedad (g) [m/s²]:"),
-                         dcc.Input(id='torricelli-g-input', type='number', value=G_ACCEL, step=0.01, style={'width':'100px'}),
-
-                    ], md=4),
-                    dbc.Col([
-                        dcc.Graph(id='torricelli-graph')
-                    ], md=5),
-                    dbc.Col([
-                        html.H5("Velocidad de Salida (v):"),
-                        html.Div(id='torricelli-output-v', className="lead fw-bold")
-                    ], md=3, align="center"),
-                ])
-             ]), className="my-3")
-        ]), # End Tab 6
-
-
-    ]) # End Tabs
-], fluid=True)
-
-# --- Callbacks ---
-
-# == Callback 1: Pressure ==
-@app.callback(
-    [Output('pressure-output-text', 'children'),
-     Output('pressure-gauge-graph', 'figure'),
-     Output('pressure-force-display', 'children'),
-     Output('pressure-area-display', 'children')],
-    [Input('pressure-force-slider', 'value'),
-     Input('pressure-area-slider', 'value')]
-)
-def update_pressure(force, area):
-    if area is None or area <= 0:
-        pressure = 0
-        pressure_text = "Área inválida (debe ser > 0)."
-        area_val = 0
-    else:
-        pressure = force / area
-        pressure_text = f"P = {force:.0f} N / {area:.3f} m² = {pressure:,.2f} Pa ({pressure/1000:,.2f} kPa)"
-        area_val = area
-
-    force_display = f"{force:.0f} N"
-    area_display = f"{area_val:.3f} m²"
-
-    # Create gauge figure
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = pressure,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': "Presión (Pa)"},
-        gauge = {
-            'axis': {'range': [0, max(50000, pressure * 1.2)]}, # Dynamic range
-            'bar': {'color': "darkblue"},
-            'steps' : [
-                 {'range': [0, 10000], 'color': "lightgreen"},
-                 {'range': [10000, 30000], 'color': "yellow"},
-                 {'range': [30000, 50000], 'color': "orange"}],
-            'threshold' : {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': 45000} # Example threshold
-            }))
-    fig.update_layout(height=250, margin=dict(l=20, r=20, t=50, b=20))
-
-
-    return pressure_text, fig, force_display, area_display
-
-# == Callback 2: Hydraulic Press ==
-@app.callback(
-    [Output('hydraulic-output-F', 'children'),
-     Output('hydraulic-press-graph', 'figure'),
-     Output('hydraulic-pressure-display', 'children'),
-     Output('hydraulic-advantage-display', 'children'),
-     Output('hydraulic-f-display', 'children'),
-     Output('hydraulic-d-display', 'children'),
-     Output('hydraulic-D-display', 'children'),
-     Output('hydraulic-area-a-display', 'children'),
-     Output('hydraulic-area-A-display', 'children')],
-    [Input('hydraulic-f-slider', 'value'),
-     Input('hydraulic-d-slider', 'value'),
-     Input('hydraulic-D-slider', 'value')]
-)
-def update_hydraulic_press(f_in, d_cm, D_cm):
-    # Convert cm to m for area calculation
-    d_m = d_cm / 100.0
-    D_m = D_cm / 100.0
-
-    # Calculate areas
-    area_a = np.pi * (d_m / 2)**2
-    area_A = np.pi * (D_m / 2)**2
-
-    if area_a is None or area_a <= 0:
-        F_out = 0
-        pressure = 0
-        advantage = 0
-        F_text = "Área 'a' inválida."
-        pressure_text = "N/A"
-        advantage_text = "N/A"
-    else:
-        # Calculate pressure (P = f/a)
-        pressure = f_in / area_a
-        # Calculate output force (F = P * A)
-        F_out = pressure * area_A
-        # Calculate mechanical advantage
-        advantage = F_out / f_in if f_in > 0 else 0
-
-        F_text = f"{F_out:,.2f} N"
-        pressure_text = f"{pressure:,.2f} Pa ({pressure/1000:,.2f} kPa)"
-        advantage_text = f"{advantage:.2f}"
-
-
-    # Create bar chart figure comparing forces
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=['Entrada (f)', 'Salida (F)'],
-        y=[f_in, F_out],
-        marker_color=['rgb(55, 83, 109)', 'rgb(26, 118, 255)'],
-        text=[f"{f_in:.1f} N", f"{F_out:,.1f} N"],
-        textposition='auto'
-    ))
-    fig.update_layout(
-        title='Comparación de Fuerzas',
-        yaxis_title='Fuerza (N)',
-        height=250,
-        margin=dict(l=20, r=20, t=50, b=20)
-    )
-
-    f_display = f"{f_in:.1f} N"
-    d_display = f"{d_cm:.1f} cm"
-    D_display = f"{D_cm:.1f} cm"
-    area_a_display = f"Área (a): {area_a:.4f} m²"
-    area_A_display = f"Área (A): {area_A:.4f} m²"
-
-
-    return F_text, fig, pressure_text, advantage_text, f_display, d_display, D_display, area_a_display, area_A_display
-
-# == Callback 3: Archimedes' Principle ==
-@app.callback(
-    [Output('archimedes-output-text', 'children'),
-     Output('archimedes-graph', 'figure'),
-     Output('archimedes-rho-obj-display', 'children'),
-     Output('archimedes-vol-obj-display', 'children'),
-     Output('archimedes-rho-fluid-display', 'children')],
-    [Input('archimedes-rho-obj-slider', 'value'),
-     Input('archimedes-vol-obj-slider', 'value'),
-     Input('archimedes-rho-fluid-slider', 'value')]
-)
-def update_archimedes(rho_obj, vol_obj, rho_fluid):
-    # Calculate weight (W)
-    weight = rho_obj * G_ACCEL * vol_obj
-
-    # Determine maximum possible buoyancy (if fully submerged)
-    max_buoyancy = rho_fluid * G_ACCEL * vol_obj
-
-    situation = ""
-    vol_submerged = 0
-    buoyancy = 0
-    percentage_submerged = 0
-
-    if weight > max_buoyancy:
-        # Object sinks
-        situation = "El objeto se hunde."
-        buoyancy = max_buoyancy # Buoyancy equals weight of displaced fluid when fully submerged
-        vol_submerged = vol_obj
-        percentage_submerged = 100
-    elif weight == max_buoyancy:
-        # Object is neutrally buoyant (suspended)
-        situation = "El objeto está suspendido (flotabilidad neutra)."
-        buoyancy = weight # Buoyancy equals weight
-        vol_submerged = vol_obj
-        percentage_submerged = 100
-    else: # weight < max_buoyancy
-        # Object floats
-        situation = "El objeto flota."
-        buoyancy = weight # Buoyancy equals weight
-        # Calculate submerged volume: E = W => rho_fluid * g * V_sub = rho_obj * g * V_obj
-        vol_submerged = (rho_obj / rho_fluid) * vol_obj
-        percentage_submerged = (vol_submerged / vol_obj) * 100
-
-    output_html = [
-        html.P(f"Peso (W): {weight:,.2f} N"),
-        html.P(f"Empuje (E): {buoyancy:,.2f} N"),
-        html.P(f"Vol. Sumergido: {vol_submerged:.4f} m³ ({percentage_submerged:.1f}%)"),
-        html.P(situation, className="fw-bold")
-    ]
-
-    # Create bar chart comparing W and E
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=['Peso (W)', 'Empuje (E)'],
-        y=[weight, buoyancy],
-        marker_color=['red', 'blue'],
-        text=[f"{weight:.1f} N", f"{buoyancy:.1f} N"],
-        textposition='auto'
-    ))
-    fig.update_layout(
-        title='Comparación Peso vs. Empuje',
-        yaxis_title='Fuerza (N)',
-         height=300,
-         margin=dict(l=20, r=20, t=50, b=20)
-    )
-
-    rho_obj_display = f"{rho_obj} kg/m³"
-    vol_obj_display = f"{vol_obj:.4f} m³"
-    rho_fluid_display = f"{rho_fluid} kg/m³"
-
-    return output_html, fig, rho_obj_display, vol_obj_display, rho_fluid_display
-
-# == Callback 4: Hydrostatic Pressure ==
-@app.callback(
-    [Output('hydrostatic-output-text', 'children'),
-     Output('hydrostatic-pressure-graph', 'figure'),
-     Output('hydrostatic-h-display', 'children'),
-     Output('hydrostatic-rho-display', 'children')],
-    [Input('hydrostatic-h-slider', 'value'),
-     Input('hydrostatic-rho-slider', 'value')]
-)
-def update_hydrostatic_pressure(h, rho):
-    # Calculate hydrostatic pressure
-    pressure_h = rho * G_ACCEL * h
-
-    pressure_text = f"Ph = {rho} kg/m³ * {G_ACCEL:.2f} m/s² * {h} m"
-    pressure_text += f"<br><b>Ph = {pressure_h:,.2f} Pa ({pressure_h/1000:,.2f} kPa)</b>"
-
-    # Create line graph showing pressure vs depth
-    depths = np.linspace(0, h * 1.1, 50) # Depths up to 110% of selected h
-    pressures = rho * G_ACCEL * depths
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=depths,
-        y=pressures,
-        mode='lines',
-        name='Ph vs h',
-        line=dict(color='royalblue', width=3)
-    ))
-    # Add point for the selected depth
-    fig.add_trace(go.Scatter(
-        x=[h],
-        y=[pressure_h],
-        mode='markers',
-        marker=dict(color='red', size=10, symbol='x'),
-        name=f'Ph en h={h}m'
-    ))
-
-    fig.update_layout(
-        title='Presión Hidrostática vs. Profundidad',
-        xaxis_title='Profundidad (h) [m]',
-        yaxis_title='Presión (Ph) [Pa]',
-        height=300,
-        margin=dict(l=20, r=20, t=50, b=20),
-        showlegend=True
-    )
-
-    h_display = f"{h} m"
-    rho_display = f"{rho} kg/m³"
-
-    return html.Div([html.P(line) for line in pressure_text.split('<br>')]), fig, h_display, rho_display
-
-
-# == Callback 5: Continuity ==
-@app.callback(
-    [Output('continuity-output-v2', 'children'),
-     Output('continuity-graph', 'figure'),
-     Output('continuity-gasto-display', 'children'),
-     Output('continuity-D1-display', 'children'),
-     Output('continuity-A1-display', 'children'),
-     Output('continuity-v1-display', 'children'),
-     Output('continuity-D2-display', 'children'),
-     Output('continuity-A2-display', 'children')],
-    [Input('continuity-D1-slider', 'value'),
-     Input('continuity-v1-slider', 'value'),
-     Input('continuity-D2-slider', 'value')]
-)
-def update_continuity(D1_cm, v1, D2_cm):
-    # Convert cm to m
-    D1_m = D1_cm / 100.0
-    D2_m = D2_cm / 100.0
-
-    # Calculate areas
-    A1 = np.pi * (D1_m / 2)**2
-    A2 = np.pi * (D2_m / 2)**2
-
-    if A2 is None or A2 <= 0:
-        v2 = 0
-        v2_text = "Diámetro D₂ inválido."
-        gasto = 0
-    else:
-        # Calculate v2 using A1*v1 = A2*v2
-        v2 = (A1 * v1) / A2
-        v2_text = f"{v2:.2f} m/s"
-        # Calculate flow rate (Gasto, G)
-        gasto = A1 * v1 # Should be equal to A2 * v2
-
-    # Create bar chart showing constant flow rate
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=['Sección 1 (A₁v₁)', 'Sección 2 (A₂v₂)'],
-        y=[A1*v1, A2*v2], # These should be equal if calculation is correct
-        marker_color=['mediumseagreen', 'lightcoral'],
-        text=[f"{A1*v1:.4f} m³/s", f"{A2*v2:.4f} m³/s"],
-        textposition='auto'
-    ))
-    fig.update_layout(
-        title='Caudal (Gasto) Constante',
-        yaxis_title='Caudal (G) [m³/s]',
-        height=250,
-        margin=dict(l=20, r=20, t=50, b=20),
-        yaxis_range=[0, max(A1*v1, A2*v2)*1.2] # Ensure bars are visible
-    )
-
-    gasto_display = f"Caudal (Gasto, G): {gasto:.4f} m³/s"
-    D1_display = f"{D1_cm:.1f} cm"
-    A1_display = f"Área (A₁): {A1:.5f} m²"
-    v1_display = f"{v1:.2f} m/s"
-    D2_display = f"{D2_cm:.1f} cm"
-    A2_display = f"Área (A₂): {A2:.5f} m²"
-
-    return v2_text, fig, gasto_display, D1_display, A1_display, v1_display, D2_display, A2_display
-
-
-# == Callback 6: Torricelli ==
-@app.callback(
-    [Output('torricelli-output-v', 'children'),
-     Output('torricelli-graph', 'figure'),
-     Output('torricelli-h-display', 'children')],
-    [Input('torricelli-h-slider', 'value'),
-     Input('torricelli-g-input', 'value')]
-)
-def update_torricelli(h, g):
-    g_val = g if g is not None and g > 0 else G_ACCEL # Use default if input is invalid
-    if h is None or h <= 0:
-        v = 0
-        v_text = "Altura h inválida."
-    else:
-        # Calculate exit velocity v = sqrt(2gh)
-        v = np.sqrt(2 * g_val * h)
-        v_text = f"{v:.2f} m/s"
-
-    # Create plot of v vs h
-    h_values = np.linspace(0.1, max(h * 1.1, 1), 50) # Heights up to 110% of selected h or at least 1m
-    v_values = np.sqrt(2 * g_val * h_values)
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=h_values,
-        y=v_values,
-        mode='lines',
-        name='v vs h',
-        line=dict(color='darkorange', width=3)
-    ))
-    # Add point for the selected height
-    fig.add_trace(go.Scatter(
-        x=[h],
-        y=[v],
-        mode='markers',
-        marker=dict(color='purple', size=10, symbol='star'),
-        name=f'v en h={h}m'
-    ))
-    fig.update_layout(
-        title='Velocidad de Salida (Torricelli) vs. Altura',
-        xaxis_title='Altura (h) [m]',
-        yaxis_title='Velocidad (v) [m/s]',
-        height=300,
-        margin=dict(l=20, r=20, t=50, b=20),
-        showlegend=True
-    )
-
-    h_display = f"{h:.2f} m"
-
-    return v_text, fig, h_display
-
-
-# --- Run the app ---
-if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+"""Dashboard of fluid mechanics concepts (Unidad 7).
+
+Importing this module only defines the layout and the callbacks; ``create_app``
+builds the Dash app, so that a process starts quickly. Heavy dependencies
+(scipy, pandas, plotly.graph_objects and plotly.subplots, dash_bootstrap_components)
+are imported by the functions that need them, and IPython not at all outside
+of a notebook.
+Deployments use ``create_app().server`` (see serve.py); ``fluidoscona.app`` and
+``fluidoscona.server`` build the app on first access.
+"""
+import base64
+import contextlib
+import contextvars
+import functools
+import os
+import sys
+import threading
+
+# dash._jupyter imports IPython (about 0.4 s) whenever it is installed, only for notebooks:
+# outside of one, dash is imported with IPython hidden, which leaves its notebook support off
+_HIDE_IPYTHON = 'IPython' not in sys.modules
+if _HIDE_IPYTHON:
+    sys.modules['IPython'] = None
+try:
+    import dash
+finally:
+    if _HIDE_IPYTHON:
+        del sys.modules['IPython']
+from dash import dcc, html, dash_table, Input, Output, State, ClientsideFunction
+import numpy as np
+
+import meshes
+import physics
+import pipe_network
+from batch import MODELS as BATCH_MODELS, install_batch_routes, run_job as batch_run_job
+from downsample import lttb_indices
+import serialization
+import sweeps
+from coalesce import install_coalescing
+import compression
+import jobs
+from layout_cache import install_layout_cache
+from metrics import Metrics, install_metrics
+from response_cache import ResponseCache, SharedResponseCache, install_response_cache, warm_up
+
+# --- Constants ---
+from physics import G_ACCEL, WATER_DENSITY
+
+# --- Configuration ---
+# Display/result texts are computed in the browser (assets/fluidos.js); set FLUIDOS_CLIENTSIDE=0 to compute them on the server.
+CLIENTSIDE_CALLBACKS = os.environ.get('FLUIDOS_CLIENTSIDE', '1') != '0'
+# Figures are sent in full once per graph and then updated with dash.Patch; set FLUIDOS_PATCH=0 to always send full figures.
+PATCH_UPDATES = os.environ.get('FLUIDOS_PATCH', '1') != '0'
+# Size of the LRU cache of serialized callback responses (0 disables it); see /_cache-stats.
+RESPONSE_CACHE_MB = float(os.environ.get('FLUIDOS_CACHE_MB', '64'))
+# Precompute the responses for the default values and marked ticks of the sliders at startup.
+CACHE_WARMUP = os.environ.get('FLUIDOS_CACHE_WARMUP', '0') == '1'
+# SQLite file holding a response cache shared by every worker process (see serve.py); in-process cache if unset.
+SHARED_CACHE_PATH = os.environ.get('FLUIDOS_SHARED_CACHE')
+# Serve /_dash-layout and /_dash-dependencies from bytes precomputed at startup, with ETags.
+LAYOUT_CACHE = os.environ.get('FLUIDOS_LAYOUT_CACHE', '1') != '0'
+# Lean serialization: small app-wide Plotly template and orjson encoding; FLUIDOS_LEAN_FIGURES=0 keeps Plotly's defaults.
+LEAN_FIGURES = os.environ.get('FLUIDOS_LEAN_FIGURES', '1') != '0'
+# Encode numeric arrays as base64 typed arrays (needs plotly.js >= 2.28 in dcc.Graph); sweep grids always are.
+TYPED_ARRAYS = os.environ.get('FLUIDOS_TYPED_ARRAYS', '0') == '1'
+# Fraction of callback requests run under cProfile; profiles slower than FLUIDOS_PROFILE_SLOW_MS go to FLUIDOS_PROFILE_DIR.
+PROFILE_RATE = float(os.environ.get('FLUIDOS_PROFILE_RATE', '0'))
+PROFILE_SLOW_MS = float(os.environ.get('FLUIDOS_PROFILE_SLOW_MS', '250'))
+PROFILE_DIR = os.environ.get('FLUIDOS_PROFILE_DIR', 'profiles')
+# Fraction of callback requests traced with tracemalloc, one at a time: peak and retained bytes go to /metrics,
+# the main allocation sites of each callback to /_memory.
+MEMORY_RATE = float(os.environ.get('FLUIDOS_MEMORY_RATE', '0'))
+# Full figures are copies of a dict built once per figure instead of new go.Figure objects; set FLUIDOS_FIGURE_TEMPLATES=0 to always build them with Plotly.
+FIGURE_TEMPLATES = os.environ.get('FLUIDOS_FIGURE_TEMPLATES', '1') != '0'
+# Sliders update while dragged; superseded requests are dropped (coalesce.py) and each output is
+# requested at most every FLUIDOS_DRAG_INTERVAL_MS during a drag (assets/coalesce.js).
+LIVE_DRAG = os.environ.get('FLUIDOS_LIVE_DRAG', '0') == '1'
+DRAG_INTERVAL_MS = float(os.environ.get('FLUIDOS_DRAG_INTERVAL_MS', '100'))
+# Compress responses (brotli if installed, else gzip at FLUIDOS_GZIP_LEVEL) of at least FLUIDOS_COMPRESS_MIN_BYTES;
+# FLUIDOS_COMPRESS_ROUTES sets per-route thresholds, e.g. "_dash-update-component=4096,assets/=off".
+COMPRESSION = os.environ.get('FLUIDOS_COMPRESS', '1') != '0'
+COMPRESS_MIN_BYTES = int(os.environ.get('FLUIDOS_COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_ROUTES = compression.parse_routes(os.environ.get('FLUIDOS_COMPRESS_ROUTES'))
+GZIP_LEVEL = int(os.environ.get('FLUIDOS_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('FLUIDOS_BROTLI_QUALITY', '4'))
+# Worker processes per server process for heavy computations (sweeps, batch files); 0 runs them inside the request.
+JOB_WORKERS = int(os.environ.get('FLUIDOS_JOB_WORKERS', '2'))
+
+# --- Figure serialization (configured by create_app) ---
+figure_templates = serialization.FigureTemplates() if FIGURE_TEMPLATES else None
+
+# --- Background jobs (see jobs.py) ---
+# Pool processes are spawned, so they get the figure settings of this process explicitly
+job_pool = jobs.JobPool(JOB_WORKERS, initializer=serialization.configure,
+                        initargs=(LEAN_FIGURES, LEAN_FIGURES, TYPED_ARRAYS)) if JOB_WORKERS > 0 else None
+SWEEP_POLL_MS = 300
+
+# --- Instrumentation (served on /metrics, installed by create_app) ---
+metrics = Metrics()
+
+# --- App Layout ---
+# Each tab is built the first time it is activated (see render_tab), so only the visible tab is sent and computed.
+# Collapsed heatmap of the tab's model over two of its inputs; computed only while open, as a background job (see update_sweep)
+def sweep_section(tab):
+    import dash_bootstrap_components as dbc
+    params = sweeps.SWEEPS[tab].params
+    options = [{'label': param.label, 'value': param.name} for param in params]
+    return dbc.Accordion([
+        dbc.AccordionItem([
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Eje X:"),
+                    dcc.Dropdown(id=f'{tab}-sweep-x', options=options, value=params[0].name, clearable=False),
+                    html.Br(),
+                    html.Label("Eje Y:"),
+                    dcc.Dropdown(id=f'{tab}-sweep-y', options=options, value=params[1].name, clearable=False),
+                    html.Br(),
+                    html.Label("Resolución [puntos por eje]:"),
+                    dcc.Slider(id=f'{tab}-sweep-n', min=100, max=1000, step=100, value=300, marks={i: str(i) for i in range(100, 1001, 300)}),
+                    html.P("Los demás parámetros toman los valores actuales de los controles.", className="text-muted small"),
+                ], md=4),
+                dbc.Col([
+                    dbc.Progress(id=f'{tab}-sweep-progress', value=0, striped=True, animated=True, style={'display': 'none'}),
+                    dcc.Graph(id=f'{tab}-sweep-graph'),
+                ], md=8),
+            ]),
+            dcc.Store(id=f'{tab}-sweep-job'),
+            dcc.Interval(id=f'{tab}-sweep-poll', interval=SWEEP_POLL_MS, disabled=True),
+        ], title="Barrido de Parámetros (Mapa de Calor)", item_id='sweep')
+    ], id=f'{tab}-sweep-accordion', start_collapsed=True, className="mt-3")
+
+# == Tab 1: Pressure ==
+def pressure_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Calculadora de Presión", className="card-title"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Fuerza (F) [N]:"),
+                dcc.Slider(id='pressure-force-slider', min=0, max=1000, step=10, value=120, marks={i: str(i) for i in range(0, 1001, 200)}),
+                html.Div(id='pressure-force-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+            ], width=6),
+            dbc.Col([
+                html.Label("Área (A) [m²]:"),
+                dcc.Slider(id='pressure-area-slider', min=0.01, max=1, step=0.01, value=0.04, marks={i/10: str(i/10) for i in range(0, 11)}),
+                 html.Div(id='pressure-area-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+            ], width=6),
+        ]),
+        html.Hr(),
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='pressure-gauge-graph'), width=6),
+            dbc.Col([
+                html.H5("Resultado:"),
+                html.Div(id='pressure-output-text', className="lead")
+            ], width=6, align="center")
+        ]),
+         html.P([
+             "La presión (P) es la fuerza (F) aplicada perpendicularmente sobre una superficie, dividida por el área (A) de esa superficie.",
+             html.Br(),"Fórmula: P = F / A. Unidad: Pascal (Pa) = N/m²."
+         ], className="mt-3 text-muted"),
+        sweep_section('pressure'),
+    ]), className="my-3")
+
+# == Tab 2: Hydraulic Press ==
+def hydraulic_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Simulador de Prensa Hidráulica (Principio de Pascal)", className="card-title"),
+         html.P("La presión aplicada en el émbolo menor (f/a) se transmite íntegramente al émbolo mayor (F/A). P₁ = P₂ => f/a = F/A.", className="text-muted"),
+        dbc.Row([
+            # Inputs
+            dbc.Col([
+                html.H6("Émbolo Menor (Entrada)"),
+                html.Label("Fuerza Aplicada (f) [N]:"),
+                dcc.Slider(id='hydraulic-f-slider', min=10, max=500, step=10, value=125, marks={i: str(i) for i in range(0, 501, 100)}),
+                html.Div(id='hydraulic-f-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Br(),
+                html.Label("Diámetro Émbolo Menor (d) [cm]:"),
+                dcc.Slider(id='hydraulic-d-slider', min=1, max=10, step=0.5, value=2.1, marks={i: str(i) for i in range(1, 11)}),
+                html.Div(id='hydraulic-d-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Div(id='hydraulic-area-a-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
+
+            ], md=4),
+             # Inputs
+            dbc.Col([
+                html.H6("Émbolo Mayor (Salida)"),
+                html.Label("Diámetro Émbolo Mayor (D) [cm]:"),
+                dcc.Slider(id='hydraulic-D-slider', min=5, max=50, step=1, value=42, marks={i*5: str(i*5) for i in range(1, 11)}),
+                html.Div(id='hydraulic-D-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Div(id='hydraulic-area-A-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
+                html.Br(),
+                 html.H5("Fuerza Resultante (F):"),
+                html.Div(id='hydraulic-output-F', className="lead fw-bold")
+
+            ], md=4),
+            # Visualization
+            dbc.Col([
+                html.H6("Visualización"),
+                dcc.Graph(id='hydraulic-press-graph')
+            ], md=4),
+        ]),
+        html.Hr(),
+        dbc.Row([
+             dbc.Col([
+                 html.H5("Presión en el sistema (P):"),
+                 html.Div(id='hydraulic-pressure-display', className="lead")
+             ], width=6, align="center"),
+             dbc.Col([
+                 html.H5("Ventaja Mecánica (F/f):"),
+                 html.Div(id='hydraulic-advantage-display', className="lead")
+             ], width=6, align="center")
+        ]),
+        sweep_section('hydraulic'),
+    ]), className="my-3")
+
+# == Tab 3: Archimedes' Principle ==
+def archimedes_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Simulador de Empuje (Arquímedes)", className="card-title"),
+        html.P("Todo cuerpo sumergido total o parcialmente en un fluido experimenta un empuje vertical hacia arriba igual al peso del fluido desalojado.", className="text-muted"),
+        html.P("Empuje (E) = ρ_fluido * g * V_sumergido. Peso (W) = ρ_objeto * g * V_objeto.", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Densidad del Objeto (ρ_objeto) [kg/m³]:"),
+                dcc.Slider(id='archimedes-rho-obj-slider', min=100, max=12000, step=100, value=700, marks={1000:'Agua', 2700:'Al', 7850:'Fe', 11300:'Pb'}),
+                html.Div(id='archimedes-rho-obj-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Br(),
+                html.Label("Volumen del Objeto (V_objeto) [m³]:"),
+                dcc.Slider(id='archimedes-vol-obj-slider', min=0.001, max=0.1, step=0.001, value=0.027, marks={i/100: str(i/100) for i in range(1, 11)}),
+                html.Div(id='archimedes-vol-obj-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Br(),
+                html.Label("Densidad del Fluido (ρ_fluido) [kg/m³]:"),
+                dcc.Slider(id='archimedes-rho-fluid-slider', min=500, max=1500, step=50, value=1000, marks={800:'Aceite', 1000:'Agua', 1025:'Agua Salada'}),
+                html.Div(id='archimedes-rho-fluid-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+            ], md=5),
+            dbc.Col([
+                 dcc.Graph(id='archimedes-graph')
+            ], md=4),
+            dbc.Col([
+                html.H5("Resultados:"),
+                html.Div(id='archimedes-output-text', className="lead")
+            ], md=3, align="center"),
+        ]),
+        html.Hr(),
+        html.H5("Forma del Objeto y Calado de Equilibrio"),
+        html.P("El objeto tiene la forma elegida, escalada al volumen V_objeto. Flota con el calado (profundidad de la quilla bajo la superficie) en el que el volumen sumergido desaloja su propio peso: V_sumergido = (ρ_objeto / ρ_fluido) * V_objeto.", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Forma:"),
+                dbc.RadioItems(id='archimedes-shape', value='hull', options=[
+                    {'label': "Caja", 'value': 'box'},
+                    {'label': "Cilindro horizontal", 'value': 'cylinder'},
+                    {'label': "Esfera", 'value': 'sphere'},
+                    {'label': "Casco (Wigley)", 'value': 'hull'},
+                    {'label': "Malla subida (STL)", 'value': 'mesh'},
+                ]),
+                dcc.Upload(id='archimedes-mesh-upload', accept='.stl', children=html.Div("Arrastra o selecciona un archivo STL (superficie cerrada, z hacia arriba)"),
+                           style={'borderWidth': '1px', 'borderStyle': 'dashed', 'borderRadius': '5px', 'padding': '10px', 'textAlign': 'center', 'marginTop': '10px'}),
+                html.Div(id='archimedes-mesh-status', className="small text-muted mt-1"),
+                dcc.Store(id='archimedes-mesh-key'),
+                html.Br(),
+                html.Div(id='archimedes-draft-output'),
+            ], md=3),
+            dbc.Col([
+                dcc.Graph(id='archimedes-shape-graph')
+            ], md=5),
+            dbc.Col([
+                dcc.Graph(id='archimedes-draft-graph')
+            ], md=4),
+        ]),
+        sweep_section('archimedes'),
+    ]), className="my-3")
+
+# == Tab 4: Hydrostatic Pressure ==
+def hydrostatic_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Calculadora de Presión Hidrostática", className="card-title"),
+         html.P("Es la presión ejercida por un fluido en reposo debido a su peso. Depende de la densidad del fluido (ρ), la gravedad (g) y la profundidad (h).", className="text-muted"),
+         html.P("Fórmula: Ph = ρ * g * h.", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Profundidad (h) [m]:"),
+                dcc.Slider(id='hydrostatic-h-slider', min=0, max=100, step=1, value=10, marks={i*10: str(i*10) for i in range(0, 11)}),
+                html.Div(id='hydrostatic-h-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Br(),
+                html.Label("Densidad del Fluido (ρ) [kg/m³]:"),
+                dcc.Slider(id='hydrostatic-rho-slider', min=500, max=1500, step=50, value=1000, marks={800:'Aceite', 1000:'Agua', 1025:'Agua Salada'}),
+                html.Div(id='hydrostatic-rho-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+            ], md=4),
+            dbc.Col([
+                dcc.Graph(id='hydrostatic-pressure-graph')
+            ], md=5),
+             dbc.Col([
+                html.H5("Presión Hidrostática (Ph):"),
+                html.Div(id='hydrostatic-output-text', className="lead")
+            ], md=3, align="center"),
+        ]),
+        html.Hr(),
+        html.H5("Columna Estratificada"),
+        html.P("Capas de fluidos superpuestas (de la superficie hacia el fondo): dP/dz = ρ(z) * g. Con módulo de compresibilidad K, ρ = ρ₀ * e^(P/K).", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                dash_table.DataTable(
+                    id='hydrostatic-layers-table',
+                    columns=[
+                        {'name': "Capa", 'id': 'name'},
+                        {'name': "ρ [kg/m³]", 'id': 'density', 'type': 'numeric'},
+                        {'name': "Espesor [m]", 'id': 'thickness', 'type': 'numeric'},
+                    ],
+                    data=[
+                        {'name': "Aceite", 'density': 800, 'thickness': 2},
+                        {'name': "Agua", 'density': 1000, 'thickness': 5},
+                        {'name': "Agua Salada", 'density': 1025, 'thickness': 3},
+                    ],
+                    editable=True,
+                    row_deletable=True,
+                    style_cell={'textAlign': 'center'},
+                ),
+                dbc.Button("Agregar capa", id='hydrostatic-add-layer', size='sm', color='secondary', className="mt-2"),
+                html.Br(), html.Br(),
+                html.Label("Presión en la Superficie [Pa]:"),
+                dcc.Input(id='hydrostatic-surface-pressure-input', type='number', value=0, step=100, style={'width':'120px'}),
+                html.Br(),
+                html.Label("Módulo de Compresibilidad (K) [Pa] (0 = incompresible):"),
+                dcc.Input(id='hydrostatic-bulk-modulus-input', type='number', value=0, step=1e8, style={'width':'120px'}),
+                html.Br(), html.Br(),
+                html.Label("Resolución del Perfil [muestras]:"),
+                dcc.Slider(id='hydrostatic-resolution-slider', min=3, max=6, step=1, value=5, marks={i: f"10^{i}" for i in range(3, 7)}),
+            ], md=4),
+            dbc.Col([
+                dcc.Graph(id='hydrostatic-layers-graph')
+            ], md=5),
+            dbc.Col([
+                html.H5("Presión en las Interfaces:"),
+                html.Div(id='hydrostatic-layers-output', className="lead")
+            ], md=3, align="center"),
+        ]),
+        sweep_section('hydrostatic'),
+    ]), className="my-3")
+
+# == Tab 5: Continuity Equation ==
+def continuity_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Simulador de Continuidad (A₁v₁ = A₂v₂)", className="card-title"),
+         html.P("Para un fluido incompresible en flujo estacionario, el caudal (G = A*v) es constante a lo largo de una tubería.", className="text-muted"),
+        dbc.Row([
+             dbc.Col([
+                html.H6("Sección 1"),
+                html.Label("Diámetro Tubería 1 (D₁) [cm]:"),
+                dcc.Slider(id='continuity-D1-slider', min=1, max=10, step=0.5, value=8.0, marks={i: str(i) for i in range(1, 11)}),
+                html.Div(id='continuity-D1-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Div(id='continuity-A1-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
+                html.Br(),
+                html.Label("Velocidad Fluido 1 (v₁) [m/s]:"),
+                dcc.Slider(id='continuity-v1-slider', min=0.1, max=10, step=0.1, value=2.0, marks={i: str(i) for i in range(1, 11)}),
+                html.Div(id='continuity-v1-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+            ], md=4),
+             dbc.Col([
+                html.H6("Sección 2"),
+                html.Label("Diámetro Tubería 2 (D₂) [cm]:"),
+                dcc.Slider(id='continuity-D2-slider', min=1, max=10, step=0.5, value=2.0, marks={i: str(i) for i in range(1, 11)}),
+                html.Div(id='continuity-D2-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                html.Div(id='continuity-A2-display', style={'textAlign': 'center', 'marginTop': '5px', 'color':'gray', 'fontSize':'small'}),
+                html.Br(),
+                html.H5("Velocidad Fluido 2 (v₂):"),
+                html.Div(id='continuity-output-v2', className="lead fw-bold")
+            ], md=4),
+            dbc.Col([
+                html.H6("Visualización Caudal"),
+                dcc.Graph(id='continuity-graph')
+            ], md=4),
+        ]),
+         html.Hr(),
+         dbc.Row(dbc.Col(html.Div(id='continuity-gasto-display', className="lead text-center"))),
+        html.Hr(),
+        html.H5("Red de Tuberías"),
+        html.P("La Sección 1 (D₁, v₁) alimenta una red cuyos diámetros pasan de D₁ a D₂ hacia las salidas, que descargan a presión nula. En cada nodo el caudal que entra es igual al que sale; cada tramo pierde presión total H = p + ½ρv² en proporción a su caudal (pérdidas laminares).", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Tipo de Red:"),
+                dbc.RadioItems(id='continuity-network-kind', value='tree', options=[
+                    {'label': "Tramos en serie", 'value': 'series'},
+                    {'label': "Ramificada (árbol binario)", 'value': 'tree'},
+                    {'label': "Malla con lazos", 'value': 'grid'},
+                ]),
+                html.Br(),
+                html.Label("Número de Nodos:"),
+                dcc.Slider(id='continuity-network-nodes', min=10, max=5000, step=10, value=250, marks={i: str(i) for i in (10, 1000, 2000, 3000, 4000, 5000)}),
+                html.Div(id='continuity-network-output', className="mt-2"),
+            ], md=3),
+            dbc.Col([
+                dcc.Graph(id='continuity-network-graph')
+            ], md=5),
+            dbc.Col([
+                dcc.Graph(id='continuity-network-profile')
+            ], md=4),
+        ]),
+        sweep_section('continuity'),
+    ]), className="my-3")
+
+# == Tab 6: Torricelli's Theorem ==
+def torricelli_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Simulador de Salida de Fluido (Torricelli)", className="card-title"),
+        html.P("La velocidad de salida (v) de un fluido por un orificio es la misma que adquiriría un cuerpo cayendo libremente desde una altura (h) igual a la diferencia de nivel entre la superficie libre del fluido y el orificio.", className="text-muted"),
+        html.P("Fórmula: v = √(2 * g * h).", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Altura (h) [m]:"),
+                dcc.Slider(id='torricelli-h-slider', min=0.1, max=10, step=0.1, value=1.25, marks={i: str(i) for i in range(0, 11)}),
+                html.Div(id='torricelli-h-display', style={'textAlign': 'center', 'marginTop': '5px'}),
+                 html.Br(),
+                 html.Label("Gravedad (g) [m/s²]:"),
+                 dcc.Input(id='torricelli-g-input', type='number', value=G_ACCEL, step=0.01, style={'width':'100px'}),
+
+            ], md=4),
+            dbc.Col([
+                dcc.Graph(id='torricelli-graph')
+            ], md=5),
+            dbc.Col([
+                html.H5("Velocidad de Salida (v):"),
+                html.Div(id='torricelli-output-v', className="lead fw-bold")
+            ], md=3, align="center"),
+        ]),
+        html.Hr(),
+        html.H5("Vaciado del Tanque"),
+        html.P("El tanque se vacía por el orificio desde la altura h: A(h) · dh/dt = -Cd · a · √(2gh). Caudal: Q = Cd · a · v.", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Área del Tanque (A) [m²]:"),
+                dcc.Slider(id='torricelli-tank-area-slider', min=0.1, max=5, step=0.1, value=1, marks={i: str(i) for i in range(0, 6)}),
+                html.Br(),
+                html.Label("Diámetro del Orificio (d) [cm]:"),
+                dcc.Slider(id='torricelli-orifice-d-slider', min=0.5, max=10, step=0.5, value=2, marks={i: str(i) for i in range(1, 11)}),
+                html.Br(),
+                html.Label("Coeficiente de Descarga (Cd):"),
+                dcc.Slider(id='torricelli-cd-slider', min=0.5, max=1, step=0.01, value=0.61, marks={0.5: '0.5', 0.61: '0.61', 0.8: '0.8', 1: '1'}),
+                html.Br(),
+                html.Label("Forma del Tanque:"),
+                dbc.RadioItems(id='torricelli-tank-shape', value='prism', options=[
+                    {'label': "Prismático (sección constante)", 'value': 'prism'},
+                    {'label': "Cónico (vértice abajo, A en la superficie)", 'value': 'cone'},
+                ]),
+            ], md=4),
+            dbc.Col([
+                dcc.Graph(id='torricelli-drain-graph')
+            ], md=6),
+            dbc.Col([
+                html.H5("Tiempo de Vaciado:"),
+                html.Div(id='torricelli-drain-time', className="lead fw-bold")
+            ], md=2, align="center"),
+        ]),
+        sweep_section('torricelli'),
+     ]), className="my-3")
+
+# == Tab 7: Batch evaluation ==
+# Upload, progress and download run in the browser (assets/batch.js) against the routes of batch.py
+BATCH_LABELS = {
+    'pressure': "Presión (P=F/A)",
+    'hydraulic': "Prensa Hidráulica",
+    'archimedes': "Principio de Arquímedes",
+    'hydrostatic': "Presión Hidrostática",
+    'continuity': "Ecuación de Continuidad",
+    'torricelli': "Teorema de Torricelli",
+}
+
+def batch_tab():
+    import dash_bootstrap_components as dbc
+    return dbc.Card(dbc.CardBody([
+        html.H4("Cálculo por Lotes", className="card-title"),
+        html.P("Sube un archivo CSV o Parquet con un caso por fila; cada fila se evalúa con las fórmulas del modelo elegido y se descarga el archivo con las columnas de resultados añadidas.", className="text-muted"),
+        html.P("El archivo se procesa por bloques en el servidor, así que puede tener millones de filas.", className="text-muted"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Modelo:"),
+                dbc.Select(id='batch-model', value='pressure', options=[
+                    {'label': label, 'value': model} for model, label in BATCH_LABELS.items()
+                ]),
+                html.Ul([
+                    html.Li(f"{BATCH_LABELS[model]}: {', '.join(columns)}" + (f" (opcional: {', '.join(defaults)})" if defaults else ''))
+                    for model, (columns, _, defaults) in BATCH_MODELS.items()
+                ], className="text-muted small mt-2"),
+                dbc.Button("Subir archivo…", id='batch-upload-button', color="primary"),
+            ], md=5),
+            dbc.Col([
+                html.H5("Progreso:"),
+                html.Div(html.Div(id='batch-progress-bar', className="progress-bar", style={'width': '0%'}), className="progress"),
+                html.Div(id='batch-status', className="mt-2"),
+                html.A("Descargar resultados", id='batch-download', className="btn btn-success mt-2", style={'display': 'none'}),
+            ], md=7),
+        ]),
+    ]), className="my-3")
+
+# (tab_id, label, builder)
+TABS = [
+    ('tab-pressure', "Presión (P=F/A)", pressure_tab),
+    ('tab-hydraulic', "Prensa Hidráulica", hydraulic_tab),
+    ('tab-archimedes', "Principio de Arquímedes", archimedes_tab),
+    ('tab-hydrostatic', "Presión Hidrostática", hydrostatic_tab),
+    ('tab-continuity', "Ecuación de Continuidad", continuity_tab),
+    ('tab-torricelli', "Teorema de Torricelli", torricelli_tab),
+    ('tab-batch', "Cálculo por Lotes", batch_tab),
+]
+TAB_IDS = tuple(tab_id for tab_id, _, _ in TABS)
+
+def build_layout():
+    import dash_bootstrap_components as dbc
+    return dbc.Container([
+        dbc.Row(dbc.Col(html.H1("Dashboard de Conceptos de Fluidos (Unidad 7)", className="text-center my-4"))),
+        dcc.Store(id='visited-tabs', data=[]),
+
+        dbc.Tabs([
+            dbc.Tab(label=label, tab_id=tab_id, children=html.Div(id=f'{tab_id}-content'))
+            for tab_id, label, _ in TABS
+        ], id='tabs', active_tab=TABS[0][0])
+    ], fluid=True)
+
+# --- Callback registration ---
+# Callbacks are declared when the module is imported and registered on the app by create_app
+_registrations = []
+
+def app_callback(*args, **kwargs):
+    """``app.callback`` for the app built by ``create_app``."""
+    def decorator(func):
+        _registrations.append(lambda app: app.callback(*args, **kwargs)(func))
+        return func
+    return decorator
+
+def app_clientside_callback(*args, **kwargs):
+    """``app.clientside_callback`` for the app built by ``create_app``."""
+    _registrations.append(lambda app: app.clientside_callback(*args, **kwargs))
+
+# Function object of the fluid_callback being run; with the name of a build function it identifies a kind of figure
+_running_callback = contextvars.ContextVar('running_callback', default=None)
+
+@contextlib.contextmanager
+def _running(func):
+    """Runs the block as callback ``func``: timed in the metrics and known to the figure templates."""
+    token = _running_callback.set(func)
+    try:
+        with metrics.track_callback(func.__name__):
+            yield
+    finally:
+        _running_callback.reset(token)
+
+def fluid_callback(outputs, inputs, clientside_function=None, state=(), prevent_initial_call=None):
+    """Registers the decorated function as the callback of one tab.
+
+    The decorated function always returns every output of the tab and stays the
+    reference implementation. With CLIENTSIDE_CALLBACKS enabled, the text outputs
+    are produced by ``window.dash_clientside.fluidos[clientside_function]`` in
+    assets/fluidos.js and the server only answers for the figure. Callbacks
+    without ``clientside_function`` always run entirely on the server.
+    ``prevent_initial_call`` is passed on to ``app.callback``.
+    """
+    def decorator(func):
+        if not CLIENTSIDE_CALLBACKS or clientside_function is None:
+            @functools.wraps(func)
+            def all_outputs(*args):
+                with _running(func):
+                    return func(*args)
+
+            app_callback(outputs, inputs, list(state), prevent_initial_call=prevent_initial_call)(all_outputs)
+            return func
+
+        figure_index = next(i for i, o in enumerate(outputs) if o.component_property == 'figure')
+        text_outputs = [o for i, o in enumerate(outputs) if i != figure_index]
+        app_clientside_callback(ClientsideFunction(namespace='fluidos', function_name=clientside_function), text_outputs, inputs)
+
+        @functools.wraps(func)
+        def figure_only(*args):
+            with _running(func):
+                return func(*args)[figure_index]
+
+        app_callback(outputs[figure_index], inputs, prevent_initial_call=prevent_initial_call)(figure_only)
+        return func
+    return decorator
+
+def _is_initial_call():
+    try:
+        return dash.ctx.triggered_id is None
+    except dash.exceptions.MissingCallbackContextException:
+        return True # Called directly, outside of a Dash request
+
+def figure_or_patch(build_figure, updates):
+    """Returns ``build_figure()`` on the initial call of a callback and a ``dash.Patch`` afterwards.
+
+    ``updates`` maps paths inside the figure, e.g. ``('data', 0, 'y')``, to their new
+    values and must cover every part of the figure that depends on the inputs.
+    """
+    callback = metrics.current_callback.get()
+    updates = {path: serialization.encode_array(value) for path, value in updates.items()}
+    if not PATCH_UPDATES or _is_initial_call():
+        with metrics.time('fluidos_figure_seconds', callback=callback, kind='full'):
+            return _full_figure(build_figure, updates)
+
+    with metrics.time('fluidos_figure_seconds', callback=callback, kind='patch'):
+        return _apply_updates(dash.Patch(), updates)
+
+def full_figure(build_figure, updates):
+    """Like ``figure_or_patch``, for callbacks that always send the whole figure."""
+    updates = {path: serialization.encode_array(value) for path, value in updates.items()}
+    with metrics.time('fluidos_figure_seconds', callback=metrics.current_callback.get(), kind='full'):
+        return _full_figure(build_figure, updates)
+
+def _full_figure(build_figure, updates):
+    if figure_templates is not None:
+        # By function object: closures made by one factory share their code, not their figures
+        callback = _running_callback.get()
+        key = (callback, build_figure.__name__) if callback is not None else None
+        return figure_templates.figure(build_figure, updates, key)
+    figure = serialization.figure_dict(build_figure())
+    if not serialization.typed_arrays_enabled():
+        return figure
+    # Swap the plain arrays for their typed-array encoding
+    return _apply_updates(figure, updates)
+
+def _apply_updates(figure, updates):
+    for path, value in updates.items():
+        target = figure
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = value
+    return figure
+
+# --- Callbacks ---
+
+# == Tab rendering ==
+# Sliders that start heavy computations keep updating on release, even in live-drag mode
+DRAG_EXCLUDED = {'continuity-network-nodes', 'hydrostatic-resolution-slider'} | {f'{tab}-sweep-n' for tab in sweeps.SWEEPS}
+
+def live_drag(component):
+    for child in component._traverse():
+        if isinstance(child, dcc.Slider) and child.id not in DRAG_EXCLUDED:
+            child.updatemode = 'drag'
+    return component
+
+@app_callback(
+    [Output(f'{tab_id}-content', 'children') for tab_id, _, _ in TABS] + [Output('visited-tabs', 'data')],
+    Input('tabs', 'active_tab'),
+    State('visited-tabs', 'data')
+)
+def render_tab(active_tab, visited):
+    # Build the content of a tab the first time it is activated; visited tabs keep theirs
+    # The tab comes from the client: anything else than a tab id is counted as 'unknown'
+    metrics.inc('fluidos_tab_activations_total', tab=active_tab if active_tab in TAB_IDS else 'unknown')
+    with metrics.track_callback('render_tab'):
+        if active_tab in visited:
+            raise dash.exceptions.PreventUpdate
+        contents = [build_tab() if tab_id == active_tab else dash.no_update for tab_id, _, build_tab in TABS]
+        if LIVE_DRAG:
+            contents = [dash.no_update if c is dash.no_update else live_drag(c) for c in contents]
+    return contents + [visited + [active_tab]]
+
+# == Callback 1: Pressure ==
+@fluid_callback(
+    [Output('pressure-output-text', 'children'),
+     Output('pressure-gauge-graph', 'figure'),
+     Output('pressure-force-display', 'children'),
+     Output('pressure-area-display', 'children')],
+    [Input('pressure-force-slider', 'value'),
+     Input('pressure-area-slider', 'value')],
+    clientside_function='pressure'
+)
+def update_pressure(force, area):
+    result = physics.pressure(force, area)
+    pressure = float(result.pressure)
+    if not result.valid:
+        pressure_text = "Área inválida (debe ser > 0)."
+        area_val = 0
+    else:
+        pressure_text = f"P = {force:.0f} N / {area:.3f} m² = {pressure:,.2f} Pa ({pressure/1000:,.2f} kPa)"
+        area_val = area
+
+    force_display = f"{force:.0f} N"
+    area_display = f"{area_val:.3f} m²"
+
+    # Create gauge figure
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure(go.Indicator(
+            mode = "gauge+number",
+            value = pressure,
+            domain = {'x': [0, 1], 'y': [0, 1]},
+            title = {'text': "Presión (Pa)"},
+            gauge = {
+                'axis': {'range': [0, max(50000, pressure * 1.2)]}, # Dynamic range
+                'bar': {'color': "darkblue"},
+                'steps' : [
+                     {'range': [0, 10000], 'color': "lightgreen"},
+                     {'range': [10000, 30000], 'color': "yellow"},
+                     {'range': [30000, 50000], 'color': "orange"}],
+                'threshold' : {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': 45000} # Example threshold
+                }))
+        fig.update_layout(height=250, margin=dict(l=20, r=20, t=50, b=20))
+        return fig
+    fig = figure_or_patch(build_figure, {
+        ('data', 0, 'value'): pressure,
+        ('data', 0, 'gauge', 'axis', 'range'): [0, max(50000, pressure * 1.2)],
+    })
+
+
+    return pressure_text, fig, force_display, area_display
+
+# == Callback 2: Hydraulic Press ==
+@fluid_callback(
+    [Output('hydraulic-output-F', 'children'),
+     Output('hydraulic-press-graph', 'figure'),
+     Output('hydraulic-pressure-display', 'children'),
+     Output('hydraulic-advantage-display', 'children'),
+     Output('hydraulic-f-display', 'children'),
+     Output('hydraulic-d-display', 'children'),
+     Output('hydraulic-D-display', 'children'),
+     Output('hydraulic-area-a-display', 'children'),
+     Output('hydraulic-area-A-display', 'children')],
+    [Input('hydraulic-f-slider', 'value'),
+     Input('hydraulic-d-slider', 'value'),
+     Input('hydraulic-D-slider', 'value')],
+    clientside_function='hydraulic_press'
+)
+def update_hydraulic_press(f_in, d_cm, D_cm):
+    # P = f/a, F = P * A, advantage = F/f
+    result = physics.hydraulic_press(f_in, d_cm, D_cm)
+    area_a, area_A = float(result.area_a), float(result.area_A)
+    pressure, F_out, advantage = float(result.pressure), float(result.force_out), float(result.advantage)
+
+    if not result.valid:
+        F_text = "Área 'a' inválida."
+        pressure_text = "N/A"
+        advantage_text = "N/A"
+    else:
+        F_text = f"{F_out:,.2f} N"
+        pressure_text = f"{pressure:,.2f} Pa ({pressure/1000:,.2f} kPa)"
+        advantage_text = f"{advantage:.2f}"
+
+
+    # Create bar chart figure comparing forces
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=['Entrada (f)', 'Salida (F)'],
+            y=[f_in, F_out],
+            marker_color=['rgb(55, 83, 109)', 'rgb(26, 118, 255)'],
+            text=[f"{f_in:.1f} N", f"{F_out:,.1f} N"],
+            textposition='auto'
+        ))
+        fig.update_layout(
+            title='Comparación de Fuerzas',
+            yaxis_title='Fuerza (N)',
+            height=250,
+            margin=dict(l=20, r=20, t=50, b=20)
+        )
+        return fig
+    fig = figure_or_patch(build_figure, {
+        ('data', 0, 'y'): [f_in, F_out],
+        ('data', 0, 'text'): [f"{f_in:.1f} N", f"{F_out:,.1f} N"],
+    })
+
+    f_display = f"{f_in:.1f} N"
+    d_display = f"{d_cm:.1f} cm"
+    D_display = f"{D_cm:.1f} cm"
+    area_a_display = f"Área (a): {area_a:.4f} m²"
+    area_A_display = f"Área (A): {area_A:.4f} m²"
+
+
+    return F_text, fig, pressure_text, advantage_text, f_display, d_display, D_display, area_a_display, area_A_display
+
+# == Callback 3: Archimedes' Principle ==
+# Situation text for each physics.buoyancy() state
+BUOYANCY_SITUATIONS = {
+    physics.SINKS: "El objeto se hunde.",
+    physics.SUSPENDED: "El objeto está suspendido (flotabilidad neutra).",
+    physics.FLOATS: "El objeto flota.",
+}
+
+@fluid_callback(
+    [Output('archimedes-output-text', 'children'),
+     Output('archimedes-graph', 'figure'),
+     Output('archimedes-rho-obj-display', 'children'),
+     Output('archimedes-vol-obj-display', 'children'),
+     Output('archimedes-rho-fluid-display', 'children')],
+    [Input('archimedes-rho-obj-slider', 'value'),
+     Input('archimedes-vol-obj-slider', 'value'),
+     Input('archimedes-rho-fluid-slider', 'value')],
+    clientside_function='archimedes'
+)
+def update_archimedes(rho_obj, vol_obj, rho_fluid):
+    # Weight (W), buoyancy (E) and submerged volume
+    result = physics.buoyancy(rho_obj, vol_obj, rho_fluid)
+    weight, buoyancy = float(result.weight), float(result.buoyancy)
+    vol_submerged = float(result.vol_submerged)
+    percentage_submerged = float(result.fraction_submerged) * 100
+    situation = BUOYANCY_SITUATIONS[int(result.state)]
+
+    output_html = [
+        html.P(f"Peso (W): {weight:,.2f} N"),
+        html.P(f"Empuje (E): {buoyancy:,.2f} N"),
+        html.P(f"Vol. Sumergido: {vol_submerged:.4f} m³ ({percentage_submerged:.1f}%)"),
+        html.P(situation, className="fw-bold")
+    ]
+
+    # Create bar chart comparing W and E
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=['Peso (W)', 'Empuje (E)'],
+            y=[weight, buoyancy],
+            marker_color=['red', 'blue'],
+            text=[f"{weight:.1f} N", f"{buoyancy:.1f} N"],
+            textposition='auto'
+        ))
+        fig.update_layout(
+            title='Comparación Peso vs. Empuje',
+            yaxis_title='Fuerza (N)',
+             height=300,
+             margin=dict(l=20, r=20, t=50, b=20)
+        )
+        return fig
+    fig = figure_or_patch(build_figure, {
+        ('data', 0, 'y'): [weight, buoyancy],
+        ('data', 0, 'text'): [f"{weight:.1f} N", f"{buoyancy:.1f} N"],
+    })
+
+    rho_obj_display = f"{rho_obj} kg/m³"
+    vol_obj_display = f"{vol_obj:.4f} m³"
+    rho_fluid_display = f"{rho_fluid} kg/m³"
+
+    return output_html, fig, rho_obj_display, vol_obj_display, rho_fluid_display
+
+# == Callback 3b: Uploaded meshes (Archimedes) ==
+@fluid_callback(
+    [Output('archimedes-mesh-key', 'data'),
+     Output('archimedes-shape', 'value'),
+     Output('archimedes-mesh-upload', 'contents'),
+     Output('archimedes-mesh-status', 'children')],
+    [Input('archimedes-mesh-upload', 'contents')],
+    state=[State('archimedes-mesh-upload', 'filename')]
+)
+def upload_archimedes_mesh(contents, filename):
+    if contents is None:
+        raise dash.exceptions.PreventUpdate
+    try:
+        key = meshes.store_mesh(base64.b64decode(contents.split(',', 1)[1]))
+        faces = len(meshes.draft_table(key).triangles)
+    except (ValueError, IndexError) as exc:
+        return dash.no_update, dash.no_update, None, f"{filename}: {exc}"
+    # The file is saved on the server: clearing the contents keeps it out of later requests
+    return key, 'mesh', None, f"{filename}: {faces:,} triángulos."
+
+# == Callback 3c: Shape and equilibrium draft (Archimedes) ==
+MAX_DISPLAY_FACES = 20_000 # Larger meshes are solved but not drawn
+
+def _archimedes_table(shape, mesh_key):
+    """``(table, message)``: the DraftTable of the selected shape, or the message shown instead."""
+    key = mesh_key if shape == 'mesh' else shape
+    if not key:
+        return None, html.P("Sube un archivo STL para usar su forma.")
+    try:
+        # Built once per shape; only the root solve depends on the sliders
+        return meshes.draft_table(key), None
+    except (OSError, KeyError):
+        return None, html.P("La malla ya no está disponible en el servidor; súbela de nuevo.")
+
+def _archimedes_draft(table, rho_obj, vol_obj, rho_fluid):
+    """Submerged fraction and draft [m] of the shape scaled to ``vol_obj``."""
+    fraction = min(rho_obj / rho_fluid, 1.0)
+    return fraction, vol_obj ** (1 / 3) * table.draft(fraction)
+
+# The mesh is only sent when the shape or its size changes: the densities move the waterline alone
+@fluid_callback(
+    [Output('archimedes-shape-graph', 'figure')],
+    [Input('archimedes-shape', 'value'),
+     Input('archimedes-mesh-key', 'data'),
+     Input('archimedes-vol-obj-slider', 'value')],
+    state=[State('archimedes-rho-obj-slider', 'value'),
+           State('archimedes-rho-fluid-slider', 'value')]
+)
+def update_archimedes_shape(shape, mesh_key, vol_obj, rho_obj, rho_fluid):
+    # The figure keeps the last shape: later updates are patches against it
+    table, _ = _archimedes_table(shape, mesh_key)
+    if table is None:
+        return [dash.no_update]
+
+    scale = vol_obj ** (1 / 3)
+    if len(table.triangles) <= MAX_DISPLAY_FACES:
+        vertices, faces = table.indexed
+    else:
+        vertices, faces = np.empty((0, 3)), np.empty((0, 3), dtype=int)
+    vertices = vertices * scale
+    corners = table.triangles.reshape(-1, 3)
+    low, high = corners.min(axis=0)[:2] * scale, corners.max(axis=0)[:2] * scale
+    margin = 0.1 * (high - low)
+    plane_x = np.array([low[0] - margin[0], high[0] + margin[0], high[0] + margin[0], low[0] - margin[0]])
+    plane_y = np.array([low[1] - margin[1], low[1] - margin[1], high[1] + margin[1], high[1] + margin[1]])
+    shape_title = 'Forma y Línea de Flotación' if len(faces) else f'Línea de Flotación (malla de {len(table.triangles):,} triángulos, no dibujada)'
+
+    def build_shape_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Mesh3d(
+            x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+            i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+            color='sandybrown', flatshading=True, name='Objeto'
+        ))
+        fig.add_trace(go.Mesh3d(
+            x=plane_x, y=plane_y, z=np.zeros(4),
+            i=[0, 0], j=[1, 2], k=[2, 3],
+            color='royalblue', opacity=0.35, name='Superficie'
+        ))
+        fig.update_layout(
+            title=shape_title,
+            scene=dict(aspectmode='data', xaxis_title='x [m]', yaxis_title='y [m]', zaxis_title='z [m]'),
+            height=350,
+            margin=dict(l=0, r=0, t=50, b=0)
+        )
+        return fig
+    updates = {
+        ('data', 0, 'x'): vertices[:, 0], ('data', 0, 'y'): vertices[:, 1], ('data', 0, 'z'): vertices[:, 2],
+        ('data', 0, 'i'): faces[:, 0], ('data', 0, 'j'): faces[:, 1], ('data', 0, 'k'): faces[:, 2],
+        ('data', 1, 'x'): plane_x, ('data', 1, 'y'): plane_y,
+        ('layout', 'title', 'text'): shape_title,
+    }
+    if not PATCH_UPDATES or _is_initial_call():
+        # A full figure needs the waterline; patches leave it to update_archimedes_draft, which runs along
+        updates[('data', 1, 'z')] = np.full(4, _archimedes_draft(table, rho_obj, vol_obj, rho_fluid)[1])
+    return [figure_or_patch(build_shape_figure, updates)]
+
+@fluid_callback(
+    [Output('archimedes-shape-graph', 'figure', allow_duplicate=True),
+     Output('archimedes-draft-graph', 'figure'),
+     Output('archimedes-draft-output', 'children')],
+    [Input('archimedes-shape', 'value'),
+     Input('archimedes-mesh-key', 'data'),
+     Input('archimedes-rho-obj-slider', 'value'),
+     Input('archimedes-vol-obj-slider', 'value'),
+     Input('archimedes-rho-fluid-slider', 'value')],
+    prevent_initial_call='initial_duplicate'
+)
+def update_archimedes_draft(shape, mesh_key, rho_obj, vol_obj, rho_fluid):
+    table, message = _archimedes_table(shape, mesh_key)
+    if table is None:
+        return dash.no_update, dash.no_update, message
+
+    state = int(physics.buoyancy(rho_obj, vol_obj, rho_fluid).state)
+    fraction, draft = _archimedes_draft(table, rho_obj, vol_obj, rho_fluid)
+    scale = vol_obj ** (1 / 3)
+    height = scale * table.height
+
+    # Only the waterline of the shape graph, drawn by update_archimedes_shape on the initial call.
+    # The patch depends only on the inputs, never on which one changed: the response cache and
+    # the coalescing reuse it for any earlier figure
+    if _is_initial_call():
+        waterline = dash.no_update
+    else:
+        waterline = _apply_updates(dash.Patch(), {('data', 1, 'z'): serialization.encode_array(np.full(4, draft))})
+
+    def build_draft_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=table.volumes * 100, y=table.drafts * scale,
+            mode='lines',
+            name='Calado',
+            line=dict(color='royalblue', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=[fraction * 100], y=[draft],
+            mode='markers',
+            marker=dict(color='red', size=11),
+            name='Equilibrio'
+        ))
+        fig.update_layout(
+            title='Calado vs. Volumen Sumergido',
+            xaxis_title='Volumen Sumergido [%]',
+            yaxis_title='Calado [m]',
+            height=350,
+            margin=dict(l=20, r=20, t=50, b=20),
+            showlegend=False
+        )
+        return fig
+    draft_fig = figure_or_patch(build_draft_figure, {
+        ('data', 0, 'x'): table.volumes * 100,
+        ('data', 0, 'y'): table.drafts * scale,
+        ('data', 1, 'x'): [fraction * 100],
+        ('data', 1, 'y'): [draft],
+    })
+
+    output_html = [
+        html.P(f"Calado: {draft:.3f} m"),
+        html.P(f"Francobordo: {height - draft:.3f} m (altura {height:.3f} m)"),
+        html.P(f"Vol. Sumergido: {fraction * vol_obj:.4f} m³ ({fraction * 100:.1f}%)"),
+        html.P(BUOYANCY_SITUATIONS[state], className="fw-bold"),
+    ]
+    return waterline, draft_fig, output_html
+
+# == Callback 4: Hydrostatic Pressure ==
+@fluid_callback(
+    [Output('hydrostatic-output-text', 'children'),
+     Output('hydrostatic-pressure-graph', 'figure'),
+     Output('hydrostatic-h-display', 'children'),
+     Output('hydrostatic-rho-display', 'children')],
+    [Input('hydrostatic-h-slider', 'value'),
+     Input('hydrostatic-rho-slider', 'value')],
+    clientside_function='hydrostatic_pressure'
+)
+def update_hydrostatic_pressure(h, rho):
+    # Calculate hydrostatic pressure
+    pressure_h = float(physics.hydrostatic_pressure(rho, h))
+
+    pressure_lines = [
+        f"Ph = {rho} kg/m³ * {G_ACCEL:.2f} m/s² * {h} m",
+        f"<b>Ph = {pressure_h:,.2f} Pa ({pressure_h/1000:,.2f} kPa)</b>",
+    ]
+
+    # Create line graph showing pressure vs depth
+    depths = np.linspace(0, h * 1.1, 50) # Depths up to 110% of selected h
+    pressures = physics.hydrostatic_pressure(rho, depths)
+
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=depths,
+            y=pressures,
+            mode='lines',
+            name='Ph vs h',
+            line=dict(color='royalblue', width=3)
+        ))
+        # Add point for the selected depth
+        fig.add_trace(go.Scatter(
+            x=[h],
+            y=[pressure_h],
+            mode='markers',
+            marker=dict(color='red', size=10, symbol='x'),
+            name=f'Ph en h={h}m'
+        ))
+
+        fig.update_layout(
+            title='Presión Hidrostática vs. Profundidad',
+            xaxis_title='Profundidad (h) [m]',
+            yaxis_title='Presión (Ph) [Pa]',
+            height=300,
+            margin=dict(l=20, r=20, t=50, b=20),
+            showlegend=True
+        )
+        return fig
+    fig = figure_or_patch(build_figure, {
+        ('data', 0, 'x'): depths,
+        ('data', 0, 'y'): pressures,
+        ('data', 1, 'x'): [h],
+        ('data', 1, 'y'): [pressure_h],
+        ('data', 1, 'name'): f'Ph en h={h}m',
+    })
+
+    h_display = f"{h} m"
+    rho_display = f"{rho} kg/m³"
+
+    return html.Div([html.P(line) for line in pressure_lines]), fig, h_display, rho_display
+
+
+# == Callback 4b: Stratified fluid column ==
+PROFILE_POINTS = 1000 # Points sent to the browser, whatever the resolution of the profile
+
+app_clientside_callback(
+    ClientsideFunction(namespace='fluidos', function_name='add_layer'),
+    Output('hydrostatic-layers-table', 'data'),
+    Input('hydrostatic-add-layer', 'n_clicks'),
+    State('hydrostatic-layers-table', 'data'),
+    prevent_initial_call=True
+)
+
+def _valid_layers(rows):
+    layers = []
+    for row in rows or []:
+        try:
+            density, thickness = float(row.get('density')), float(row.get('thickness'))
+        except (TypeError, ValueError):
+            continue
+        if density > 0 and thickness > 0:
+            layers.append((row.get('name') or f"Capa {len(layers) + 1}", density, thickness))
+    return layers
+
+@fluid_callback(
+    [Output('hydrostatic-layers-graph', 'figure'),
+     Output('hydrostatic-layers-output', 'children')],
+    [Input('hydrostatic-layers-table', 'data'),
+     Input('hydrostatic-surface-pressure-input', 'value'),
+     Input('hydrostatic-bulk-modulus-input', 'value'),
+     Input('hydrostatic-resolution-slider', 'value')]
+)
+def update_hydrostatic_layers(rows, surface_pressure, bulk_modulus, resolution):
+    layers = _valid_layers(rows)
+    if not layers:
+        return {'data': [], 'layout': {}}, html.P("Agregue al menos una capa con densidad y espesor positivos.")
+
+    names, densities, thicknesses = zip(*layers)
+    try:
+        profile = physics.layered_pressure(
+            densities, thicknesses,
+            n_samples=10**int(resolution or 5),
+            surface_pressure=surface_pressure or 0.0,
+            bulk_modulus=bulk_modulus if bulk_modulus and bulk_modulus > 0 else None,
+        )
+    except ValueError as exc: # K too small for the column: the compressible model diverges
+        return {'data': [], 'layout': {}}, html.P(str(exc))
+    # The payload stays at PROFILE_POINTS points regardless of the resolution
+    indices = lttb_indices(profile.depth, profile.pressure, PROFILE_POINTS)
+    interface_pressures = np.interp(profile.interfaces, profile.depth, profile.pressure)
+
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=profile.depth[indices],
+            y=profile.pressure[indices],
+            mode='lines',
+            name='P vs z',
+            line=dict(color='royalblue', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=profile.interfaces,
+            y=interface_pressures,
+            mode='markers',
+            marker=dict(color='red', size=9),
+            text=list(names),
+            name='Interfaces'
+        ))
+        fig.add_trace(go.Scatter(
+            x=profile.depth[indices],
+            y=profile.density[indices],
+            mode='lines',
+            name='ρ(z)',
+            line=dict(color='gray', dash='dot', shape='hv'),
+            yaxis='y2'
+        ))
+        fig.update_layout(
+            title='Presión en la Columna Estratificada',
+            xaxis_title='Profundidad (z) [m]',
+            yaxis_title='Presión (P) [Pa]',
+            yaxis2=dict(title='Densidad [kg/m³]', overlaying='y', side='right', showgrid=False),
+            height=350,
+            margin=dict(l=20, r=20, t=50, b=20),
+            showlegend=True
+        )
+        return fig
+    fig = full_figure(build_figure, {
+        ('data', 0, 'x'): profile.depth[indices],
+        ('data', 0, 'y'): profile.pressure[indices],
+        ('data', 1, 'x'): profile.interfaces,
+        ('data', 1, 'y'): interface_pressures,
+        ('data', 1, 'text'): list(names),
+        ('data', 2, 'x'): profile.depth[indices],
+        ('data', 2, 'y'): profile.density[indices],
+    })
+
+    output_html = [
+        html.P(f"{name} (z = {depth:g} m): {pressure:,.2f} Pa ({pressure/1000:,.2f} kPa)")
+        for name, depth, pressure in zip(names, profile.interfaces, interface_pressures)
+    ]
+    return fig, output_html
+
+# == Callback 5: Continuity ==
+@fluid_callback(
+    [Output('continuity-output-v2', 'children'),
+     Output('continuity-graph', 'figure'),
+     Output('continuity-gasto-display', 'children'),
+     Output('continuity-D1-display', 'children'),
+     Output('continuity-A1-display', 'children'),
+     Output('continuity-v1-display', 'children'),
+     Output('continuity-D2-display', 'children'),
+     Output('continuity-A2-display', 'children')],
+    [Input('continuity-D1-slider', 'value'),
+     Input('continuity-v1-slider', 'value'),
+     Input('continuity-D2-slider', 'value')],
+    clientside_function='continuity'
+)
+def update_continuity(D1_cm, v1, D2_cm):
+    # v2 from A1*v1 = A2*v2, flow rate (Gasto, G) = A1*v1
+    result = physics.continuity(D1_cm, v1, D2_cm)
+    A1, A2 = float(result.A1), float(result.A2)
+    v2, gasto = float(result.v2), float(result.flow)
+
+    if not result.valid:
+        v2_text = "Diámetro D₂ inválido."
+    else:
+        v2_text = f"{v2:.2f} m/s"
+
+    # Create bar chart showing constant flow rate
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=['Sección 1 (A₁v₁)', 'Sección 2 (A₂v₂)'],
+            y=[A1*v1, A2*v2], # These should be equal if calculation is correct
+            marker_color=['mediumseagreen', 'lightcoral'],
+            text=[f"{A1*v1:.4f} m³/s", f"{A2*v2:.4f} m³/s"],
+            textposition='auto'
+        ))
+        fig.update_layout(
+            title='Caudal (Gasto) Constante',
+            yaxis_title='Caudal (G) [m³/s]',
+            height=250,
+            margin=dict(l=20, r=20, t=50, b=20),
+            yaxis_range=[0, max(A1*v1, A2*v2)*1.2] # Ensure bars are visible
+        )
+        return fig
+    fig = figure_or_patch(build_figure, {
+        ('data', 0, 'y'): [A1*v1, A2*v2],
+        ('data', 0, 'text'): [f"{A1*v1:.4f} m³/s", f"{A2*v2:.4f} m³/s"],
+        ('layout', 'yaxis', 'range'): [0, max(A1*v1, A2*v2)*1.2],
+    })
+
+    gasto_display = f"Caudal (Gasto, G): {gasto:.4f} m³/s"
+    D1_display = f"{D1_cm:.1f} cm"
+    A1_display = f"Área (A₁): {A1:.5f} m²"
+    v1_display = f"{v1:.2f} m/s"
+    D2_display = f"{D2_cm:.1f} cm"
+    A2_display = f"Área (A₂): {A2:.5f} m²"
+
+    return v2_text, fig, gasto_display, D1_display, A1_display, v1_display, D2_display, A2_display
+
+
+# == Callback 5b: Pipe network (Continuity) ==
+@fluid_callback(
+    [Output('continuity-network-graph', 'figure'),
+     Output('continuity-network-profile', 'figure'),
+     Output('continuity-network-output', 'children')],
+    [Input('continuity-network-kind', 'value'),
+     Input('continuity-network-nodes', 'value'),
+     Input('continuity-D1-slider', 'value'),
+     Input('continuity-v1-slider', 'value'),
+     Input('continuity-D2-slider', 'value')]
+)
+def update_continuity_network(kind, n_nodes, D1_cm, v1, D2_cm):
+    # The factorization is cached per topology and diameters: moving v1 only re-solves
+    solver = pipe_network.network_solver(kind, n_nodes, D1_cm, D2_cm)
+    network = solver.network
+    inlet_flow = float(physics.circle_area(D1_cm) * v1)
+    result = solver.solve(inlet_flow)
+    speed = np.abs(result.velocity)
+
+    # Segments as one line trace broken by NaN, coloured by speed at their midpoints
+    segment_x = np.column_stack((network.x[network.start], network.x[network.end], np.full(len(network.start), np.nan))).ravel()
+    segment_y = np.column_stack((network.y[network.start], network.y[network.end], np.full(len(network.start), np.nan))).ravel()
+    mid_x = (network.x[network.start] + network.x[network.end]) / 2
+    mid_y = (network.y[network.start] + network.y[network.end]) / 2
+    network_title = f'Velocidades en la Red ({len(network.x)} nodos, {len(network.start)} tramos)'
+
+    def build_network_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=segment_x, y=segment_y,
+            mode='lines',
+            line=dict(color='lightgray', width=1),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=mid_x, y=mid_y,
+            mode='markers',
+            marker=dict(color=speed, colorscale='Viridis', size=6, colorbar=dict(title='|v| [m/s]')),
+            hovertemplate='|v|: %{marker.color:.3f} m/s<extra></extra>',
+            showlegend=False
+        ))
+        fig.update_layout(
+            title=network_title,
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+            height=350,
+            margin=dict(l=20, r=20, t=50, b=20)
+        )
+        return fig
+    network_fig = full_figure(build_network_figure, {
+        ('data', 0, 'x'): segment_x, ('data', 0, 'y'): segment_y,
+        ('data', 1, 'x'): mid_x, ('data', 1, 'y'): mid_y,
+        ('data', 1, 'marker', 'color'): speed,
+        ('layout', 'title', 'text'): network_title,
+    })
+
+    # Bernoulli profile to the farthest outlet
+    outlet = network.outlets[np.argmax(solver.distance[network.outlets])]
+    path = solver.path(outlet)
+    segments = solver.path_segments(path)
+    distance = solver.distance[path]
+    static_pressure = np.append(result.static_pressure[segments], result.static_pressure[segments][-1:])
+    head_mode = 'lines+markers' if len(path) <= 50 else 'lines'
+
+    def build_profile_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=distance, y=result.head[path],
+            mode=head_mode,
+            name='Presión total H',
+            line=dict(color='royalblue', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=distance, y=static_pressure,
+            mode='lines',
+            name='Presión estática p',
+            line=dict(color='tomato', shape='hv')
+        ))
+        fig.update_layout(
+            title='Presión hasta la Salida más Lejana',
+            xaxis_title='Distancia desde la Entrada [m]',
+            yaxis_title='Presión relativa a H en las salidas [Pa]',
+            height=350,
+            margin=dict(l=20, r=20, t=50, b=20),
+            legend=dict(orientation='h', y=-0.25)
+        )
+        return fig
+    profile_fig = full_figure(build_profile_figure, {
+        ('data', 0, 'x'): distance, ('data', 0, 'y'): result.head[path],
+        ('data', 0, 'mode'): head_mode,
+        ('data', 1, 'x'): distance, ('data', 1, 'y'): static_pressure,
+    })
+
+    output_html = [
+        html.P(f"Caudal de entrada: {inlet_flow:.5f} m³/s"),
+        html.P(f"Caudal por las {len(network.outlets)} salidas: {result.outlet_flow.sum():.5f} m³/s"),
+        html.P(f"Desbalance máximo en los nodos: {result.imbalance:.1e} m³/s"),
+        html.P(f"Velocidad máxima: {speed.max():.2f} m/s"),
+    ]
+    return network_fig, profile_fig, output_html
+
+
+# == Callback 6: Torricelli ==
+@fluid_callback(
+    [Output('torricelli-output-v', 'children'),
+     Output('torricelli-graph', 'figure'),
+     Output('torricelli-h-display', 'children')],
+    [Input('torricelli-h-slider', 'value'),
+     Input('torricelli-g-input', 'value')],
+    clientside_function='torricelli'
+)
+def update_torricelli(h, g):
+    # Exit velocity v = sqrt(2gh); the default g is used if the input is invalid
+    result = physics.torricelli(h, g)
+    v, g_val = float(result.velocity), float(result.g)
+    if not result.valid:
+        v_text = "Altura h inválida."
+    else:
+        v_text = f"{v:.2f} m/s"
+
+    # Create plot of v vs h
+    h_values = np.linspace(0.1, max(h * 1.1, 1), 50) # Heights up to 110% of selected h or at least 1m
+    v_values = physics.torricelli(h_values, g_val).velocity
+
+    def build_figure():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=h_values,
+            y=v_values,
+            mode='lines',
+            name='v vs h',
+            line=dict(color='darkorange', width=3)
+        ))
+        # Add point for the selected height
+        fig.add_trace(go.Scatter(
+            x=[h],
+            y=[v],
+            mode='markers',
+            marker=dict(color='purple', size=10, symbol='star'),
+            name=f'v en h={h}m'
+        ))
+        fig.update_layout(
+            title='Velocidad de Salida (Torricelli) vs. Altura',
+            xaxis_title='Altura (h) [m]',
+            yaxis_title='Velocidad (v) [m/s]',
+            height=300,
+            margin=dict(l=20, r=20, t=50, b=20),
+            showlegend=True
+        )
+        return fig
+    fig = figure_or_patch(build_figure, {
+        ('data', 0, 'x'): h_values,
+        ('data', 0, 'y'): v_values,
+        ('data', 1, 'x'): [h],
+        ('data', 1, 'y'): [v],
+        ('data', 1, 'name'): f'v en h={h}m',
+    })
+
+    h_display = f"{h:.2f} m"
+
+    return v_text, fig, h_display
+
+
+# == Callback 7: Draining tank (Torricelli) ==
+DRAIN_FRAMES = 60
+
+@functools.lru_cache(maxsize=256)
+def drain_figure(h, g, tank_area, orifice_d_cm, cd, shape):
+    # Simulated once per parameter set; the frames play in the browser without further requests
+    if shape == 'cone':
+        # Cross-section grows with the square of the level and equals tank_area at h
+        sim = physics.drain_tank_profile(h, lambda level: tank_area * (level / h)**2, orifice_d_cm, cd, g, n_frames=DRAIN_FRAMES)
+    else:
+        sim = physics.drain_tank(h, tank_area, orifice_d_cm, cd, g, n_frames=DRAIN_FRAMES)
+
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots # Slow to import, and only this figure uses it
+
+    series = [(sim.h, 'h(t) [m]', 'royalblue'), (sim.velocity, 'v(t) [m/s]', 'darkorange'), (sim.flow, 'Q(t) [m³/s]', 'mediumseagreen')]
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06)
+    for row, (values, name, color) in enumerate(series, start=1):
+        fig.add_trace(go.Scatter(x=sim.t, y=values, mode='lines', name=name, line=dict(color=color, width=3)), row=row, col=1)
+        fig.update_yaxes(title_text=name, row=row, col=1)
+    # Markers for the current instant, moved by the animation frames (traces 3, 4, 5)
+    for row, (values, name, color) in enumerate(series, start=1):
+        fig.add_trace(go.Scatter(x=[0], y=[values[0]], mode='markers', marker=dict(color='purple', size=10), showlegend=False), row=row, col=1)
+
+    frame_names = [str(i) for i in range(len(sim.t))]
+    fig.update_layout(
+        title='Vaciado del Tanque',
+        xaxis3_title='Tiempo (t) [s]',
+        height=500,
+        margin=dict(l=20, r=20, t=50, b=20),
+        showlegend=False,
+        updatemenus=[dict(type='buttons', direction='left', x=0, y=-0.12, xanchor='left', yanchor='top', buttons=[
+            dict(label='▶', method='animate', args=[None, dict(frame=dict(duration=50, redraw=False), transition=dict(duration=0), fromcurrent=True)]),
+            dict(label='❚❚', method='animate', args=[[None], dict(frame=dict(duration=0, redraw=False), mode='immediate')]),
+        ])],
+        sliders=[dict(x=0.1, len=0.9, y=-0.08, currentvalue=dict(prefix='t = ', suffix=' s'), steps=[
+            dict(label=f"{t:.0f}", method='animate', args=[[name], dict(frame=dict(duration=0, redraw=False), mode='immediate')])
+            for name, t in zip(frame_names, sim.t)
+        ])]
+    )
+    figure = serialization.figure_dict(fig)
+    # Frames are plain dicts: building 60 go.Frame objects would only add validation time
+    figure['frames'] = [
+        {'name': name, 'traces': [3, 4, 5], 'data': [{'x': [t], 'y': [float(values[i])]} for values, _, _ in series]}
+        for i, (name, t) in enumerate(zip(frame_names, sim.t.tolist()))
+    ]
+    return figure, sim.drain_time
+
+@fluid_callback(
+    [Output('torricelli-drain-graph', 'figure'),
+     Output('torricelli-drain-time', 'children')],
+    [Input('torricelli-h-slider', 'value'),
+     Input('torricelli-g-input', 'value'),
+     Input('torricelli-tank-area-slider', 'value'),
+     Input('torricelli-orifice-d-slider', 'value'),
+     Input('torricelli-cd-slider', 'value'),
+     Input('torricelli-tank-shape', 'value')]
+)
+def update_torricelli_drain(h, g, tank_area, orifice_d_cm, cd, shape):
+    g_val = float(physics.torricelli(h, g).g)
+    if h is None or h <= 0:
+        raise dash.exceptions.PreventUpdate
+    fig, drain_time = drain_figure(h, g_val, tank_area, orifice_d_cm, cd, shape)
+    minutes, seconds = divmod(drain_time, 60)
+    return fig, f"{drain_time:,.1f} s ({minutes:.0f} min {seconds:.0f} s)"
+
+
+# == Callback 8: Parameter sweeps (one per tab) ==
+PROGRESS_HIDDEN = {'display': 'none'}
+
+def register_sweep(tab, sweep):
+    def update_sweep(active_item, x_name, y_name, n, n_intervals, *values_and_job):
+        # Returns [figure, job id, poll disabled, progress, progress style]
+        *values, job = values_and_job
+        polling = not _is_initial_call() and dash.ctx.triggered_id == f'{tab}-sweep-poll'
+        if not polling:
+            if active_item != 'sweep' or x_name == y_name:
+                if job_pool is not None and job:
+                    jobs.cancel(job)
+                return [dash.no_update, None, True, 0, PROGRESS_HIDDEN]
+            # Swept inputs are left out of the key so moving their sliders reuses the cached grid
+            fixed = tuple((param.name, value) for param, value in zip(sweep.params, values) if param.name not in (x_name, y_name))
+            if job_pool is None:
+                return [sweeps.figure(tab, x_name, y_name, n, fixed), None, True, 0, PROGRESS_HIDDEN]
+            new_job = job_pool.submit(sweeps.build_figure, tab, x_name, y_name, n, fixed)
+            if job and job != new_job:
+                jobs.cancel(job) # Superseded by the new inputs
+            job = new_job
+
+        state = jobs.status(job)
+        if state is None or state['status'] in ('cancelled', 'error'):
+            return [dash.no_update, None, True, 0, PROGRESS_HIDDEN]
+        if state['status'] == 'done':
+            return [jobs.result(job), None, True, 100, PROGRESS_HIDDEN]
+        return [dash.no_update, job, False, round(100 * state['progress']), {}]
+
+    update_sweep.__name__ = f'update_{tab}_sweep'
+    fluid_callback(
+        [Output(f'{tab}-sweep-graph', 'figure'),
+         Output(f'{tab}-sweep-job', 'data'),
+         Output(f'{tab}-sweep-poll', 'disabled'),
+         Output(f'{tab}-sweep-progress', 'value'),
+         Output(f'{tab}-sweep-progress', 'style')],
+        [Input(f'{tab}-sweep-accordion', 'active_item'),
+         Input(f'{tab}-sweep-x', 'value'),
+         Input(f'{tab}-sweep-y', 'value'),
+         Input(f'{tab}-sweep-n', 'value'),
+         Input(f'{tab}-sweep-poll', 'n_intervals')] +
+        [Input(param.component_id, 'value') for param in sweep.params],
+        state=[State(f'{tab}-sweep-job', 'data')]
+    )(update_sweep)
+
+for tab, sweep in sweeps.SWEEPS.items():
+    register_sweep(tab, sweep)
+
+
+# --- App factory ---
+_app = None
+_app_lock = threading.Lock()
+
+def create_app():
+    """Builds the Dash app on the first call and returns it; later calls return the same app."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = _build_app()
+    return _app
+
+def _build_app():
+    import dash_bootstrap_components as dbc
+    serialization.configure(lean_template=LEAN_FIGURES, fast_json=LEAN_FIGURES, typed_arrays=TYPED_ARRAYS)
+    meta_tags = []
+    if LIVE_DRAG:
+        meta_tags.append({'name': 'fluidos-min-interval', 'content': f'{DRAG_INTERVAL_MS:g}'})
+    if LEAN_FIGURES:
+        # Sent once with the page; the figures only name it (assets/templates.js)
+        meta_tags.append({'name': 'fluidos-template', 'content': serialization.template_json()})
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.LUMEN], suppress_callback_exceptions=True,
+                    meta_tags=meta_tags)
+
+    # Instrumentation (served on /metrics)
+    install_metrics(app, metrics, profile_rate=PROFILE_RATE, profile_slow_ms=PROFILE_SLOW_MS, profile_dir=PROFILE_DIR,
+                    memory_rate=MEMORY_RATE)
+
+    # Compression (before the response cache, which stores plain bodies)
+    if COMPRESSION:
+        compression.install_compression(app, metrics, routes=COMPRESS_ROUTES, min_bytes=COMPRESS_MIN_BYTES,
+                                        gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY)
+
+    if LIVE_DRAG:
+        install_coalescing(app, metrics)
+
+    app.layout = build_layout()
+    # Every component the callbacks can refer to, including the tabs that are not rendered yet
+    app.validation_layout = html.Div([app.layout] + [build_tab() for _, _, build_tab in TABS])
+    for register in _registrations:
+        register(app)
+
+    # Batch evaluation (/batch/<model>, /batch/jobs/<id>)
+    install_batch_routes(app, run=None if job_pool is None else functools.partial(job_pool.submit, batch_run_job))
+
+    response_cache = None
+    if RESPONSE_CACHE_MB > 0:
+        if SHARED_CACHE_PATH:
+            response_cache = SharedResponseCache(SHARED_CACHE_PATH, max_bytes=int(RESPONSE_CACHE_MB * 1024 * 1024))
+        else:
+            response_cache = ResponseCache(max_bytes=int(RESPONSE_CACHE_MB * 1024 * 1024))
+        # Sweep results are cached on disk by the job pool, so their polls must always reach the callback;
+        # mesh uploads would put whole files in the cache keys
+        uncached = {'archimedes-mesh-key'}
+        if job_pool is not None:
+            uncached |= {f'{tab}-sweep-job' for tab in sweeps.SWEEPS}
+        install_response_cache(app, response_cache, exclude=uncached)
+        metrics.add_collector(lambda: [
+            (f'fluidos_response_cache_{name}', 'gauge', value) for name, value in response_cache.stats().items()
+        ])
+
+    # Precomputed layout and dependencies
+    if LAYOUT_CACHE:
+        install_layout_cache(app)()
+
+    # Last: Flask accepts no new hooks once it has handled a request
+    if response_cache is not None and CACHE_WARMUP:
+        warmed = warm_up(app, response_cache)
+        if warmed['failed']:
+            app.logger.warning("Cache warm-up: %d entries stored in %d requests, failures in %s",
+                               warmed['stored'], warmed['requests'], ', '.join(warmed['failed']))
+    return app
+
+def __getattr__(name):
+    # fluidoscona.app and fluidoscona.server (for deployment) build the app on first access
+    if name == 'app':
+        return create_app()
+    if name == 'server':
+        return create_app().server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --- Run the app ---
+if __name__ == '__main__':
+    create_app().run(debug=True)
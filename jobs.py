@@ -0,0 +1,228 @@
+"""Background execution of heavy computations on a local process pool.
+
+A job is a call ``func(*args, progress=...)`` of a module-level function run
+in a worker process, so the request that starts it returns immediately and
+the browser polls for the result. No broker is needed: the state of every
+job lives in a directory under ``JOBS_DIR`` (``status.json``, the pickled
+result and a ``cancel`` flag), which any process of the server can read.
+
+The id of a job is the hash of its function and arguments, so submitting the
+same call again returns the running job or its finished result, and withdraws
+a cancellation that the job has not acted on yet. Each server process runs at
+most ``max_workers`` jobs at once; the rest wait in its queue.
+"""
+import contextlib
+import fcntl
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+JOBS_DIR = os.environ.get('FLUIDOS_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'fluidos-jobs'))
+RESULT_TTL = 3600 # s a finished job is kept after its last use
+PROGRESS_INTERVAL = 0.1 # s between two writes of the progress of a job
+
+ACTIVE = ('queued', 'running')
+
+
+class Cancelled(Exception):
+    """Raised inside a job by ``progress()`` once the job has been cancelled."""
+
+
+def job_id(func, args):
+    """Hash identifying the call ``func(*args)``."""
+    payload = pickle.dumps((func.__module__, func.__qualname__, args), protocol=4)
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _directory(job):
+    return os.path.join(JOBS_DIR, job)
+
+
+@contextlib.contextmanager
+def _locked(job):
+    """Serializes the changes of the state of ``job`` across the server and worker processes."""
+    os.makedirs(_directory(job), exist_ok=True)
+    with open(os.path.join(_directory(job), 'lock'), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX) # Released when the file is closed
+        yield
+
+
+def _withdraw_cancel(job):
+    """Removes the cancel flag of ``job``; False if there was none."""
+    try:
+        os.remove(os.path.join(_directory(job), 'cancel'))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _write_status(job, **state):
+    path = os.path.join(_directory(job), 'status.json')
+    state['updated'] = time.time()
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path) # Readers never see a half-written file
+
+
+def status(job):
+    """``{'status', 'progress', 'error', ...}`` of ``job``, or None if it is unknown."""
+    if not job or not job.isalnum():
+        return None
+    try:
+        with open(os.path.join(_directory(job), 'status.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def result(job):
+    """Return value of a finished job."""
+    path = os.path.join(_directory(job), 'result.pickle')
+    os.utime(path) # Keeps frequently used results from expiring
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def cancel(job):
+    """Asks ``job`` to stop; it ends at its next ``progress()`` call."""
+    if status(job) is None:
+        return
+    with _locked(job):
+        state = status(job)
+        if state is not None and state['status'] in ACTIVE:
+            open(os.path.join(_directory(job), 'cancel'), 'w').close()
+
+
+class Progress:
+    """Passed to job functions as ``progress``: call it with the completed fraction."""
+
+    def __init__(self, job):
+        self.job = job
+        self._cancel_path = os.path.join(_directory(job), 'cancel')
+        self._last = 0.0
+
+    def __call__(self, fraction):
+        if os.path.exists(self._cancel_path):
+            raise Cancelled
+        now = time.monotonic()
+        if now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            _write_status(self.job, status='running', progress=fraction, pid=os.getpid())
+
+
+def _execute(job, func, args):
+    """Runs in a pool process."""
+    progress = Progress(job)
+    while True:
+        try:
+            progress(0.0)
+            value = func(*args, progress=progress)
+            path = os.path.join(_directory(job), 'result.pickle')
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+            _write_status(job, status='done', progress=1.0, finished=time.time())
+        except Cancelled:
+            with _locked(job):
+                if _withdraw_cancel(job):
+                    _write_status(job, status='cancelled', progress=0.0, finished=time.time())
+                    return
+            continue # Submitted again while stopping: the cancellation was withdrawn
+        except Exception as exc: # Reported to the user through the job status
+            _write_status(job, status='error', progress=0.0, error=str(exc), finished=time.time())
+        return
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def expire(ttl=RESULT_TTL):
+    """Removes the jobs that finished more than ``ttl`` seconds ago and were not used since."""
+    if not os.path.isdir(JOBS_DIR):
+        return
+    now = time.time()
+    for job in os.listdir(JOBS_DIR):
+        state = status(job)
+        if state is None or state['status'] in ACTIVE:
+            continue
+        directory = _directory(job)
+        last_use = max(state.get('finished', 0), os.path.getmtime(directory))
+        result_path = os.path.join(directory, 'result.pickle')
+        if os.path.exists(result_path):
+            last_use = max(last_use, os.path.getmtime(result_path))
+        if now - last_use > ttl:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+class JobPool:
+    """Per-process pool of at most ``max_workers`` concurrent jobs.
+
+    The worker processes are spawned on the first submission in each server
+    process, so a pool created before gunicorn forks is not shared between workers.
+    ``initializer(*initargs)`` runs in every worker process, e.g. to apply the
+    app's configuration to modules it reads at call time.
+    """
+
+    def __init__(self, max_workers=2, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._submitted = 0
+
+    def _pool(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.initializer,
+                    initargs=self.initargs,
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, func, *args):
+        """Starts ``func(*args, progress=...)`` unless it is running or done; returns the job id.
+
+        A running job that was cancelled keeps running: the call wants its result again.
+        """
+        job = job_id(func, args)
+        self._submitted += 1
+        if self._submitted % 100 == 0:
+            expire()
+        with _locked(job):
+            state = status(job)
+            if state is not None:
+                if state['status'] == 'done':
+                    return job
+                if state['status'] in ACTIVE and _alive(state['pid']):
+                    _withdraw_cancel(job)
+                    return job
+            _withdraw_cancel(job) # Left over from an earlier run
+            _write_status(job, status='queued', progress=0.0, pid=os.getpid())
+        self._pool().submit(_execute, job, func, args)
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
@@ -0,0 +1,62 @@
+"""Precomputed ``/_dash-layout`` and ``/_dash-dependencies`` responses.
+
+The dashboard layout and its callback graph never change while the server is
+running, yet Dash serializes both on every page load. ``install_layout_cache``
+encodes them once, keeps identity and gzip versions with strong ETags, and
+answers revalidations with ``304 Not Modified``.
+"""
+import gzip
+import hashlib
+
+from flask import Response, request
+
+CACHED_ENDPOINTS = ('_dash-layout', '_dash-dependencies')
+
+
+class PrecomputedResponse:
+    """A JSON body together with its gzip encoding and their ETags."""
+
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9)
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+    def to_response(self):
+        if self.gzipped and request.accept_encodings['gzip']:
+            response = Response(self.gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(self.etag + '-gz')
+        else:
+            response = Response(self.body, mimetype='application/json')
+            response.set_etag(self.etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Let browsers keep the copy but revalidate it on every page load
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+
+def install_layout_cache(app):
+    """Serves the layout and dependency endpoints of ``app`` from precomputed bytes.
+
+    Returns a function that computes the responses; call it once every callback
+    has been registered. Until then requests go through Dash as usual.
+    """
+    server = app.server
+    paths = [app.config.routes_pathname_prefix + name for name in CACHED_ENDPOINTS]
+    responses = {}
+
+    @server.before_request
+    def _serve_precomputed():
+        if request.method != 'GET':
+            return None
+        precomputed = responses.get(request.path)
+        return precomputed.to_response() if precomputed is not None else None
+
+    def precompute():
+        client = server.test_client()
+        for path in paths:
+            response = client.get(path)
+            if response.status_code == 200:
+                responses[path] = PrecomputedResponse(response.get_data())
+
+    return precompute
@@ -0,0 +1,244 @@
+"""Buoyancy of arbitrary closed shapes given as triangle meshes.
+
+A mesh is an ``(F, 3, 3)`` array of triangle vertices in metres, z up, with
+outward normals. The submerged volume below the waterline z = d follows from
+the divergence theorem with the field (0, 0, z - d): it vanishes on the
+waterplane, so clipping every triangle to z <= d and adding up (z̄ - d) times
+its signed horizontal projection gives the volume without building the cap.
+
+``DraftTable`` prepares a mesh once: faces sorted by their highest vertex
+make the fully submerged ones a prefix sum, so only the faces crossing the
+waterline are clipped, and a sampled volume-vs-draft curve brackets the
+equilibrium draft for the root solver. Meshes are normalized to unit volume
+with the keel at z = 0, so the table is shared by every object size.
+"""
+import functools
+import hashlib
+import os
+import re
+import tempfile
+
+import numpy as np
+
+CURVE_POINTS = 256
+MESH_DIR = os.environ.get('FLUIDOS_MESH_DIR', os.path.join(tempfile.gettempdir(), 'fluidos-meshes'))
+MAX_MESH_FACES = 2_000_000
+
+
+# --- Clipping ---
+def _moment(a, b, c, d):
+    """Sum of (z̄ - d) * signed horizontal area over the triangles (a, b, c)."""
+    z_mean = (a[:, 2] + b[:, 2] + c[:, 2]) / 3
+    area_z = 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+    return float(np.sum((z_mean - d) * area_z))
+
+
+def _rotate(triangles, first):
+    """Cyclic rotation of each triangle so that vertex ``first`` comes first (keeps the orientation)."""
+    order = (first[:, np.newaxis] + np.arange(3)) % 3
+    return np.take_along_axis(triangles, order[:, :, np.newaxis], axis=1)
+
+
+def _cut(p, q, d):
+    """Point of the edges p -> q at height d."""
+    t = (d - p[:, 2]) / (q[:, 2] - p[:, 2])
+    return p + (q - p) * t[:, np.newaxis]
+
+
+def clipped_volume_moment(triangles, d):
+    """Contribution to the volume below z = d of ``triangles``, clipped to that half-space."""
+    below = triangles[:, :, 2] < d
+    count = below.sum(axis=1)
+    total = 0.0
+
+    full = triangles[count == 3]
+    total += _moment(full[:, 0], full[:, 1], full[:, 2], d)
+
+    # One vertex below: a smaller triangle
+    one = _rotate(triangles[count == 1], np.argmax(below[count == 1], axis=1))
+    a, b, c = one[:, 0], one[:, 1], one[:, 2]
+    total += _moment(a, _cut(a, b, d), _cut(a, c, d), d)
+
+    # Two vertices below: a quadrilateral, split in two triangles
+    two = _rotate(triangles[count == 2], np.argmin(below[count == 2], axis=1))
+    a, b, c = two[:, 0], two[:, 1], two[:, 2]
+    ab, ac = _cut(a, b, d), _cut(a, c, d)
+    total += _moment(ab, b, c, d) + _moment(ab, c, ac, d)
+    return total
+
+
+def volume(triangles):
+    """Enclosed volume of a closed mesh (negative if its normals point inwards)."""
+    # Any waterline above the mesh gives the whole volume: the horizontal projections add up to zero
+    return clipped_volume_moment(triangles, triangles[:, :, 2].max() + 1.0) if len(triangles) else 0.0
+
+
+def normalize(triangles):
+    """Outward-oriented copy of the mesh with unit volume and its lowest point at z = 0."""
+    triangles = np.array(triangles, dtype=float)
+    triangles[:, :, 2] -= triangles[:, :, 2].min()
+    enclosed = volume(triangles)
+    if enclosed < 0:
+        triangles = triangles[:, ::-1]
+        enclosed = -enclosed
+    if enclosed <= 0:
+        raise ValueError("La malla no encierra volumen: debe ser una superficie cerrada.")
+    return triangles / enclosed ** (1 / 3)
+
+
+# --- Draft ---
+class DraftTable:
+    """Volume below any waterline of a normalized mesh, and its equilibrium draft."""
+
+    def __init__(self, triangles):
+        self.triangles = triangles
+        z = triangles[:, :, 2]
+        self.height = float(z.max())
+        self._z_low = z.min(axis=1)
+        self._z_high = z.max(axis=1)
+
+        # Faces entirely below d are those whose highest vertex is below d: prefix sums over that order
+        order = np.argsort(self._z_high)
+        a, b, c = triangles[order, 0], triangles[order, 1], triangles[order, 2]
+        area_z = 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+        z_mean = (a[:, 2] + b[:, 2] + c[:, 2]) / 3
+        self._sorted_high = self._z_high[order]
+        self._cum_moment = np.concatenate(([0.0], np.cumsum(z_mean * area_z)))
+        self._cum_area = np.concatenate(([0.0], np.cumsum(area_z)))
+
+        self.drafts = np.linspace(0, self.height, CURVE_POINTS)
+        self.volumes = np.maximum.accumulate([self.volume(d) for d in self.drafts])
+
+    @functools.cached_property
+    def indexed(self):
+        """``(vertices, faces)``: the distinct corners of the mesh and the three corner indices of each face."""
+        vertices, faces = np.unique(self.triangles.reshape(-1, 3), axis=0, return_inverse=True)
+        return vertices, faces.reshape(-1, 3)
+
+    def volume(self, d):
+        """Submerged volume (fraction of the total) at draft ``d``."""
+        n_below = np.searchsorted(self._sorted_high, d, side='right')
+        below = self._cum_moment[n_below] - d * self._cum_area[n_below]
+        crossing = (self._z_low < d) & (self._z_high > d)
+        return below + clipped_volume_moment(self.triangles[crossing], d)
+
+    def draft(self, fraction):
+        """Draft at which the submerged volume is ``fraction`` of the total (0..1)."""
+        if fraction <= 0:
+            return 0.0
+        if fraction >= 1:
+            return self.height
+        from scipy.optimize import brentq # Slow to import: only once a shape is solved
+
+        k = int(np.clip(np.searchsorted(self.volumes, fraction), 1, CURVE_POINTS - 1))
+        try:
+            return brentq(lambda d: self.volume(d) - fraction, self.drafts[k - 1], self.drafts[k], xtol=1e-9 * self.height)
+        except ValueError: # No sign change, from rounding at the ends of the bracket
+            return float(np.interp(fraction, self.volumes, self.drafts))
+
+
+# --- Shapes ---
+def _grid_triangles(points):
+    """Triangles of a (nu, nv, 3) grid of points, two per cell."""
+    p00, p10 = points[:-1, :-1], points[1:, :-1]
+    p01, p11 = points[:-1, 1:], points[1:, 1:]
+    return np.concatenate((np.stack((p00, p10, p11), axis=-2).reshape(-1, 3, 3),
+                           np.stack((p00, p11, p01), axis=-2).reshape(-1, 3, 3)))
+
+
+def _orient(part, center):
+    """Flips a convex part of a surface whose normals point towards ``center``."""
+    normal = np.cross(part[:, 1] - part[:, 0], part[:, 2] - part[:, 0])
+    if np.sum(normal * (part.mean(axis=1) - center)) < 0:
+        return part[:, ::-1]
+    return part
+
+
+def box(length=2.0, width=1.0, height=1.0):
+    corners = np.array([[x, y, z] for x in (0, length) for y in (0, width) for z in (0, height)], dtype=float)
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    center = corners.mean(axis=0)
+    faces = np.array([[corners[a], corners[b], corners[c]] for q in quads for a, b, c in ((q[0], q[1], q[2]), (q[0], q[2], q[3]))])
+    return np.concatenate([_orient(face[np.newaxis], center) for face in faces])
+
+
+def cylinder(length=3.0, radius=0.5, n=64):
+    """Horizontal cylinder (a floating log), axis along x."""
+    theta = np.linspace(0, 2 * np.pi, n + 1)
+    x = np.array([0.0, length])
+    ring = np.stack(np.broadcast_arrays(x[:, np.newaxis], radius * np.cos(theta), radius * np.sin(theta)), axis=-1)
+    center = np.array([length / 2, 0.0, 0.0])
+    side = _orient(_grid_triangles(ring), center)
+    ends = []
+    for x_end in x:
+        rim = ring[int(x_end > 0)]
+        hub = np.broadcast_to([x_end, 0.0, 0.0], rim[:-1].shape)
+        ends.append(_orient(np.stack((hub, rim[:-1], rim[1:]), axis=1), center))
+    return np.concatenate([side] + ends)
+
+
+def sphere(radius=0.5, n=48):
+    theta = np.linspace(0, np.pi, n + 1)[:, np.newaxis]
+    phi = np.linspace(0, 2 * np.pi, 2 * n + 1)[np.newaxis, :]
+    points = radius * np.stack(np.broadcast_arrays(np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)), axis=-1)
+    return _orient(_grid_triangles(points), np.zeros(3))
+
+
+def wigley_hull(length=4.0, beam=0.8, draft=0.5, freeboard=0.3, n=64):
+    """Wigley hull: half-breadth B/2 (1 - (2x/L)²)(1 - (z/T)²) below the design waterline, wall-sided above, with a flat deck."""
+    x = np.linspace(-length / 2, length / 2, n + 1)[:, np.newaxis]
+    z = np.concatenate((np.linspace(-draft, 0, n // 2 + 1), np.linspace(0, freeboard, n // 4 + 1)[1:]))[np.newaxis, :]
+    half = beam / 2 * (1 - (2 * x / length)**2) * (1 - (np.minimum(z, 0) / draft)**2)
+    center = np.array([0.0, 0.0, (freeboard - draft) / 2])
+    parts = []
+    for side in (1, -1):
+        points = np.stack(np.broadcast_arrays(x, side * half, z), axis=-1)
+        parts.append(_orient(_grid_triangles(points), center))
+    deck_edge = np.stack(np.broadcast_arrays(x, half[:, -1:], freeboard), axis=-1)[:, 0]
+    deck = np.stack((deck_edge, deck_edge * [1, -1, 1]), axis=1)
+    parts.append(_orient(_grid_triangles(deck), center))
+    return np.concatenate(parts)
+
+
+SHAPES = {'box': box, 'cylinder': cylinder, 'sphere': sphere, 'hull': wigley_hull}
+
+
+# --- Uploaded meshes ---
+STL_RECORD = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attributes', '<u2')])
+
+
+def parse_stl(data):
+    """Triangles of an ASCII or binary STL file given as bytes."""
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, '<u4', count=1, offset=80)[0])
+        if len(data) == 84 + count * STL_RECORD.itemsize:
+            triangles = np.frombuffer(data, STL_RECORD, count=count, offset=84)['vertices']
+            return triangles.astype(float)
+    numbers = re.findall(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)', data)
+    if not numbers or len(numbers) % 3:
+        raise ValueError("Archivo STL no válido.")
+    return np.array(numbers, dtype=float).reshape(-1, 3, 3)
+
+
+def store_mesh(data):
+    """Validates, normalizes and saves an uploaded STL file; returns its key."""
+    key = 'mesh-' + hashlib.sha1(data).hexdigest()
+    path = os.path.join(MESH_DIR, key + '.npy')
+    if not os.path.exists(path):
+        triangles = parse_stl(data)
+        if len(triangles) > MAX_MESH_FACES:
+            raise ValueError(f"La malla tiene más de {MAX_MESH_FACES:,} triángulos.")
+        os.makedirs(MESH_DIR, exist_ok=True)
+        np.save(path + '.tmp.npy', normalize(triangles))
+        os.replace(path + '.tmp.npy', path)
+    return key
+
+
+@functools.lru_cache(maxsize=16)
+def draft_table(key):
+    """Cached :class:`DraftTable` of a shape in ``SHAPES`` or of a mesh saved by :func:`store_mesh`."""
+    if key in SHAPES:
+        return DraftTable(normalize(SHAPES[key]()))
+    if not re.fullmatch(r'mesh-[0-9a-f]{40}', key):
+        raise KeyError(key)
+    return DraftTable(np.load(os.path.join(MESH_DIR, key + '.npy')))
@@ -0,0 +1,285 @@
+"""Low-overhead instrumentation of the dashboard, exposed in Prometheus text format.
+
+``Metrics`` keeps counters and histograms in memory; ``install_metrics``
+times every ``/_dash-update-component`` request, counts page loads and
+serves everything on ``/metrics``. Values are per process: with several
+workers, scrape each one or put them behind a per-worker port.
+
+Optionally a sample of requests is run under cProfile and the profiles of
+the slow ones are written to disk for offline analysis (``python -m pstats``),
+and another sample is traced with tracemalloc: peak and retained bytes per
+callback go to ``/metrics`` and the main allocation sites to ``/_memory``.
+Only one request is traced at a time, but tracemalloc sees every thread, so
+concurrent requests add some noise to the numbers.
+"""
+import contextlib
+import contextvars
+import cProfile
+import os
+import random
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from flask import Response, g, has_request_context, jsonify, request
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+MEMORY_BUCKETS = (2**16, 2**18, 2**20, 2**22, 2**24, 2**26, 2**28)
+
+DESCRIPTIONS = {
+    'fluidos_requests_total': "Callback requests by callback and whether the response came from the cache.",
+    'fluidos_request_seconds': "Total time of /_dash-update-component requests.",
+    'fluidos_callback_compute_seconds': "Time spent inside the callback function.",
+    'fluidos_figure_seconds': "Time spent building figures (full) or patches.",
+    'fluidos_serialization_seconds': "Request time outside the callback function: Dash dispatch and JSON serialization.",
+    'fluidos_response_bytes': "Size of the callback responses as sent (compressed when the browser accepts it).",
+    'fluidos_tab_activations_total': "Tab selections.",
+    'fluidos_page_loads_total': "Page loads (requests for the layout).",
+    'fluidos_profiles_total': "Slow sampled requests whose profile was written to disk.",
+    'fluidos_superseded_total': "Live-drag requests answered with 204 because a newer one arrived, by stage.",
+    'fluidos_request_peak_bytes': "Peak memory allocated during traced callback requests (tracemalloc).",
+    'fluidos_request_retained_bytes': "Memory allocated during traced callback requests and still held at their end.",
+    'fluidos_compression_seconds': "CPU time spent compressing responses, by encoding and route.",
+    'fluidos_compression_bytes_total': "Bytes before (stage=in) and after (stage=out) compression, by encoding and route.",
+}
+
+
+class Metrics:
+    """Thread-safe registry of counters, histograms and collected gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._collectors = []
+        self.current_callback = contextvars.ContextVar('current_callback', default=None)
+
+    @staticmethod
+    def _labels(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name, value, buckets=BUCKETS, **labels):
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0]
+            histogram[1][bisect_left(buckets, value)] += 1
+            histogram[2] += value
+
+    @contextlib.contextmanager
+    def time(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextlib.contextmanager
+    def track_callback(self, name):
+        """Times the body of callback ``name`` and makes it the current callback."""
+        token = self.current_callback.set(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.current_callback.reset(token)
+            self.observe('fluidos_callback_compute_seconds', elapsed, callback=name)
+            if has_request_context():
+                g.metrics_compute = g.get('metrics_compute', 0.0) + elapsed
+                # The callback's return values are still alive here: snapshot what they hold
+                if g.get('metrics_memory') and 'metrics_sites' not in g:
+                    g.metrics_sites = allocation_sites()
+
+    def add_collector(self, collect):
+        """Registers ``collect() -> [(name, type, value), ...]``, called on every scrape."""
+        self._collectors.append(collect)
+
+    def render(self):
+        """Returns every metric in Prometheus text exposition format."""
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in DESCRIPTIONS:
+                    lines.append(f"# HELP {name} {DESCRIPTIONS[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ''
+            return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in items) + '}'
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (b, list(c), s)) for key, (b, c, s) in self._histograms.items())
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+        for (name, labels), (buckets, counts, total) in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(buckets, counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{fmt_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {cumulative}")
+            lines.append(f"{name}_sum{fmt_labels(labels)} {total:g}")
+            lines.append(f"{name}_count{fmt_labels(labels)} {cumulative}")
+        for collect in self._collectors:
+            for name, kind, value in collect():
+                header(name, kind)
+                lines.append(f"{name} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    """``value`` as the inside of a quoted label value in the exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def allocation_sites(limit=20):
+    """The ``limit`` source lines holding the most traced memory, as (``file:line``, bytes, blocks)."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    return [(f'{s.traceback[0].filename}:{s.traceback[0].lineno}', s.size, s.count)
+            for s in snapshot.statistics('lineno')[:limit]]
+
+
+class MemoryReport:
+    """Traced requests by callback: peak and retained bytes, and where the memory held at the end of the callback was allocated."""
+
+    def __init__(self, top=10):
+        self.top = top
+        self._lock = threading.Lock()
+        self._callbacks = {}
+
+    def add(self, callback, peak, retained, sites):
+        with self._lock:
+            entry = self._callbacks.setdefault(callback, {'requests': 0, 'peak': 0, 'peak_max': 0, 'retained': 0, 'sites': Counter()})
+            entry['requests'] += 1
+            entry['peak'] += peak
+            entry['peak_max'] = max(entry['peak_max'], peak)
+            entry['retained'] += retained
+            for site, size, _ in sites:
+                entry['sites'][site] += size
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                callback: {
+                    'requests': e['requests'],
+                    'peak_bytes_mean': e['peak'] / e['requests'],
+                    'peak_bytes_max': e['peak_max'],
+                    'retained_bytes_mean': e['retained'] / e['requests'],
+                    'top_sites': [{'site': site, 'bytes_mean': size / e['requests']} for site, size in e['sites'].most_common(self.top)],
+                }
+                for callback, e in sorted(self._callbacks.items())
+            }
+
+
+def install_metrics(app, metrics, profile_rate=0.0, profile_slow_ms=250, profile_dir=None, memory_rate=0.0):
+    """Instruments the Flask server of ``app`` and adds the ``/metrics`` and ``/_memory`` routes.
+
+    Install it before any other request hook so cached responses are timed too.
+    With ``profile_rate`` > 0, that fraction of callback requests runs under
+    cProfile and the ones slower than ``profile_slow_ms`` are dumped to ``profile_dir``.
+    With ``memory_rate`` > 0, that fraction is traced with tracemalloc.
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+    update_path = prefix + '_dash-update-component'
+    layout_path = prefix + '_dash-layout'
+    callback_names = {}
+    memory_report = MemoryReport()
+    memory_lock = threading.Lock()
+
+    def callback_name(output):
+        # The output comes from the client: only those of registered callbacks are named and remembered
+        if not isinstance(output, str) or output not in app.callback_map:
+            return 'unknown'
+        if output not in callback_names:
+            spec = app.callback_map.get(output, {})
+            callback_names[output] = getattr(spec.get('callback'), '__name__', 'unknown')
+        return callback_names[output]
+
+    @server.before_request
+    def _start_timer():
+        if request.path != update_path:
+            return
+        g.metrics_start = time.perf_counter()
+        body = request.get_json(silent=True) or {}
+        g.metrics_callback = callback_name(body.get('output'))
+        if profile_rate and random.random() < profile_rate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError: # Another request is already being profiled
+                return
+            g.metrics_profiler = profiler
+        # tracemalloc is process-wide: trace one request at a time, and never one started elsewhere (PYTHONTRACEMALLOC)
+        if memory_rate and random.random() < memory_rate and memory_lock.acquire(blocking=False):
+            if tracemalloc.is_tracing():
+                memory_lock.release()
+            else:
+                tracemalloc.start()
+                g.metrics_memory = True
+
+    @server.after_request
+    def _record(response):
+        if request.path == layout_path:
+            metrics.inc('fluidos_page_loads_total')
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        name = g.pop('metrics_callback')
+        compute = g.pop('metrics_compute', None)
+
+        if response.status_code != 204: # Superseded live-drag requests are counted in fluidos_superseded_total
+            metrics.inc('fluidos_requests_total', callback=name, cached='false' if compute is not None else 'true')
+        metrics.observe('fluidos_request_seconds', elapsed, callback=name)
+        if compute is not None:
+            metrics.observe('fluidos_serialization_seconds', max(elapsed - compute, 0.0), callback=name)
+        if not response.direct_passthrough:
+            metrics.observe('fluidos_response_bytes', len(response.get_data()), buckets=BYTE_BUCKETS, callback=name)
+
+        if g.pop('metrics_memory', False):
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory_lock.release()
+            metrics.observe('fluidos_request_peak_bytes', peak, buckets=MEMORY_BUCKETS, callback=name)
+            metrics.observe('fluidos_request_retained_bytes', retained, buckets=MEMORY_BUCKETS, callback=name)
+            memory_report.add(name, peak, retained, g.pop('metrics_sites', []))
+
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed * 1000 >= profile_slow_ms and profile_dir:
+                os.makedirs(profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(profile_dir, f"{time.time():.0f}-{os.getpid()}-{name}.prof"))
+                metrics.inc('fluidos_profiles_total', callback=name)
+        return response
+
+    @server.route(prefix + 'metrics')
+    def _metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    @server.route(prefix + '_memory')
+    def _memory():
+        return jsonify(memory_report.to_dict())
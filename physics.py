@@ -0,0 +1,210 @@
+"""Vectorized physics of the fluids dashboard.
+
+Every function accepts scalars or NumPy arrays (broadcast against each other)
+and returns arrays of the broadcast shape, ``valid`` masks included, so a
+single call can evaluate millions of parameter combinations. Invalid inputs (non-positive areas or heights, ``None``/NaN) are
+handled with masks: the affected results are 0 and the ``valid`` field of the
+result is False, mirroring what the dashboard displays.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+# --- Constants ---
+G_ACCEL = 9.81 # m/s^2 (standard gravity)
+WATER_DENSITY = 1000 # kg/m^3
+
+# Buoyancy states returned by buoyancy()
+SINKS = 0
+SUSPENDED = 1
+FLOATS = 2
+
+
+def _as_float(x):
+    # None becomes NaN, which every validity mask rejects
+    return np.asarray(x, dtype=float)
+
+
+def _as_floats(*args):
+    """``_as_float`` of every argument, broadcast to a common shape."""
+    return np.broadcast_arrays(*(_as_float(x) for x in args))
+
+
+def _divide(num, den, valid):
+    """num / den where ``valid``, 0 elsewhere, without division warnings."""
+    num, den, valid = np.broadcast_arrays(num, den, valid)
+    return np.divide(num, den, out=np.zeros(num.shape), where=valid)
+
+
+def circle_area(diameter_cm):
+    """Area [m²] of a circular section given its diameter in cm."""
+    diameter_m = _as_float(diameter_cm) / 100.0
+    return np.pi * (diameter_m / 2)**2
+
+
+# == Pressure: P = F / A ==
+class PressureResult(NamedTuple):
+    pressure: np.ndarray # Pa
+    valid: np.ndarray # area > 0
+
+def pressure(force, area):
+    force, area = _as_floats(force, area)
+    valid = area > 0
+    return PressureResult(_divide(force, area, valid), valid)
+
+
+# == Hydraulic press (Pascal): f / a = F / A ==
+class HydraulicPressResult(NamedTuple):
+    area_a: np.ndarray # m², small piston
+    area_A: np.ndarray # m², large piston
+    pressure: np.ndarray # Pa
+    force_out: np.ndarray # N
+    advantage: np.ndarray # F / f
+    valid: np.ndarray # area_a > 0
+
+def hydraulic_press(f_in, d_cm, D_cm):
+    f_in, d_cm, D_cm = _as_floats(f_in, d_cm, D_cm)
+    area_a = circle_area(d_cm)
+    area_A = circle_area(D_cm)
+    valid = area_a > 0
+    pressure = _divide(f_in, area_a, valid)
+    force_out = pressure * area_A
+    advantage = _divide(force_out, f_in, valid & (f_in > 0))
+    return HydraulicPressResult(area_a, area_A, pressure, force_out, advantage, valid)
+
+
+# == Archimedes' principle: E = ρ_fluid * g * V_submerged ==
+class BuoyancyResult(NamedTuple):
+    weight: np.ndarray # N
+    buoyancy: np.ndarray # N
+    vol_submerged: np.ndarray # m³
+    fraction_submerged: np.ndarray # 0..1
+    state: np.ndarray # SINKS, SUSPENDED or FLOATS
+
+def buoyancy(rho_obj, vol_obj, rho_fluid, g=G_ACCEL):
+    rho_obj, vol_obj, rho_fluid = _as_floats(rho_obj, vol_obj, rho_fluid)
+    weight = rho_obj * g * vol_obj
+    max_buoyancy = rho_fluid * g * vol_obj # Fully submerged
+    floats = weight < max_buoyancy
+    state = np.select([weight > max_buoyancy, weight == max_buoyancy], [SINKS, SUSPENDED], FLOATS)
+    # A floating object displaces its own weight: ρ_fluid * V_sub = ρ_obj * V_obj
+    vol_submerged = np.where(floats, _divide(rho_obj, rho_fluid, floats) * vol_obj, vol_obj)
+    fraction = np.where(floats, _divide(vol_submerged, vol_obj, floats), 1.0)
+    return BuoyancyResult(weight, np.minimum(weight, max_buoyancy), vol_submerged, fraction, state)
+
+
+# == Hydrostatic pressure: Ph = ρ * g * h ==
+def hydrostatic_pressure(rho, h, g=G_ACCEL):
+    return _as_float(rho) * g * _as_float(h)
+
+
+# == Continuity: A₁v₁ = A₂v₂ ==
+class ContinuityResult(NamedTuple):
+    A1: np.ndarray # m²
+    A2: np.ndarray # m²
+    v2: np.ndarray # m/s
+    flow: np.ndarray # m³/s
+    valid: np.ndarray # A2 > 0
+
+def continuity(D1_cm, v1, D2_cm):
+    D1_cm, v1, D2_cm = _as_floats(D1_cm, v1, D2_cm)
+    A1 = circle_area(D1_cm)
+    A2 = circle_area(D2_cm)
+    valid = A2 > 0
+    v2 = _divide(A1 * v1, A2, valid)
+    flow = np.where(valid, A1 * v1, 0.0)
+    return ContinuityResult(A1, A2, v2, flow, valid)
+
+
+# == Torricelli: v = √(2gh) ==
+class TorricelliResult(NamedTuple):
+    velocity: np.ndarray # m/s
+    g: np.ndarray # gravity actually used
+    valid: np.ndarray # h > 0
+
+def torricelli(h, g=G_ACCEL):
+    """Exit velocity; invalid gravities (None, <= 0) fall back to G_ACCEL."""
+    h, g = _as_floats(h, g)
+    g = np.where(g > 0, g, G_ACCEL)
+    valid = h > 0
+    velocity = np.sqrt(2 * g * np.where(valid, h, 0.0))
+    return TorricelliResult(velocity, g, valid)
+
+
+# == Draining tank (Torricelli): A(h) dh/dt = -Cd * a * √(2gh) ==
+class DrainResult(NamedTuple):
+    t: np.ndarray # s
+    h: np.ndarray # m, level above the orifice
+    velocity: np.ndarray # m/s, √(2gh)
+    flow: np.ndarray # m³/s, Cd * a * v
+    drain_time: float # s
+
+def drain_tank(h0, tank_area, orifice_d_cm, cd=0.61, g=G_ACCEL, n_frames=60):
+    """Closed-form draining of a prismatic tank, evaluated at ``n_frames`` evenly spaced times.
+
+    √h decreases linearly: √h(t) = √h0 - k*t with k = Cd * a * √(2g) / (2 * A_tank).
+    """
+    orifice_area = float(circle_area(orifice_d_cm))
+    k = cd * orifice_area * np.sqrt(2 * g) / (2 * tank_area)
+    drain_time = np.sqrt(h0) / k
+    t = np.linspace(0, drain_time, n_frames)
+    h = np.maximum(np.sqrt(h0) - k * t, 0.0)**2
+    velocity = np.sqrt(2 * g * h)
+    return DrainResult(t, h, velocity, cd * orifice_area * velocity, float(drain_time))
+
+def drain_tank_profile(h0, area_of_h, orifice_d_cm, cd=0.61, g=G_ACCEL, n_frames=60, n_samples=2000):
+    """Draining of a tank whose cross-section ``area_of_h(h)`` [m²] varies with the level.
+
+    The ODE is separable, so instead of stepping in time the elapsed time is
+    integrated as a function of the level. With u = √h, dt = -2 A(u²) du / (Cd a √(2g)),
+    which has no singularity at the empty tank. ``area_of_h`` must accept arrays.
+    """
+    orifice_area = float(circle_area(orifice_d_cm))
+    c = cd * orifice_area * np.sqrt(2 * g)
+    u = np.linspace(np.sqrt(h0), 0.0, n_samples)
+    integrand = 2 * np.maximum(area_of_h(u**2), orifice_area) / c
+    # Cumulative trapezoid rule: elapsed time when the level reaches u²
+    elapsed = np.concatenate(([0.0], np.cumsum((integrand[1:] + integrand[:-1]) / 2 * -np.diff(u))))
+    drain_time = elapsed[-1]
+    t = np.linspace(0, drain_time, n_frames)
+    h = np.interp(t, elapsed, u)**2
+    velocity = np.sqrt(2 * g * h)
+    return DrainResult(t, h, velocity, cd * orifice_area * velocity, float(drain_time))
+
+
+# == Stratified fluid column: dp/dz = ρ(z) * g ==
+class LayeredProfile(NamedTuple):
+    depth: np.ndarray # m, from the surface
+    density: np.ndarray # kg/m³ (grows with depth if compressible)
+    pressure: np.ndarray # Pa, surface pressure + gauge pressure
+    interfaces: np.ndarray # m, depth of the bottom of each layer
+
+def layered_pressure(densities, thicknesses, n_samples=100_000, surface_pressure=0.0, bulk_modulus=None, g=G_ACCEL):
+    """Pressure profile of stacked fluid layers, listed from the surface down.
+
+    The profile is sampled at ``n_samples`` depths plus every interface and
+    integrated cumulatively. With a ``bulk_modulus`` K the density follows
+    ρ = ρ₀ * exp(p_gauge / K); the integral then has the closed form
+    p_gauge = -K * ln(1 - q / K), where q is the incompressible gauge pressure.
+    It diverges where q reaches K: a deeper column raises ValueError.
+    """
+    densities = _as_float(densities)
+    interfaces = np.cumsum(_as_float(thicknesses))
+    depth = np.union1d(np.linspace(0, interfaces[-1], n_samples), interfaces)
+    # Layer of each sample; an interface belongs to the layer above it
+    layer = np.minimum(np.searchsorted(interfaces, depth, side='left'), len(densities) - 1)
+    rho0 = densities[layer]
+
+    # Midpoint density of each interval, so a layer boundary is not smeared
+    mid_layer = np.minimum(np.searchsorted(interfaces, (depth[1:] + depth[:-1]) / 2, side='left'), len(densities) - 1)
+    q = np.concatenate(([0.0], np.cumsum(densities[mid_layer] * g * np.diff(depth))))
+    if bulk_modulus:
+        if q[-1] >= bulk_modulus:
+            raise ValueError(f"La presión incompresible ρgh ({q[-1]:,.0f} Pa) alcanza el módulo de compresibilidad "
+                             f"K ({bulk_modulus:,.0f} Pa): con ρ = ρ₀·exp(p/K) la presión diverge. Aumente K o reduzca la columna.")
+        gauge = -bulk_modulus * np.log1p(-q / bulk_modulus)
+        density = rho0 * np.exp(gauge / bulk_modulus)
+    else:
+        gauge = q
+        density = rho0
+    return LayeredProfile(depth, density, surface_pressure + gauge, interfaces)
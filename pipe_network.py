@@ -0,0 +1,171 @@
+"""Steady incompressible flow in pipe networks, solved with sparse matrices.
+
+A network is a graph of circular segments between nodes. The flow enters at
+one inlet node and leaves at outlet nodes, whose total (Bernoulli) pressure
+H = p + ½ρv² is the reference H = 0: every pressure is relative to the total
+head at the outlets, so static pressures p = H - ½ρv² are negative where the
+flow is fast. Each segment loses total pressure in proportion to its flow,
+with the laminar Hagen–Poiseuille resistance R = 128 μ L / (π D⁴). Mass
+conservation at every node then gives a weighted graph Laplacian system for
+H, which only depends on the topology and the segments. Its sparse LU factorization is cached, so a change of inlet
+velocity is a single pair of triangular solves.
+"""
+import functools
+from typing import NamedTuple
+
+import numpy as np
+
+from physics import WATER_DENSITY, circle_area
+
+WATER_VISCOSITY = 1.0e-3 # Pa·s at 20 °C
+
+
+class PipeNetwork(NamedTuple):
+    x: np.ndarray # m, node coordinates (for plotting)
+    y: np.ndarray
+    start: np.ndarray # node index of the upstream end of each segment (as drawn)
+    end: np.ndarray
+    diameter_cm: np.ndarray
+    length: np.ndarray # m
+    inlet: int
+    outlets: np.ndarray # node indices
+
+
+def series_network(n_nodes, D_in_cm, D_out_cm, total_length=10.0):
+    """Segments in series whose diameter goes from ``D_in_cm`` to ``D_out_cm``."""
+    n_nodes = max(int(n_nodes), 2)
+    x = np.linspace(0, total_length, n_nodes)
+    nodes = np.arange(n_nodes)
+    fraction = (nodes[:-1] + 0.5) / (n_nodes - 1)
+    return PipeNetwork(
+        x, np.zeros(n_nodes), nodes[:-1], nodes[1:],
+        D_in_cm + (D_out_cm - D_in_cm) * fraction, np.diff(x),
+        0, np.array([n_nodes - 1]))
+
+
+def tree_network(n_nodes, D_in_cm, D_out_cm):
+    """Binary branching from a feed segment; the leaves are the outlets.
+
+    Diameters shrink geometrically from ``D_in_cm`` to ``D_out_cm`` at the
+    leaves; the second child of each junction is 50 % longer, so the flow
+    splits unevenly.
+    """
+    levels = max(int(np.log2(max(n_nodes, 4))) - 1, 1)
+    # Node 0 feeds node 1, the root of a heap-ordered tree of nodes 1 .. 2^(levels+1) - 1
+    n = 2 ** (levels + 1)
+    heap = np.arange(1, n)
+    depth = np.floor(np.log2(heap)).astype(int)
+    x = np.concatenate(([0.0], depth + 1.0))
+    y = np.concatenate(([0.0], ((heap - 2.0 ** depth + 0.5) / 2.0 ** depth - 0.5) * levels))
+    child = heap[1:]
+    start = np.concatenate(([0], child // 2))
+    end = np.concatenate(([1], child))
+    level = np.concatenate(([0], depth[1:]))
+    diameter = D_in_cm * (D_out_cm / D_in_cm) ** (level / levels) if D_in_cm > 0 else np.zeros(len(start))
+    length = np.where(end % 2 == 1, 1.5, 1.0)
+    length[0] = 1.0
+    outlets = np.arange(2 ** levels, n)
+    return PipeNetwork(x, y, start, end, diameter, length, 0, outlets)
+
+
+def grid_network(n_nodes, D_in_cm, D_out_cm, spacing=1.0):
+    """Square mesh with loops, fed at one corner; the far column holds the outlets."""
+    side = max(int(np.sqrt(n_nodes)), 2)
+    col, row = np.meshgrid(np.arange(side), np.arange(side))
+    col, row = col.ravel(), row.ravel()
+    index = row * side + col
+    horizontal = col < side - 1
+    vertical = row < side - 1
+    start = np.concatenate((index[horizontal], index[vertical]))
+    end = np.concatenate((index[horizontal] + 1, index[vertical] + side))
+    # The diameter follows the column of the segment's midpoint
+    position = (np.concatenate((col[horizontal] + 0.5, col[vertical])) / (side - 1))
+    return PipeNetwork(
+        col * spacing, row * spacing, start, end,
+        D_in_cm + (D_out_cm - D_in_cm) * position, np.full(len(start), spacing),
+        0, index[col == side - 1])
+
+
+GENERATORS = {'series': series_network, 'tree': tree_network, 'grid': grid_network}
+
+
+class NetworkFlow(NamedTuple):
+    head: np.ndarray # Pa, total pressure H = p + ½ρv² at each node, relative to the outlets
+    flow: np.ndarray # m³/s in each segment, positive from start to end
+    velocity: np.ndarray # m/s, signed like flow
+    static_pressure: np.ndarray # Pa, H - ½ρv² at the upstream end of each segment (in the direction of the flow)
+    outlet_flow: np.ndarray # m³/s leaving through each outlet
+    imbalance: float # m³/s, largest mass-conservation residual over the nodes
+
+
+class NetworkSolver:
+    """Factorizes the network once; :meth:`solve` is then cheap for any inlet flow."""
+
+    def __init__(self, network, viscosity=WATER_VISCOSITY):
+        # scipy.sparse is slow to import: only once a network is solved
+        import scipy.sparse as sp
+        from scipy.sparse.csgraph import dijkstra
+        from scipy.sparse.linalg import factorized
+
+        self.network = network
+        n_nodes, n_segments = len(network.x), len(network.start)
+        diameter_m = np.asarray(network.diameter_cm, dtype=float) / 100.0
+        self.area = circle_area(network.diameter_cm)
+        self.conductance = np.pi * diameter_m**4 / (128 * viscosity * network.length)
+
+        # Incidence matrix: +1 where a segment starts, -1 where it ends
+        segments = np.arange(n_segments)
+        self.incidence = sp.csr_matrix(
+            (np.concatenate((np.ones(n_segments), -np.ones(n_segments))),
+             (np.concatenate((network.start, network.end)), np.concatenate((segments, segments)))),
+            shape=(n_nodes, n_segments))
+        laplacian = (self.incidence @ sp.diags(self.conductance) @ self.incidence.T).tocsr()
+
+        # Outlets are fixed at H = 0; the other nodes are unknowns
+        self.free = np.setdiff1d(np.arange(n_nodes), network.outlets)
+        self.inlet_row = int(np.searchsorted(self.free, network.inlet))
+        self._solve = factorized(laplacian[self.free][:, self.free].tocsc())
+
+        # Shortest path (by length) from the inlet to every node, for the pressure profiles
+        graph = sp.csr_matrix((network.length, (network.start, network.end)), shape=(n_nodes, n_nodes))
+        self.distance, self._predecessors = dijkstra(graph, directed=False, indices=network.inlet, return_predecessors=True)
+        # segment index + 1 between two adjacent nodes, in both directions
+        segment_of = sp.csr_matrix((segments + 1, (network.start, network.end)), shape=(n_nodes, n_nodes))
+        self._segment_of = (segment_of + segment_of.T).tocsr()
+
+    def solve(self, inlet_flow, rho=WATER_DENSITY):
+        network = self.network
+        injection = np.zeros(len(self.free))
+        injection[self.inlet_row] = inlet_flow
+        head = np.zeros(len(network.x))
+        head[self.free] = self._solve(injection)
+
+        flow = self.conductance * (head[network.start] - head[network.end])
+        velocity = np.divide(flow, self.area, out=np.zeros_like(flow), where=self.area > 0)
+        upstream = np.where(flow >= 0, network.start, network.end)
+        static_pressure = head[upstream] - 0.5 * rho * velocity**2
+
+        net_outflow = self.incidence @ flow
+        outlet_flow = net_outflow[network.outlets]
+        expected = np.zeros(len(network.x))
+        expected[network.inlet] = inlet_flow
+        expected[network.outlets] = outlet_flow
+        imbalance = float(np.max(np.abs(net_outflow - expected)))
+        return NetworkFlow(head, flow, velocity, static_pressure, -outlet_flow, imbalance)
+
+    def path(self, node):
+        """Node indices from the inlet to ``node`` along the shortest path."""
+        nodes = [node]
+        while nodes[-1] != self.network.inlet and self._predecessors[nodes[-1]] >= 0:
+            nodes.append(self._predecessors[nodes[-1]])
+        return np.array(nodes[::-1])
+
+    def path_segments(self, path):
+        """Indices of the segments joining consecutive nodes of ``path``."""
+        return np.asarray(self._segment_of[path[:-1], path[1:]]).ravel().astype(int) - 1
+
+
+@functools.lru_cache(maxsize=32)
+def network_solver(kind, n_nodes, D_in_cm, D_out_cm):
+    """Cached :class:`NetworkSolver` of a generated network: the factorization only depends on these."""
+    return NetworkSolver(GENERATORS[kind](n_nodes, D_in_cm, D_out_cm))
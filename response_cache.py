@@ -0,0 +1,322 @@
+"""Memoization of serialized Dash callback responses.
+
+Every input of the dashboard is a bounded, discretized slider, so identical
+requests are extremely common across users. ``install_response_cache`` hooks
+into the Flask server behind a Dash app and answers repeated
+``/_dash-update-component`` requests with the bytes produced the first time.
+
+``ResponseCache`` lives in the memory of one process; ``SharedResponseCache``
+stores the responses in a SQLite file so every worker of a multi-process
+server reuses the figures computed by the others.
+"""
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, g, jsonify, request
+
+UPDATE_COMPONENT_PATH = '_dash-update-component'
+
+
+class ResponseCache:
+    """Thread-safe LRU cache bounded by entry count and total size in bytes."""
+
+    def __init__(self, max_bytes, max_entries=100_000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+
+class SharedResponseCache:
+    """LRU cache bounded by total size, stored in a SQLite file shared by several processes.
+
+    Hit, miss and eviction counters are per process.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        db = self._db()
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS responses '
+                   '(key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+        db.execute('CREATE INDEX IF NOT EXISTS responses_used ON responses (used)')
+
+    def _db(self):
+        # One connection per thread and process: connections must not cross a fork
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.pid = pid
+        return self._local.db
+
+    @staticmethod
+    def _key(key):
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, key):
+        db = self._db()
+        key = self._key(key)
+        row = db.execute('SELECT body FROM responses WHERE key = ?', (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        db.execute('UPDATE responses SET used = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        db = self._db()
+        db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                   (self._key(key), value, len(value), time.time()))
+        excess = db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0] - self.max_bytes
+        while excess > 0:
+            oldest = db.execute('SELECT key, size FROM responses ORDER BY used LIMIT 64').fetchall()
+            evicted = []
+            for old_key, size in oldest:
+                if excess <= 0:
+                    break
+                evicted.append((old_key,))
+                excess -= size
+            if not evicted:
+                break
+            db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+            with self._lock:
+                self.evictions += len(evicted)
+
+    def clear(self):
+        self._db().execute('DELETE FROM responses')
+
+    def stats(self):
+        entries, size = self._db().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+
+def slider_grids(layout):
+    """Returns ``{slider_id: (min, step)}`` for every ``dcc.Slider`` in ``layout``."""
+    grids = {}
+    for component in itertools.chain([layout], layout._traverse()):
+        if type(component).__name__ == 'Slider' and getattr(component, 'id', None) is not None:
+            grids[component.id] = (component.min, component.step)
+    return grids
+
+
+def quantize(value, grid=None):
+    """Normalizes an input value so that equivalent requests share a cache key."""
+    if isinstance(value, (list, dict)): # e.g. the rows of a DataTable
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    if grid is not None and grid[1]:
+        low, step = grid
+        ticks = (value - low) / step
+        # Snap to the slider grid: 0.30000000000000004 and 0.3 are the same tick
+        if abs(ticks - round(ticks)) < 1e-6:
+            return round(low + round(ticks) * step, 12)
+    return round(value, 9)
+
+
+def split_output(output):
+    """The ``outputs`` of a request to the callback map key ``output``: a list for multi-output callbacks."""
+    parts = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in output.strip('.').split('...')]
+    return parts if output.startswith('..') else parts[0]
+
+
+def callback_body(output, inputs, values, changed=(), state=()):
+    """``/_dash-update-component`` request body, as the browser sends it, for a callback map entry."""
+    return {
+        'output': output,
+        'outputs': split_output(output),
+        'inputs': [dict(item, value=value) for item, value in zip(inputs, values)],
+        'changedPropIds': list(changed),
+        'state': list(state),
+    }
+
+
+def request_key(body, grids):
+    """Builds the cache key of a ``/_dash-update-component`` request body."""
+    inputs = []
+    for item in itertools.chain(body.get('inputs', []), body.get('state', [])):
+        if isinstance(item, list): # Wildcard (pattern-matching) inputs
+            return None
+        inputs.append((json.dumps(item['id'], sort_keys=True), item['property'],
+                       quantize(item.get('value'), grids.get(item['id']))))
+    # Initial calls return full figures, later ones return patches
+    initial = not body.get('changedPropIds')
+    return body['output'], tuple(inputs), initial
+
+
+def install_response_cache(app, cache, exclude=()):
+    """Serves repeated callback requests of ``app`` from ``cache``.
+
+    Callbacks with an output on a component id in ``exclude`` are never cached,
+    e.g. the ones whose response depends on the state of a background job.
+    """
+    server = app.server
+    exclude = set(exclude)
+    grids = {}
+
+    def _grids():
+        if not grids:
+            grids.update(slider_grids(_full_layout(app)))
+        return grids
+
+    @server.before_request
+    def _serve_cached_response():
+        if not request.path.endswith(UPDATE_COMPONENT_PATH) or request.method != 'POST':
+            return None
+        try:
+            body = request.get_json()
+            outputs = body['outputs'] if isinstance(body['outputs'], list) else [body['outputs']]
+            if any(output['id'] in exclude for output in outputs):
+                return None
+            key = request_key(body, _grids())
+        except (KeyError, TypeError, ValueError):
+            return None
+        if key is None:
+            return None
+        body = cache.get(key)
+        if body is None:
+            g.response_cache_key = key
+            return None
+        return Response(body, mimetype='application/json')
+
+    @server.after_request
+    def _store_response(response):
+        key = g.pop('response_cache_key', None)
+        if key is not None and response.status_code == 200 and not response.direct_passthrough:
+            cache.put(key, response.get_data())
+        return response
+
+    @server.route('/_cache-stats')
+    def _cache_stats():
+        return jsonify(cache.stats())
+
+
+def _full_layout(app):
+    # Tabs rendered on demand only appear in the validation layout
+    return app.validation_layout or app.layout
+
+
+def _value_choices(slider):
+    """Default value and marked ticks of a slider, snapped to its grid."""
+    grid = (slider.min, slider.step)
+    choices = {quantize(slider.value, grid)}
+    for mark in (getattr(slider, 'marks', None) or {}):
+        mark = float(mark)
+        if slider.min <= mark <= slider.max:
+            choices.add(quantize(mark, grid))
+    return sorted(choices)
+
+
+def warm_up(app, cache, max_requests=5000, max_per_callback=500):
+    """Precomputes the responses for the default value and marked ticks of every slider.
+
+    Each server callback is requested for the cartesian product of the popular
+    values of its inputs, both as an initial call and as an update, up to
+    ``max_per_callback`` requests each. Returns the number of requests made,
+    of entries added to ``cache`` and the outputs of the callbacks that failed.
+    """
+    sliders = {}
+    defaults = {}
+    for component in _full_layout(app)._traverse():
+        component_id = getattr(component, 'id', None)
+        if component_id is None:
+            continue
+        if type(component).__name__ == 'Slider':
+            sliders[component_id] = _value_choices(component)
+        elif hasattr(component, 'value'):
+            defaults[component_id] = [component.value]
+
+    client = app.server.test_client()
+    url = app.config.requests_pathname_prefix + UPDATE_COMPONENT_PATH
+    entries = cache.stats()['entries']
+    count = 0
+    failed = set()
+    for output, spec in app.callback_map.items():
+        inputs = spec['inputs']
+        if 'callback' not in spec: # Client-side callback
+            continue
+        if spec.get('state') or any(i['id'] not in sliders and i['id'] not in defaults for i in inputs):
+            continue
+        choices = [sliders.get(i['id'], defaults.get(i['id'], [None])) for i in inputs]
+        calls = itertools.product(itertools.product(*choices), ([], [f"{inputs[0]['id']}.{inputs[0]['property']}"]))
+        for values, changed in itertools.islice(calls, max_per_callback):
+            if count >= max_requests:
+                break
+            response = client.post(url, json=callback_body(output, inputs, values, changed))
+            count += 1
+            # 204: the callback raised PreventUpdate, nothing to store
+            if response.status_code not in (200, 204):
+                failed.add(output)
+    return {'requests': count, 'stored': cache.stats()['entries'] - entries, 'failed': sorted(failed)}
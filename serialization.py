@@ -0,0 +1,174 @@
+"""Compact figure serialization for the callback responses.
+
+By default every ``go.Figure`` embeds the full "plotly" template (several KB
+of colorscales and per-trace defaults) and is encoded with the standard json
+module. With ``configure(lean_template=True)`` the figures converted by
+``figure_dict`` only name the app-wide template (``"template": "fluidos"``):
+the page receives the template once, in the ``fluidos-template`` meta tag
+(see ``template_json``), and assets/templates.js puts it in place of the name
+in every response. ``figure_dict`` also drops the keys whose value is the
+plotly.js default or the template's. ``configure`` then switches Plotly's
+JSON engine to orjson when it is installed and optionally encodes numeric
+arrays as base64 typed arrays.
+
+``FigureTemplates`` skips Plotly's object model for repeated full figures:
+each kind of figure is built with ``go.Figure`` once, and later ones are
+copies of its dict with the input-dependent parts replaced.
+"""
+import base64
+import json
+import threading
+
+import numpy as np
+import plotly.io as pio
+
+TEMPLATE_NAME = 'fluidos'
+
+_AXIS = dict(gridcolor='white', linecolor='white', zerolinecolor='white', zerolinewidth=2, ticks='', automargin=True)
+
+# Only the layout part of the default "plotly" template is kept: the dashboard
+# sets the style of its traces explicitly.
+LEAN_LAYOUT = dict(
+    colorway=['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A', '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52'],
+    font=dict(color='#2a3f5f'),
+    hovermode='closest',
+    paper_bgcolor='white',
+    plot_bgcolor='#E5ECF6',
+    title=dict(x=0.05),
+    xaxis=_AXIS,
+    yaxis=_AXIS,
+)
+
+# plotly.js defaults of trace attributes the dashboard sets (by trace type; '*' for all)
+TRACE_DEFAULTS = {
+    '*': dict(visible=True, showlegend=True, opacity=1),
+    'bar': dict(textposition='auto'),
+    'indicator': dict(domain=dict(x=[0, 1], y=[0, 1])),
+}
+
+_lean_template = False
+_typed_arrays = False
+
+
+def configure(lean_template=True, fast_json=True, typed_arrays=False):
+    """Sets up figure serialization for the whole process.
+
+    ``typed_arrays`` encodes NumPy arrays as ``{'dtype', 'bdata'}`` objects, which
+    require plotly.js >= 2.28 in the browser.
+    """
+    global _lean_template, _typed_arrays
+    if lean_template:
+        # The template is applied in the browser: figures are built without any
+        pio.templates.default = 'none'
+    _lean_template = lean_template
+    if fast_json:
+        try:
+            import orjson # noqa: F401
+        except ImportError:
+            pass
+        else:
+            pio.json.config.default_engine = 'orjson'
+    _typed_arrays = typed_arrays
+
+
+def template_json():
+    """The app-wide template, as the JSON sent once in the page."""
+    return json.dumps({'layout': LEAN_LAYOUT}, separators=(',', ':'), ensure_ascii=False)
+
+
+def figure_dict(fig):
+    """``fig`` as the plain dict sent to the browser, without default-valued keys.
+
+    With the lean template, ``layout.template`` is only the template's name.
+    """
+    figure = fig.to_plotly_json()
+    layout = figure.setdefault('layout', {})
+    if _lean_template:
+        layout['template'] = TEMPLATE_NAME
+        _drop_equal(layout, LEAN_LAYOUT)
+    for trace in figure.get('data', []):
+        _drop_equal(trace, TRACE_DEFAULTS['*'])
+        _drop_equal(trace, TRACE_DEFAULTS.get(trace.get('type'), {}))
+    return figure
+
+
+def _drop_equal(values, defaults):
+    """Removes the entries of ``values`` equal to those of ``defaults``, recursing into dicts."""
+    for key, default in defaults.items():
+        value = values.get(key)
+        if isinstance(value, dict) and isinstance(default, dict):
+            _drop_equal(value, default)
+            if not value:
+                del values[key]
+        elif value is not None and not isinstance(value, np.ndarray) and value == default:
+            del values[key]
+
+
+def encode_array(values):
+    """Returns ``values`` ready to be placed in a figure.
+
+    NumPy arrays become base64 float32 typed arrays when typed arrays are
+    enabled; anything else is returned unchanged.
+    """
+    if not _typed_arrays or not isinstance(values, np.ndarray):
+        return values
+    return typed_array(values, 'f4')
+
+
+def typed_array(values, dtype):
+    """Encodes ``values`` as a plotly.js typed array of ``dtype`` (e.g. 'u1', 'f4'), keeping 2-D shapes."""
+    data = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    encoded = {'dtype': dtype, 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+    if data.ndim > 1:
+        encoded['shape'] = ','.join(str(n) for n in data.shape)
+    return encoded
+
+
+def typed_arrays_enabled():
+    return _typed_arrays
+
+
+class FigureTemplates:
+    """Full figures as plain dicts, copied from the first figure built for each key.
+
+    ``key`` identifies a kind of figure, e.g. the function object of the
+    callback and the name of its build function; without a key the figure is
+    built every time. ``updates`` must cover every part of the figure that
+    depends on the inputs, as for the patches of ``figure_or_patch``. The
+    copies share every unchanged part with the template, so they must not be
+    modified.
+    """
+
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def figure(self, build_figure, updates, key=None):
+        if key is None:
+            return with_updates(figure_dict(build_figure()), updates)
+        template = self._templates.get(key)
+        if template is None:
+            template = figure_dict(build_figure())
+            with self._lock:
+                template = self._templates.setdefault(key, template)
+        return with_updates(template, updates)
+
+    def __len__(self):
+        return len(self._templates)
+
+
+def with_updates(figure, updates):
+    """Copy of ``figure`` with ``updates`` ({path: value}) applied; only the containers on the paths are copied."""
+    result = dict(figure)
+    copied = {id(result)}
+    for path, value in updates.items():
+        target = result
+        for key in path[:-1]:
+            child = target[key]
+            if id(child) not in copied:
+                child = list(child) if isinstance(child, list) else dict(child)
+                copied.add(id(child))
+                target[key] = child
+            target = child
+        target[path[-1]] = value
+    return result
@@ -0,0 +1,84 @@
+"""Production server for the fluids dashboard.
+
+Runs ``fluidoscona.create_app().server`` under gunicorn (``pip install gunicorn``)::
+
+    python serve.py --workers 4 --threads 4 --bind 0.0.0.0:8050
+
+The app is built once in the master process before the workers are forked
+(``preload_app``), so the layout, precomputed responses and warmed-up cache
+are shared copy-on-write. Every worker reads and writes the same SQLite
+response cache, so a figure computed by one worker is reused by all of them. Heavy
+computations (sweeps, batch files) run in a pool of ``--job-workers``
+processes per worker, outside of the request threads.
+Dash dev tools stay off: they are only enabled by ``app.run(debug=True)``.
+
+Graceful operations are gunicorn's signals sent to the master process:
+``HUP`` restarts the workers after they finish their requests, ``TTIN`` /
+``TTOU`` add or remove a worker, and ``USR2`` followed by ``TERM`` on the old
+master reloads new code without dropping connections.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the fluids dashboard with gunicorn.")
+    parser.add_argument('--bind', default=os.environ.get('FLUIDOS_BIND', '0.0.0.0:8050'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('FLUIDOS_WORKERS', multiprocessing.cpu_count())))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('FLUIDOS_THREADS', 4)))
+    parser.add_argument('--timeout', type=int, default=30, help="seconds before a silent worker is restarted")
+    parser.add_argument('--graceful-timeout', type=int, default=30, help="seconds workers get to finish on reload")
+    parser.add_argument('--max-requests', type=int, default=0, help="restart a worker after this many requests (0: never)")
+    parser.add_argument('--cache-file', default=os.path.join(tempfile.gettempdir(), 'fluidos-responses.sqlite3'),
+                        help="SQLite file of the response cache shared by the workers")
+    parser.add_argument('--cache-mb', type=float, default=256)
+    parser.add_argument('--job-workers', type=int, default=int(os.environ.get('FLUIDOS_JOB_WORKERS', 2)),
+                        help="background job processes per worker (0: run heavy callbacks in the request)")
+    parser.add_argument('--no-warmup', action='store_true', help="skip precomputing the popular slider values")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("serve.py needs gunicorn: pip install gunicorn")
+
+    # Responses depend on the code being served: start from an empty cache
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(args.cache_file + suffix):
+            os.remove(args.cache_file + suffix)
+    os.environ['FLUIDOS_SHARED_CACHE'] = args.cache_file
+    os.environ['FLUIDOS_CACHE_MB'] = str(args.cache_mb)
+    os.environ['FLUIDOS_CACHE_WARMUP'] = '0' if args.no_warmup else '1'
+    os.environ['FLUIDOS_JOB_WORKERS'] = str(args.job_workers)
+
+    class DashboardApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': args.bind,
+                'workers': args.workers,
+                'threads': args.threads,
+                'worker_class': 'gthread' if args.threads > 1 else 'sync',
+                'preload_app': True,
+                'timeout': args.timeout,
+                'graceful_timeout': args.graceful_timeout,
+                'max_requests': args.max_requests,
+                'max_requests_jitter': args.max_requests // 10,
+                'proc_name': 'fluidoscona',
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from fluidoscona import create_app
+            return create_app().server
+
+    DashboardApplication().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""2-D parameter sweeps of the dashboard models, rendered as heatmaps.
+
+A sweep evaluates one tab's model over an n × n grid of two of its inputs in
+a single vectorized call to :mod:`physics`, the other inputs staying at their
+current values. The result is quantized to uint8 so that a 1000 × 1000 grid
+fits in about 1.3 MB as a base64 typed array. The grid is always sent as a
+typed array, whatever ``FLUIDOS_TYPED_ARRAYS`` says for the other figures:
+the plotly.js bundled with Dash reads them, and as lists the full grid would
+be several times larger.
+"""
+import functools
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+import physics
+import serialization
+
+ROW_BLOCK = 100 # Grid rows evaluated per call of the model
+
+
+class Param(NamedTuple):
+    name: str
+    label: str
+    component_id: str # Input holding the current value
+    low: float
+    high: float
+
+
+class Sweep(NamedTuple):
+    params: list # Param, in the order of the model's arguments
+    quantity: str
+    model: Callable
+    categorical: bool = False # The model returns the uint8 codes used by CATEGORICAL_COLORSCALE
+
+
+# Archimedes: floating objects are coded by submerged percentage (0..200 = 0..100 %)
+SUSPENDED_CODE = 225
+SINKS_CODE = 255
+
+
+def _archimedes_codes(rho_obj, vol_obj, rho_fluid):
+    result = physics.buoyancy(rho_obj, vol_obj, rho_fluid)
+    codes = np.round(result.fraction_submerged * 200)
+    codes = np.where(result.state == physics.SUSPENDED, SUSPENDED_CODE, codes)
+    codes = np.where(result.state == physics.SINKS, SINKS_CODE, codes)
+    return codes
+
+
+SWEEPS = {
+    'pressure': Sweep(
+        [Param('force', "Fuerza (F) [N]", 'pressure-force-slider', 0, 1000),
+         Param('area', "Área (A) [m²]", 'pressure-area-slider', 0.01, 1)],
+        "Presión (P) [Pa]",
+        lambda force, area: physics.pressure(force, area).pressure),
+    'hydraulic': Sweep(
+        [Param('f', "Fuerza Aplicada (f) [N]", 'hydraulic-f-slider', 10, 500),
+         Param('d', "Diámetro Émbolo Menor (d) [cm]", 'hydraulic-d-slider', 1, 10),
+         Param('D', "Diámetro Émbolo Mayor (D) [cm]", 'hydraulic-D-slider', 5, 50)],
+        "Ventaja Mecánica (F/f)",
+        lambda f, d, D: physics.hydraulic_press(f, d, D).advantage),
+    'archimedes': Sweep(
+        [Param('rho_obj', "Densidad del Objeto [kg/m³]", 'archimedes-rho-obj-slider', 100, 12000),
+         Param('vol_obj', "Volumen del Objeto [m³]", 'archimedes-vol-obj-slider', 0.001, 0.1),
+         Param('rho_fluid', "Densidad del Fluido [kg/m³]", 'archimedes-rho-fluid-slider', 500, 1500)],
+        "Volumen Sumergido",
+        _archimedes_codes,
+        categorical=True),
+    'hydrostatic': Sweep(
+        [Param('h', "Profundidad (h) [m]", 'hydrostatic-h-slider', 0, 100),
+         Param('rho', "Densidad del Fluido (ρ) [kg/m³]", 'hydrostatic-rho-slider', 500, 1500)],
+        "Presión Hidrostática (Ph) [Pa]",
+        lambda h, rho: physics.hydrostatic_pressure(rho, h)),
+    'continuity': Sweep(
+        [Param('D1', "Diámetro D₁ [cm]", 'continuity-D1-slider', 1, 10),
+         Param('v1', "Velocidad v₁ [m/s]", 'continuity-v1-slider', 0.1, 10),
+         Param('D2', "Diámetro D₂ [cm]", 'continuity-D2-slider', 1, 10)],
+        "Velocidad v₂ [m/s]",
+        lambda D1, v1, D2: physics.continuity(D1, v1, D2).v2),
+    'torricelli': Sweep(
+        [Param('h', "Altura (h) [m]", 'torricelli-h-slider', 0.1, 10),
+         Param('g', "Gravedad (g) [m/s²]", 'torricelli-g-input', 1, 25)],
+        "Velocidad de Salida (v) [m/s]",
+        lambda h, g: physics.torricelli(h, g).velocity),
+}
+
+
+def compute(tab, x_name, y_name, n, fixed, progress=None):
+    """Evaluates the model of ``tab`` on an n × n grid; returns ``(x, y, z)`` with z[row=y, col=x].
+
+    The grid is evaluated in blocks of ``ROW_BLOCK`` rows, after each of which
+    ``progress`` (if given) is called with the completed fraction.
+    """
+    sweep = SWEEPS[tab]
+    params = {param.name: param for param in sweep.params}
+    x = np.linspace(params[x_name].low, params[x_name].high, n)
+    y = np.linspace(params[y_name].low, params[y_name].high, n)
+    z = np.empty((n, n))
+    for start in range(0, n, ROW_BLOCK):
+        rows = y[start:start + ROW_BLOCK, np.newaxis]
+        args = [x[np.newaxis, :] if param.name == x_name else rows if param.name == y_name else fixed[param.name]
+                for param in sweep.params]
+        z[start:start + len(rows)] = np.broadcast_to(sweep.model(*args), (len(rows), n))
+        if progress is not None:
+            progress((start + len(rows)) / n)
+    return x, y, z
+
+
+def _quantize(z):
+    """uint8 codes of ``z`` and the (code, value) pairs for the colorbar."""
+    low, high = float(np.nanmin(z)), float(np.nanmax(z))
+    span = high - low or 1.0
+    codes = np.round((np.nan_to_num(z, nan=low) - low) / span * 255).astype(np.uint8)
+    ticks = [(code, low + code / 255 * span) for code in (0, 64, 128, 191, 255)]
+    return codes, ticks
+
+
+def _colorbar(sweep, ticks):
+    if sweep.categorical:
+        return dict(title='', tickvals=[0, 100, 200, SUSPENDED_CODE, SINKS_CODE],
+                    ticktext=['Flota 0 %', 'Flota 50 %', 'Flota 100 %', 'Suspendido', 'Se hunde'])
+    return dict(title=sweep.quantity, tickvals=[code for code, _ in ticks],
+                ticktext=[f"{value:,.3g}" for _, value in ticks])
+
+
+# Floating objects in blues, suspended in green and sinking in red
+CATEGORICAL_COLORSCALE = [
+    [0.0, '#deebf7'], [200 / 255, '#08519c'],
+    [201 / 255, '#31a354'], [(SUSPENDED_CODE + 15) / 255, '#31a354'],
+    [(SUSPENDED_CODE + 16) / 255, '#de2d26'], [1.0, '#de2d26'],
+]
+
+
+@functools.lru_cache(maxsize=64)
+def figure(tab, x_name, y_name, n, fixed_items):
+    """Heatmap figure of a sweep, as a dict. ``fixed_items`` is a tuple of (name, value) pairs."""
+    return build_figure(tab, x_name, y_name, n, fixed_items)
+
+
+def build_figure(tab, x_name, y_name, n, fixed_items, progress=None):
+    """Uncached :func:`figure`, reporting to ``progress`` when run as a background job (see jobs.py)."""
+    sweep = SWEEPS[tab]
+    labels = {param.name: param.label for param in sweep.params}
+    x, y, z = compute(tab, x_name, y_name, n, dict(fixed_items), progress)
+    if sweep.categorical:
+        codes, ticks = z.astype(np.uint8), None
+    else:
+        codes, ticks = _quantize(z)
+
+    import plotly.graph_objects as go # Only for building the figure (job workers import this module first)
+    # The grid is only attached after validation: go.Heatmap would check every value
+    fig = go.Figure(go.Heatmap(
+        x0=x[0], dx=x[1] - x[0],
+        y0=y[0], dy=y[1] - y[0],
+        zmin=0, zmax=255,
+        colorscale=CATEGORICAL_COLORSCALE if sweep.categorical else 'Viridis',
+        colorbar=_colorbar(sweep, ticks),
+        hovertemplate=f"{labels[x_name]}: %{{x:.3g}}<br>{labels[y_name]}: %{{y:.3g}}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"{sweep.quantity} ({n}×{n})",
+        xaxis_title=labels[x_name],
+        yaxis_title=labels[y_name],
+        height=400,
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    result = serialization.figure_dict(fig)
+    result['data'][0]['z'] = serialization.typed_array(codes, 'u1')
+    return result
@@ -0,0 +1,84 @@
+import io
+import os
+
+import dash
+import pandas as pd
+import pytest
+
+import batch
+import physics
+from jobs import Cancelled
+
+
+@pytest.fixture
+def batch_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, 'BATCH_DIR', str(tmp_path / 'batch'))
+    return tmp_path / 'batch'
+
+
+@pytest.fixture
+def batch_client(batch_dir):
+    app = dash.Dash(__name__)
+    app.layout = dash.html.Div()
+    batch.install_batch_routes(app, run=batch.run_job) # Processed within the upload request
+    return app.server.test_client()
+
+
+def upload(client, model, data, filename='casos.csv'):
+    return client.post(f'/batch/{model}?filename={filename}', data=data)
+
+
+def test_evaluate_replaces_columns_named_like_results():
+    frame = pd.DataFrame({'force': [100.0, 50.0], 'area': [0.5, 0.0], 'pressure': [-1.0, -1.0]})
+    result = batch.evaluate('pressure', frame)
+    assert list(result['pressure'][:1]) == [200.0]
+    assert list(result['valid']) == [True, False]
+
+
+def test_evaluate_uses_defaults_and_reports_missing_columns():
+    result = batch.evaluate('torricelli', pd.DataFrame({'h': [5.0]}))
+    assert result['g'][0] == physics.G_ACCEL
+    with pytest.raises(ValueError, match='area'):
+        batch.evaluate('pressure', pd.DataFrame({'force': [1.0]}))
+
+
+def test_upload_status_and_download(batch_client):
+    response = upload(batch_client, 'pressure', b'force,area\n100,0.5\n30,2\n', 'cargas.csv')
+    assert response.status_code == 202
+    job = response.get_json()
+    status = batch_client.get(f"/batch/jobs/{job['id']}").get_json()
+    assert status['status'] == 'done' and status['rows'] == 2 and status['progress'] == 1.0
+
+    result = batch_client.get(f"/batch/jobs/{job['id']}/result")
+    assert result.status_code == 200
+    assert 'cargas-resultados.csv' in result.headers['Content-Disposition']
+    frame = pd.read_csv(io.BytesIO(result.get_data()))
+    assert list(frame['pressure']) == [200.0, 15.0]
+
+
+def test_failed_job_reports_its_error(batch_client):
+    job = upload(batch_client, 'pressure', b'force\n100\n').get_json()
+    status = batch_client.get(f"/batch/jobs/{job['id']}").get_json()
+    assert status['status'] == 'error' and 'area' in status['error']
+    assert batch_client.get(f"/batch/jobs/{job['id']}/result").status_code == 409
+
+
+def test_unknown_models_and_jobs_are_not_found(batch_client):
+    assert upload(batch_client, 'nope', b'x\n1\n').status_code == 404
+    assert batch_client.get('/batch/jobs/0123abcd').status_code == 404
+    assert batch.Job.load('..') is None
+
+
+def test_cancelled_job_ends_cancelled(batch_dir):
+    job = batch.Job('pressure', 'csv', 'casos.csv')
+    os.makedirs(job.directory)
+    with open(job.input_path, 'w') as f:
+        f.write('force,area\n1,1\n')
+
+    def progress(fraction):
+        raise Cancelled
+
+    batch.run_job(job, progress)
+    saved = batch.Job.load(job.id)
+    assert saved.status == 'cancelled' and saved.finished_at
+    assert not (batch_dir / job.id / 'input.csv').exists()
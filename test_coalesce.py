@@ -0,0 +1,72 @@
+import threading
+
+import dash
+from dash import Input, Output, dcc, html
+
+from coalesce import SEQ_HEADER, SESSION_HEADER, LatestRequests, install_coalescing
+from metrics import Metrics
+from response_cache import callback_body
+
+INPUTS = [{'id': 'a', 'property': 'value'}]
+
+
+def make_app(during_first_call=None):
+    app = dash.Dash(__name__)
+    app.layout = html.Div([dcc.Slider(id='a', min=0, max=10, value=0), html.Div(id='out')])
+    calls = []
+
+    @app.callback(Output('out', 'children'), Input('a', 'value'))
+    def echo(a):
+        calls.append(a)
+        if len(calls) == 1 and during_first_call is not None:
+            during_first_call()
+        return a
+
+    metrics = Metrics()
+    install_coalescing(app, metrics)
+    return app, calls, metrics
+
+
+def drag(client, value, seq, session='s1'):
+    return client.post('/_dash-update-component', json=callback_body('out.children', INPUTS, [value], ['a.value']),
+                       headers={SESSION_HEADER: session, SEQ_HEADER: str(seq)})
+
+
+def test_latest_requests():
+    latest = LatestRequests(max_entries=1)
+    assert latest.arrive('k', 2) and not latest.arrive('k', 1) and latest.is_latest('k', 2)
+    assert latest.arrive('other', 1) and latest.arrive('k', 1) # 'k' was evicted
+
+
+def test_request_older_than_one_seen_is_not_computed():
+    app, calls, metrics = make_app()
+    client = app.server.test_client()
+    assert drag(client, 2, seq=2).get_json()['response']['out']['children'] == 2
+    assert drag(client, 1, seq=1).status_code == 204
+    # Other sessions are independent
+    assert drag(client, 1, seq=1, session='s2').status_code == 200
+    assert calls == [2, 1]
+    assert 'fluidos_superseded_total{stage="queued"} 1' in metrics.render()
+
+
+def test_response_superseded_while_computed_is_dropped():
+    computing, newer_answered = threading.Event(), threading.Event()
+
+    def wait_for_newer():
+        computing.set()
+        assert newer_answered.wait(10)
+
+    app, calls, metrics = make_app(wait_for_newer)
+    client = app.server.test_client()
+    first = []
+    worker = threading.Thread(target=lambda: first.append(drag(client, 3, seq=1)))
+    worker.start()
+    # The second request arrives, and is answered, while the first one is still being computed
+    assert computing.wait(10)
+    newer = drag(client, 7, seq=2)
+    newer_answered.set()
+    worker.join(10)
+    assert first[0].status_code == 204
+    assert newer.status_code == 200 and newer.get_json()['response']['out']['children'] == 7
+    assert calls == [3, 7]
+    assert 'fluidos_superseded_total{stage="computed"} 1' in metrics.render()
@@ -0,0 +1,80 @@
+import gzip
+
+import dash
+import pytest
+from dash import html
+from flask import Response
+
+import compression
+from compression import IMMUTABLE_MAX_AGE, install_compression, parse_routes
+
+BODY = 'x' * 4096
+
+
+def make_client(tmp_path, **options):
+    (tmp_path / 'app.js').write_text('// ' + BODY)
+    app = dash.Dash(__name__, assets_folder=str(tmp_path))
+    app.layout = html.Div()
+    server = app.server
+    server.add_url_rule('/text', 'text', lambda: Response(BODY, mimetype='text/plain'))
+    server.add_url_rule('/small', 'small', lambda: Response('tiny', mimetype='text/plain'))
+    server.add_url_rule('/empty', 'empty', lambda: Response(status=204))
+    server.add_url_rule('/unchanged', 'unchanged', lambda: Response(status=304))
+    server.add_url_rule('/encoded', 'encoded', lambda: Response(gzip.compress(BODY.encode()), mimetype='text/plain',
+                                                                  headers={'Content-Encoding': 'gzip'}))
+    server.add_url_rule('/batch/result', 'batch', lambda: Response(BODY, mimetype='text/csv'))
+    install_compression(app, **options)
+    return server.test_client()
+
+
+def test_parse_routes():
+    assert parse_routes('assets/=512, batch/=off,') == {'assets/': 512, 'batch/': None}
+    assert parse_routes(None) == {}
+
+
+def test_encoding_is_negotiated(tmp_path, monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None) # gzip only, whether brotli is installed or not
+    client = make_client(tmp_path)
+    response = client.get('/text', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()).decode() == BODY
+
+    for accepted in ('identity', 'br'):
+        response = client.get('/text', headers={'Accept-Encoding': accepted})
+        assert 'Content-Encoding' not in response.headers and response.get_data(as_text=True) == BODY
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="needs the brotli package")
+def test_brotli_is_preferred_when_installed(tmp_path):
+    response = make_client(tmp_path).get('/text', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert compression.brotli.decompress(response.get_data()).decode() == BODY
+
+
+def test_small_empty_and_encoded_responses_are_left_alone(tmp_path):
+    client = make_client(tmp_path, min_bytes=1024)
+    headers = {'Accept-Encoding': 'gzip'}
+    assert 'Content-Encoding' not in client.get('/small', headers=headers).headers
+    for path in ('/empty', '/unchanged'):
+        response = client.get(path, headers=headers)
+        assert 'Content-Encoding' not in response.headers and response.get_data() == b''
+    encoded = client.get('/encoded', headers=headers)
+    assert gzip.decompress(encoded.get_data()).decode() == BODY # Compressed once, not twice
+    # Routes set to None are never compressed
+    assert 'Content-Encoding' not in client.get('/batch/result', headers=headers).headers
+
+
+def test_route_thresholds_override_the_default(tmp_path):
+    client = make_client(tmp_path, routes={'text': 1 << 20})
+    assert 'Content-Encoding' not in client.get('/text', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_versioned_assets_are_immutable(tmp_path):
+    client = make_client(tmp_path)
+    versioned = client.get('/assets/app.js?m=123', headers={'Accept-Encoding': 'gzip'})
+    assert versioned.headers['Cache-Control'] == f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    assert versioned.headers['Content-Encoding'] == 'gzip'
+    again = client.get('/assets/app.js?m=123', headers={'Accept-Encoding': 'gzip'})
+    assert again.get_data() == versioned.get_data()
+    assert 'immutable' not in client.get('/assets/app.js').headers.get('Cache-Control', '')
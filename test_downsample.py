@@ -0,0 +1,21 @@
+import numpy as np
+
+from downsample import lttb, lttb_indices
+
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[137], y[612] = 5.0, -3.0
+    indices = lttb_indices(x, y, 50)
+    assert len(indices) == 50 and indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    assert 137 in indices and 612 in indices
+
+
+def test_lttb_returns_short_series_unchanged():
+    x, y = np.arange(10.0), np.arange(10.0) ** 2
+    assert np.array_equal(lttb_indices(x, y, 10), np.arange(10))
+    assert np.array_equal(lttb_indices(x, y, 2), np.arange(10))
+    kept_x, kept_y = lttb(x, y, 20)
+    assert np.array_equal(kept_x, x) and np.array_equal(kept_y, y)
@@ -0,0 +1,65 @@
+import math
+
+from dash import dcc
+
+from export_static import CallbackPlan, allocate, plan_budget
+
+INPUTS = [{'id': 'h', 'property': 'value'}, {'id': 'rho', 'property': 'value'}, {'id': 'shape', 'property': 'value'}]
+
+
+def make_plan():
+    components = {
+        'h': dcc.Slider(id='h', min=0, max=100, step=1, value=37),
+        'rho': dcc.Slider(id='rho', min=500, max=1500, step=50, value=1000),
+        'shape': dcc.RadioItems(id='shape', options=['box', 'cylinder', 'sphere', 'hull'], value='sphere'),
+    }
+    return CallbackPlan({'output': 'graph.figure', 'inputs': INPUTS, 'state': []}, 'update', components)
+
+
+def test_plan_covers_every_tick_and_option():
+    plan = make_plan()
+    assert [len(c) for c in plan.choices] == [101, 21, 4]
+    assert plan.count == plan.full_count == 101 * 21 * 4
+    assert plan.values_at(plan.default_flat) == [37, 1000, 'sphere']
+
+
+def test_thin_keeps_the_defaults_within_the_target():
+    for target in (5000, 500, 40, 8, 3, 1):
+        plan = make_plan()
+        assert plan.thin(target)
+        assert plan.count <= target
+        assert plan.values_at(plan.default_flat) == [37, 1000, 'sphere']
+        # Evenly spaced grids with their ends, as long as they keep two ticks
+        if len(plan.choices[1]) > 2:
+            assert plan.choices[1][-1] == 1500
+
+
+def test_thin_reduces_the_grids_before_the_options():
+    plan = make_plan()
+    plan.thin(4 * 2 * 2)
+    assert [len(c) for c in plan.choices] == [2, 2, 4]
+    plan = make_plan()
+    plan.thin(4)
+    assert [len(c) for c in plan.choices] == [2, 2, 1]
+
+
+def test_thin_fails_below_one_combination():
+    plan = make_plan()
+    assert not plan.thin(0)
+
+
+def test_allocate_gives_small_tables_all_they_need():
+    assert allocate([10, 100, 1000], 300) == [10, 100, 190]
+    assert sum(allocate([50, 60], 1000)) == 110
+
+
+def test_plan_budget_leaves_out_what_cannot_fit():
+    small, large = make_plan(), make_plan()
+    small.entry_bytes, small.base_bytes = 10, 1000
+    large.entry_bytes, large.base_bytes = 10, 50_000
+    budget = 30_000
+    exported = plan_budget([small, large], budget)
+    assert exported == [small] and not large.exported
+    assert large.index_entry() == {'name': 'update', 'unavailable': True}
+    assert small.base_bytes + small.count * small.entry_bytes <= budget
+    assert small.count == math.prod(len(c) for c in small.choices) > 1
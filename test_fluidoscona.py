@@ -0,0 +1,69 @@
+import meshes
+from response_cache import callback_body
+
+ARCHIMEDES_INPUTS = [{'id': 'archimedes-shape', 'property': 'value'}, {'id': 'archimedes-mesh-key', 'property': 'data'},
+                     {'id': 'archimedes-rho-obj-slider', 'property': 'value'}, {'id': 'archimedes-vol-obj-slider', 'property': 'value'},
+                     {'id': 'archimedes-rho-fluid-slider', 'property': 'value'}]
+
+
+def callback_output(app, name):
+    return next(output for output, spec in app.callback_map.items() if getattr(spec.get('callback'), '__name__', None) == name)
+
+
+def test_archimedes_patch_does_not_depend_on_the_trigger(app, client):
+    output = callback_output(app, 'update_archimedes_draft')
+    values = ['sphere', None, 600, 0.5, 1000]
+    responses = []
+    for changed in ('archimedes-shape.value', 'archimedes-rho-obj-slider.value', 'archimedes-rho-fluid-slider.value'):
+        response = client.post('/_dash-update-component', json=callback_body(output, ARCHIMEDES_INPUTS, values, [changed]))
+        assert response.status_code == 200
+        responses.append(response.get_json())
+    assert responses[0] == responses[1] == responses[2]
+
+
+def test_density_changes_only_move_the_waterline(app, client):
+    output = callback_output(app, 'update_archimedes_draft')
+    body = callback_body(output, ARCHIMEDES_INPUTS, ['hull', None, 600, 0.027, 1000], ['archimedes-rho-fluid-slider.value'])
+    response = client.post('/_dash-update-component', json=body)
+    operations = response.get_json()['response']['archimedes-shape-graph']['figure']['operations']
+    assert [op['location'] for op in operations] == [['data', 1, 'z']]
+    assert len(response.get_data()) < 20_000
+
+    # The mesh is sent by its own callback, with each vertex once
+    inputs = [ARCHIMEDES_INPUTS[0], ARCHIMEDES_INPUTS[1], ARCHIMEDES_INPUTS[3]]
+    state = [dict(ARCHIMEDES_INPUTS[2], value=600), dict(ARCHIMEDES_INPUTS[4], value=1000)]
+    body = callback_body(callback_output(app, 'update_archimedes_shape'), inputs, ['hull', None, 0.027], state=state)
+    mesh = client.post('/_dash-update-component', json=body).get_json()['response']['archimedes-shape-graph']['figure']['data'][0]
+    table = meshes.draft_table('hull')
+    assert len(mesh['i']) == len(table.triangles)
+    assert len(mesh['x']) < len(table.triangles)
+
+
+def test_layers_beyond_the_bulk_modulus_show_a_message(client):
+    inputs = [{'id': 'hydrostatic-layers-table', 'property': 'data'}, {'id': 'hydrostatic-surface-pressure-input', 'property': 'value'},
+              {'id': 'hydrostatic-bulk-modulus-input', 'property': 'value'}, {'id': 'hydrostatic-resolution-slider', 'property': 'value'}]
+    rows = [{'name': 'Agua', 'density': 1000, 'thickness': 10}]
+    body = callback_body('..hydrostatic-layers-graph.figure...hydrostatic-layers-output.children..', inputs, [rows, 0, 9e4, 3])
+    response = client.post('/_dash-update-component', json=body)
+    assert response.status_code == 200
+    outputs = response.get_json()['response']
+    assert outputs['hydrostatic-layers-graph']['figure'] == {'data': [], 'layout': {}}
+    assert 'módulo de compresibilidad' in outputs['hydrostatic-layers-output']['children']['props']['children']
+
+
+def test_figures_name_the_template_sent_with_the_page(client):
+    assert b'name="fluidos-template"' in client.get('/').get_data()
+    inputs = [{'id': 'hydrostatic-layers-table', 'property': 'data'}, {'id': 'hydrostatic-surface-pressure-input', 'property': 'value'},
+              {'id': 'hydrostatic-bulk-modulus-input', 'property': 'value'}, {'id': 'hydrostatic-resolution-slider', 'property': 'value'}]
+    rows = [{'name': 'Agua', 'density': 1000, 'thickness': 10}]
+    body = callback_body('..hydrostatic-layers-graph.figure...hydrostatic-layers-output.children..', inputs, [rows, 0, 2.2e9, 3])
+    figure = client.post('/_dash-update-component', json=body).get_json()['response']['hydrostatic-layers-graph']['figure']
+    assert figure['layout']['template'] == 'fluidos'
+
+
+def test_tab_activations_count_unknown_tabs_together(app, client):
+    body = callback_body(callback_output(app, 'render_tab'), [{'id': 'tabs', 'property': 'active_tab'}], ['tab-"made-up'],
+                         ['tabs.active_tab'], [{'id': 'visited-tabs', 'property': 'data', 'value': []}])
+    client.post('/_dash-update-component', json=body)
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'fluidos_tab_activations_total{tab="unknown"}' in text and 'made-up' not in text
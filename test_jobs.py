@@ -0,0 +1,78 @@
+import os
+import time
+
+import pytest
+
+import jobs
+
+
+def wait_for_release(path, progress):
+    """Job function: reports progress until the file ``path`` exists."""
+    while not os.path.exists(path):
+        progress(0.5)
+        time.sleep(0.01)
+    return 'released'
+
+
+def wait_until(job, condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = jobs.status(job)
+        if state is not None and condition(state['status']):
+            return state['status']
+        time.sleep(0.01)
+    raise AssertionError(f"job {job} still {jobs.status(job)}")
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, 'JOBS_DIR', str(tmp_path / 'jobs'))
+    monkeypatch.setenv('FLUIDOS_JOBS_DIR', str(tmp_path / 'jobs')) # Read by the worker processes
+    pool = jobs.JobPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_cancelled_job_ends_cancelled(pool, tmp_path):
+    job = pool.submit(wait_for_release, str(tmp_path / 'release'))
+    wait_until(job, lambda s: s == 'running')
+    jobs.cancel(job)
+    assert wait_until(job, lambda s: s not in jobs.ACTIVE) == 'cancelled'
+
+
+def test_resubmitting_a_cancelled_job_keeps_it(pool, tmp_path):
+    release = tmp_path / 'release'
+    job = pool.submit(wait_for_release, str(release))
+    wait_until(job, lambda s: s == 'running')
+    jobs.cancel(job)
+    assert pool.submit(wait_for_release, str(release)) == job
+    time.sleep(0.2) # The job keeps checking for cancellation meanwhile
+    release.touch()
+    assert wait_until(job, lambda s: s not in jobs.ACTIVE) == 'done'
+    assert jobs.result(job) == 'released'
+
+
+def test_cancel_withdrawn_while_the_job_stops(tmp_path, monkeypatch):
+    # The job raised Cancelled, then was submitted again before the worker took the lock
+    monkeypatch.setattr(jobs, 'JOBS_DIR', str(tmp_path))
+    job = jobs.job_id(wait_for_release, ('x',))
+    os.makedirs(jobs._directory(job))
+    calls = []
+
+    def func(progress):
+        calls.append(1)
+        if len(calls) == 1:
+            open(os.path.join(jobs._directory(job), 'cancel'), 'w').close()
+            progress(0.5)
+        return len(calls)
+
+    locked = jobs._locked
+
+    def resubmitted_first(job):
+        jobs._withdraw_cancel(job)
+        return locked(job)
+
+    monkeypatch.setattr(jobs, '_locked', resubmitted_first)
+    jobs._execute(job, func, ())
+    assert jobs.status(job)['status'] == 'done'
+    assert jobs.result(job) == 2
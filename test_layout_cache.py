@@ -0,0 +1,40 @@
+import gzip
+
+import dash
+from dash import Input, Output, dcc, html
+
+from layout_cache import install_layout_cache
+
+
+def make_app():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([dcc.Slider(id='a', min=0, max=1, value=0.5), html.Div(id='out')])
+
+    @app.callback(Output('out', 'children'), Input('a', 'value'))
+    def echo(a):
+        return a
+
+    return app, install_layout_cache(app)
+
+
+def test_cached_layout_matches_the_live_one_and_revalidates():
+    app, precompute = make_app()
+    client = app.server.test_client()
+    live = {path: client.get(path).get_data() for path in ('/_dash-layout', '/_dash-dependencies')}
+    precompute()
+
+    for path, body in live.items():
+        first = client.get(path, headers={'Accept-Encoding': 'gzip'})
+        second = client.get(path, headers={'Accept-Encoding': 'gzip'})
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(first.get_data()) == body
+        etag, weak = first.get_etag()
+        assert etag and not weak and second.get_etag() == (etag, False)
+
+        unchanged = client.get(path, headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+        assert unchanged.status_code == 304 and unchanged.get_data() == b''
+
+        plain = client.get(path, headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in plain.headers and plain.get_data() == body
+        assert plain.get_etag()[0] != etag # Each encoding has its own tag
+        assert client.get(path, headers={'If-None-Match': f'"{etag}"'}).status_code == 200
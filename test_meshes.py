@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import meshes
+
+
+def test_volume_of_closed_shapes():
+    assert meshes.volume(meshes.box(2.0, 1.0, 0.5)) == pytest.approx(1.0)
+    assert meshes.volume(meshes.cylinder(3.0, 0.5, n=256)) == pytest.approx(3.0 * np.pi * 0.25, rel=1e-3)
+    # Inward normals give a negative volume; normalize flips them
+    assert meshes.volume(meshes.box()[:, ::-1]) == pytest.approx(-2.0)
+    assert meshes.volume(meshes.normalize(meshes.box()[:, ::-1])) == pytest.approx(1.0)
+
+
+def test_draft_of_a_box_is_linear():
+    table = meshes.DraftTable(meshes.normalize(meshes.box(2.0, 1.0, 1.0)))
+    for fraction in (0.1, 0.37, 0.5, 0.9):
+        assert table.volume(fraction * table.height) == pytest.approx(fraction)
+        assert table.draft(fraction) == pytest.approx(fraction * table.height)
+    assert table.draft(0) == 0.0
+    assert table.draft(1.5) == table.height
+
+
+def test_draft_of_a_sphere_solves_the_volume():
+    table = meshes.DraftTable(meshes.normalize(meshes.sphere()))
+    assert table.draft(0.5) == pytest.approx(table.height / 2, rel=1e-6)
+    for fraction in (0.05, 0.3, 0.8):
+        assert table.volume(table.draft(fraction)) == pytest.approx(fraction, abs=1e-9)
+
+
+def test_stl_round_trip():
+    triangles = meshes.box()
+    ascii_stl = b'solid box\n' + b''.join(
+        b'facet normal 0 0 0\nouter loop\n' + b''.join(b'vertex %r %r %r\n' % tuple(map(float, v)) for v in face) + b'endloop\nendfacet\n'
+        for face in triangles) + b'endsolid box\n'
+    np.testing.assert_allclose(meshes.parse_stl(ascii_stl), triangles)
+    with pytest.raises(ValueError):
+        meshes.parse_stl(b'solid empty\nendsolid empty\n')
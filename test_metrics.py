@@ -0,0 +1,45 @@
+import dash
+from dash import Input, Output, dcc, html
+
+from metrics import Metrics, install_metrics
+from response_cache import callback_body
+
+
+def make_app():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([dcc.Slider(id='a', min=0, max=1, value=0.5), html.Div(id='out')])
+
+    @app.callback(Output('out', 'children'), Input('a', 'value'))
+    def echo(a):
+        return a
+
+    metrics = Metrics()
+    install_metrics(app, metrics)
+    return app, metrics
+
+
+def test_render_escapes_label_values():
+    metrics = Metrics()
+    metrics.inc('fluidos_tab_activations_total', tab='a"b\\c\nd')
+    metrics.observe('fluidos_request_seconds', 0.002, callback='x')
+    text = metrics.render()
+    assert 'fluidos_tab_activations_total{tab="a\\"b\\\\c\\nd"} 1\n' in text
+    assert 'fluidos_request_seconds_bucket{callback="x",le="0.0025"} 1\n' in text
+    assert 'fluidos_request_seconds_count{callback="x"} 1\n' in text
+    assert all(line.startswith(('#', 'fluidos_')) for line in text.splitlines())
+
+
+def test_requests_are_labelled_with_registered_callbacks_only():
+    app, metrics = make_app()
+    client = app.server.test_client()
+    inputs = [{'id': 'a', 'property': 'value'}]
+    assert client.post('/_dash-update-component', json=callback_body('out.children', inputs, [0.3])).status_code == 200
+    # Outputs of no callback, including ones that are not even strings, are not labels of their own
+    # (Dash answers them with an error of its own; the hooks still record them)
+    for output in ('made-up.children', ['out', 'children'], {'id': 'out'}):
+        client.post('/_dash-update-component', json=dict(callback_body('out.children', inputs, [0.3]), output=output))
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'fluidos_request_seconds_count{callback="echo"} 1\n' in text
+    assert 'fluidos_request_seconds_count{callback="unknown"} 3\n' in text
+    assert 'made-up' not in text
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+import physics
+
+
+def test_layered_pressure_incompressible():
+    profile = physics.layered_pressure([1000, 800], [2.0, 3.0], n_samples=101, surface_pressure=100.0)
+    np.testing.assert_allclose(profile.interfaces, [2.0, 5.0])
+    expected = 100.0 + physics.G_ACCEL * np.array([1000 * 2.0, 1000 * 2.0 + 800 * 3.0])
+    np.testing.assert_allclose(np.interp(profile.interfaces, profile.depth, profile.pressure), expected)
+    assert np.all(profile.density[profile.depth <= 2.0] == 1000)
+
+
+def test_layered_pressure_compressible():
+    K = 2.2e9
+    profile = physics.layered_pressure([1000], [100.0], n_samples=11, bulk_modulus=K)
+    q = 1000 * physics.G_ACCEL * profile.depth
+    np.testing.assert_allclose(profile.pressure, -K * np.log1p(-q / K))
+    assert profile.pressure[-1] > q[-1]
+    np.testing.assert_allclose(profile.density, 1000 * np.exp(profile.pressure / K))
+
+
+def test_layered_pressure_rejects_a_column_beyond_the_bulk_modulus():
+    # ρgh = 98 100 Pa at the bottom
+    physics.layered_pressure([1000], [10.0], n_samples=11, bulk_modulus=1e5)
+    with pytest.raises(ValueError, match='módulo de compresibilidad'):
+        physics.layered_pressure([1000], [10.0], n_samples=11, bulk_modulus=9e4)
+
+
+# --- Vectorized formulas against the scalar ones of the dashboard ---
+def scalar_pressure(force, area):
+    return (0.0, False) if area is None or area <= 0 else (force / area, True)
+
+
+def scalar_hydraulic_press(f_in, d_cm, D_cm):
+    area_a, area_A = np.pi * (d_cm / 200.0)**2, np.pi * (D_cm / 200.0)**2
+    if area_a <= 0:
+        return 0.0, 0.0, 0.0
+    pressure = f_in / area_a
+    force_out = pressure * area_A
+    return pressure, force_out, force_out / f_in if f_in > 0 else 0.0
+
+
+def scalar_buoyancy(rho_obj, vol_obj, rho_fluid):
+    weight = rho_obj * physics.G_ACCEL * vol_obj
+    max_buoyancy = rho_fluid * physics.G_ACCEL * vol_obj
+    if weight > max_buoyancy:
+        return max_buoyancy, vol_obj, physics.SINKS
+    if weight == max_buoyancy:
+        return weight, vol_obj, physics.SUSPENDED
+    return weight, rho_obj / rho_fluid * vol_obj, physics.FLOATS
+
+
+def scalar_continuity(D1_cm, v1, D2_cm):
+    A1, A2 = np.pi * (D1_cm / 200.0)**2, np.pi * (D2_cm / 200.0)**2
+    return (0.0, 0.0) if A2 <= 0 else (A1 * v1 / A2, A1 * v1)
+
+
+def scalar_torricelli(h, g):
+    g = g if g is not None and g > 0 else physics.G_ACCEL
+    return 0.0 if h is None or h <= 0 else np.sqrt(2 * g * h)
+
+
+def test_pressure_matches_the_scalar_formula():
+    forces, areas = [0.0, 250.0, 1000.0], [-1.0, 0.0, 0.01, 0.5]
+    result = physics.pressure(np.array(forces)[:, None], np.array(areas)[None, :])
+    assert result.pressure.shape == result.valid.shape == (3, 4)
+    for i, force in enumerate(forces):
+        for j, area in enumerate(areas):
+            assert (result.pressure[i, j], result.valid[i, j]) == pytest.approx(scalar_pressure(force, area))
+    assert physics.pressure(100.0, 0.5).pressure == 200.0
+    assert not physics.pressure(100.0, None).valid
+
+
+def test_hydraulic_press_matches_the_scalar_formula():
+    cases = [(100.0, 2.0, 20.0), (0.0, 2.0, 20.0), (-10.0, 5.0, 10.0), (50.0, 0.0, 20.0)]
+    result = physics.hydraulic_press(*np.array(cases).T)
+    for k, case in enumerate(cases):
+        expected = scalar_hydraulic_press(*case)
+        assert (result.pressure[k], result.force_out[k], result.advantage[k]) == pytest.approx(expected)
+    assert list(result.valid) == [True, True, True, False]
+
+
+def test_buoyancy_matches_the_scalar_formula():
+    rho_obj, rho_fluid = np.array([500.0, 1000.0, 7850.0]), np.array([800.0, 1000.0, 1025.0])
+    result = physics.buoyancy(rho_obj[:, None], 0.027, rho_fluid[None, :])
+    assert result.state.shape == (3, 3)
+    for i, r_obj in enumerate(rho_obj):
+        for j, r_fluid in enumerate(rho_fluid):
+            buoyancy, vol_submerged, state = scalar_buoyancy(r_obj, 0.027, r_fluid)
+            assert result.buoyancy[i, j] == pytest.approx(buoyancy)
+            assert result.vol_submerged[i, j] == pytest.approx(vol_submerged)
+            assert result.fraction_submerged[i, j] == pytest.approx(vol_submerged / 0.027)
+            assert result.state[i, j] == state
+    # A fluid without density holds nothing up
+    assert physics.buoyancy(500, 0.01, 0).state == physics.SINKS
+
+
+def test_continuity_matches_the_scalar_formula():
+    D2 = np.array([-1.0, 0.0, 2.5, 10.0])
+    result = physics.continuity(5.0, 2.0, D2)
+    for k, d in enumerate(D2):
+        assert (result.v2[k], result.flow[k]) == pytest.approx(scalar_continuity(5.0, 2.0, d))
+    # circle_area squares the diameter: a negative one is still a valid section
+    assert list(result.valid) == [True, False, True, True]
+
+
+def test_torricelli_matches_the_scalar_formula():
+    heights, gravities = [-2.0, 0.0, 0.5, 20.0], [None, -9.81, 0.0, 1.62, 9.81]
+    result = physics.torricelli(np.array(heights)[:, None], np.array(gravities, dtype=float)[None, :])
+    assert result.velocity.shape == (4, 5)
+    for i, h in enumerate(heights):
+        for j, g in enumerate(gravities):
+            assert result.velocity[i, j] == pytest.approx(scalar_torricelli(h, g))
+            assert result.valid[i, j] == (h > 0)
+    assert result.g[0].tolist() == [physics.G_ACCEL, physics.G_ACCEL, physics.G_ACCEL, 1.62, 9.81]
+    assert physics.torricelli(None).velocity == 0 and not physics.torricelli(None).valid
+
+
+def test_hydrostatic_pressure_broadcasts():
+    np.testing.assert_allclose(physics.hydrostatic_pressure([1000, 800], np.array([[1.0], [10.0]])),
+                               physics.G_ACCEL * np.array([[1000.0, 800.0], [10000.0, 8000.0]]))
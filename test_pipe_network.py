@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import pipe_network
+from pipe_network import NetworkSolver
+
+
+@pytest.mark.parametrize('kind', sorted(pipe_network.GENERATORS))
+def test_mass_balance(kind):
+    solver = NetworkSolver(pipe_network.GENERATORS[kind](30, 5.0, 2.0))
+    result = solver.solve(0.002)
+    assert result.imbalance < 1e-12
+    assert result.outlet_flow.sum() == pytest.approx(0.002)
+    assert np.all(result.outlet_flow > 0)
+    assert np.all(result.head[solver.network.outlets] == 0)
+    # The total pressure falls along the flow
+    assert np.all((result.head[solver.network.start] - result.head[solver.network.end]) * result.flow >= 0)
+
+
+def test_series_head_loss_is_hagen_poiseuille():
+    network = pipe_network.series_network(10, 4.0, 4.0)
+    result = NetworkSolver(network).solve(1e-3)
+    resistance = 128 * pipe_network.WATER_VISCOSITY * network.length / (np.pi * 0.04**4)
+    assert result.head[0] == pytest.approx(1e-3 * resistance.sum())
+    assert np.allclose(result.flow, 1e-3)
+
+
+def test_static_pressure_at_the_upstream_end():
+    network = pipe_network.series_network(10, 5.0, 2.0)
+    result = NetworkSolver(network).solve(0.01)
+    # Segments drawn against the flow: the upstream end is their end node
+    reversed_network = network._replace(start=network.end, end=network.start)
+    reversed_result = NetworkSolver(reversed_network).solve(0.01)
+    assert np.all(reversed_result.flow < 0)
+    np.testing.assert_allclose(reversed_result.static_pressure, result.static_pressure)
+    dynamic = 0.5 * pipe_network.WATER_DENSITY * result.velocity**2
+    np.testing.assert_allclose(result.static_pressure, result.head[network.start] - dynamic)
@@ -0,0 +1,81 @@
+import dash
+from dash import Input, Output, dcc, html
+
+from response_cache import ResponseCache, callback_body, install_response_cache, quantize, request_key, split_output, warm_up
+
+
+def make_app():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([
+        dcc.Slider(id='a', min=0, max=1, step=0.1, value=0.3, marks={0: '0', 1: '1'}),
+        dcc.Slider(id='b', min=1, max=5, step=1, value=2),
+        html.Div(id='sum'),
+        html.Div(id='product'),
+        html.Div(id='double'),
+    ])
+
+    @app.callback([Output('sum', 'children'), Output('product', 'children')], Input('a', 'value'), Input('b', 'value'))
+    def combine(a, b):
+        return a + b, a * b
+
+    @app.callback(Output('double', 'children'), Input('b', 'value'))
+    def double(b):
+        return 2 * b
+
+    cache = ResponseCache(max_bytes=1 << 20)
+    install_response_cache(app, cache)
+    return app, cache
+
+
+def test_split_output():
+    assert split_output('graph.figure') == {'id': 'graph', 'property': 'figure'}
+    assert split_output('..a.children...b.figure..') == [{'id': 'a', 'property': 'children'},
+                                                          {'id': 'b', 'property': 'figure'}]
+    # A list with a single output is still a multi-output callback
+    assert split_output('..a.children..') == [{'id': 'a', 'property': 'children'}]
+
+
+def test_quantize_snaps_to_the_slider_grid():
+    assert quantize(0.30000000000000004, (0, 0.1)) == quantize(0.3, (0, 0.1))
+    assert quantize('text', None) == 'text'
+
+
+def test_request_key_separates_initial_calls_and_updates():
+    inputs = [{'id': 'a', 'property': 'value'}]
+    initial = request_key(callback_body('x.children', inputs, [0.30000000000000004]), {'a': (0, 0.1)})
+    update = request_key(callback_body('x.children', inputs, [0.3], ['a.value']), {'a': (0, 0.1)})
+    assert initial[:2] == update[:2]
+    assert initial[2] and not update[2]
+
+
+def test_evictions_are_counted_once():
+    cache = ResponseCache(max_bytes=10, max_entries=3)
+    for key in 'abc':
+        cache.put(key, b'xxx')
+    cache.put('d', b'xxx') # Over max_bytes: 'a' leaves
+    assert cache.stats()['evictions'] == 1
+    cache.put('e', b'x') # Over max_entries: 'b' leaves
+    assert cache.stats()['evictions'] == 2
+    assert cache.get('a') is None and cache.get('b') is None and cache.get('e') == b'x'
+    assert cache.stats()['entries'] == 3 and cache.stats()['bytes'] == 7
+
+
+def test_repeated_requests_are_served_from_the_cache():
+    app, cache = make_app()
+    client = app.server.test_client()
+    body = callback_body('..sum.children...product.children..', [{'id': 'a', 'property': 'value'},
+                                                                  {'id': 'b', 'property': 'value'}], [0.5, 2])
+    first = client.post('/_dash-update-component', json=body)
+    second = client.post('/_dash-update-component', json=body)
+    assert first.status_code == second.status_code == 200
+    assert first.get_data() == second.get_data()
+    assert cache.stats()['hits'] == 1 and cache.stats()['entries'] == 1
+
+
+def test_warm_up_stores_every_request():
+    app, cache = make_app()
+    warmed = warm_up(app, cache)
+    assert warmed['failed'] == []
+    # a: default and two marks, b: default only; each combination as initial call and update
+    assert warmed['requests'] == 2 * (3 * 1 + 1)
+    assert warmed['stored'] == warmed['requests'] == cache.stats()['entries']
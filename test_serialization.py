@@ -0,0 +1,28 @@
+import plotly.graph_objects as go
+
+import serialization
+from serialization import FigureTemplates, figure_dict
+
+
+def test_figure_dict_names_the_template_and_drops_defaults(monkeypatch):
+    monkeypatch.setattr(serialization, '_lean_template', True)
+    fig = go.Figure(go.Bar(x=[1, 2], y=[3, 4], visible=True, opacity=1, textposition='auto', name='b'),
+                    layout=dict(hovermode=serialization.LEAN_LAYOUT['hovermode'], title='t'))
+    figure = figure_dict(fig)
+    assert figure['layout']['template'] == serialization.TEMPLATE_NAME
+    assert 'hovermode' not in figure['layout'] and figure['layout']['title'] == {'text': 't'}
+    trace = figure['data'][0]
+    assert not {'visible', 'opacity', 'textposition'} & set(trace) and trace['name'] == 'b'
+
+
+def test_figure_templates_separate_closures_sharing_their_code():
+    def factory(height):
+        def build_figure():
+            return go.Figure(layout=dict(height=height))
+        return build_figure
+
+    templates = FigureTemplates()
+    small, large = factory(100), factory(200)
+    assert small.__code__ is large.__code__
+    assert templates.figure(small, {}, key=(small, 'build_figure'))['layout']['height'] == 100
+    assert templates.figure(large, {}, key=(large, 'build_figure'))['layout']['height'] == 200
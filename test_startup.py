@@ -0,0 +1,9 @@
+import os
+
+from benchmarks import startup
+
+
+def test_cold_start_within_budget():
+    # Fresh interpreters; the dashboard's share is relative to the framework import (see benchmarks/startup.py)
+    result = startup.run_samples(3, dict(os.environ, FLUIDOS_CACHE_WARMUP='0'))
+    assert startup.check(result) == []
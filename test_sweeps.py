@@ -0,0 +1,15 @@
+import base64
+
+import serialization
+import sweeps
+
+
+def test_grid_is_sent_whole_as_a_typed_array(monkeypatch):
+    # Even with typed arrays off for the other figures
+    monkeypatch.setattr(serialization, '_typed_arrays', False)
+    n = 300
+    figure = sweeps.build_figure('pressure', 'force', 'area', n, (('area', 0.5),))
+    z = figure['data'][0]['z']
+    assert z['dtype'] == 'u1' and z['shape'] == f'{n},{n}'
+    assert len(base64.b64decode(z['bdata'])) == n * n
+    assert figure['layout']['title']['text'].endswith(f"({n}×{n})")